@@ -9,6 +9,7 @@ from flask_cors import CORS
 
 from app.routes import register_blueprints
 from app.services.ollama_service import OllamaService
+from app.services.webhook_service import WebhookService
 
 from .config import Config
 from .extensions import  mongo,jwt
@@ -142,6 +143,13 @@ def create_app(config_class=Config):
     except Exception as e:
         app.logger.warning("Failed to start Ollama periodic health checks: %s", e)
 
+    # Start the webhook retry scheduler (scheduled deliveries, lost retries)
+    if not app.config.get('TESTING'):
+        try:
+            WebhookService.start_retry_scheduler(app)
+        except Exception as e:
+            app.logger.warning("Failed to start webhook retry scheduler: %s", e)
+
     @jwt.token_in_blocklist_loader
     def check_if_token_in_blocklist(jwt_header, jwt_payload):
         jti = jwt_payload["jti"]
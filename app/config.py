@@ -25,6 +25,8 @@ class Config:
     # File upload settings
     UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", "uploads")
     MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", 10 * 1024 * 1024))  # 10MB
+    # fsync each upload before responding (slower, survives power loss)
+    UPLOAD_FSYNC = os.getenv("UPLOAD_FSYNC", "false").lower() == "true"
 
     # Admin user config
     ADMIN_USERNAME = os.getenv("DEVELOPMENT_ADMIN_USERNAME", "admin")
@@ -77,6 +79,33 @@ class Config:
     OLLAMA_POOL_TIMEOUT = int(os.getenv("OLLAMA_POOL_TIMEOUT", 30))
     OLLAMA_CONNECTION_TIMEOUT = int(os.getenv("OLLAMA_CONNECTION_TIMEOUT", 10))
 
+    # Webhook Delivery Settings
+    # Persist every attempt/backoff transition instead of only the final outcome
+    WEBHOOK_VERBOSE_LOGS = os.getenv("WEBHOOK_VERBOSE_LOGS", "false").lower() == "true"
+    # Keep-alive connections kept per host by the shared webhook HTTP session
+    WEBHOOK_POOL_SIZE = int(os.getenv("WEBHOOK_POOL_SIZE", 50))
+    # Background threads delivering webhooks off the request thread
+    WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", 8))
+    # Batching window and size for webhooks configured with "batch": true
+    WEBHOOK_BATCH_INTERVAL_MS = int(os.getenv("WEBHOOK_BATCH_INTERVAL_MS", 100))
+    WEBHOOK_BATCH_MAX_SIZE = int(os.getenv("WEBHOOK_BATCH_MAX_SIZE", 100))
+    # Seconds between scans for scheduled deliveries and lost retries
+    WEBHOOK_SCHEDULER_INTERVAL = int(os.getenv("WEBHOOK_SCHEDULER_INTERVAL", 30))
+    # Concurrent deliveries allowed per endpoint host
+    WEBHOOK_HOST_CONCURRENCY = int(os.getenv("WEBHOOK_HOST_CONCURRENCY", 4))
+    # Consecutive failures that open an endpoint's circuit, and how long it stays open (seconds)
+    WEBHOOK_CIRCUIT_THRESHOLD = int(os.getenv("WEBHOOK_CIRCUIT_THRESHOLD", 10))
+    WEBHOOK_CIRCUIT_COOLDOWN = int(os.getenv("WEBHOOK_CIRCUIT_COOLDOWN", 30))
+    # Fernet key encrypting stored credential headers (derived from SECRET_KEY if unset)
+    WEBHOOK_HEADER_KEY = os.getenv("WEBHOOK_HEADER_KEY")
+
+    # Email Notification Settings
+    # Attempts per queued email; retries back off from EMAIL_RETRY_BASE_DELAY seconds, doubling
+    EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
+    EMAIL_RETRY_BASE_DELAY = int(os.getenv("EMAIL_RETRY_BASE_DELAY", 10))
+    # Queued emails sent per SMTP session
+    EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 50))
+
     # Redis Configuration
     REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
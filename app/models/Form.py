@@ -140,7 +140,7 @@ class Form(Document):
     viewers = ListField(StringField())         # Users who can view/read
     submitters = ListField(StringField())      # Users who can submit responses
 
-    webhooks = ListField(DictField())          # List of webhook configs: {url, event, secret}
+    webhooks = ListField(DictField())          # List of webhook configs: {url, event, secret, batch}
     notification_emails = ListField(StringField())  # List of emails to notify on valid submission
     
     approval_enabled = BooleanField(default=False)
@@ -296,7 +296,8 @@ class SummarySnapshot(Document):
             'period_end',
             'created_by',
             ('form_id', 'period_end'),
-            ('form_id', 'timestamp')
+            ('form_id', 'timestamp'),
+            ('form_id', 'period_start', 'period_end', '-timestamp')
         ]
     }
     
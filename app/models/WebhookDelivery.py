@@ -28,7 +28,8 @@ class WebhookDelivery(Document):
             ('form_id', 'status'),
             ('status', 'next_retry_at'),
             ('webhook_id', 'created_at'),
-            ('form_id', 'created_at')
+            ('form_id', 'created_at'),
+            ('form_id', 'webhook_id', '-created_at', '-id')
         ]
     }
     
@@ -81,12 +82,22 @@ class WebhookDelivery(Document):
     # Additional metadata (headers, retry schedule, etc.)
     metadata = DictField()
     
+    # Request headers and per-attempt timeout, kept so retries can run from the record;
+    # credential headers (Authorization, Cookie, *-Token) are kept only in
+    # sealed_headers, encrypted
+    request_headers = DictField()
+    sealed_headers = StringField()
+    timeout = IntField(default=10, min_value=1)
+    
     # Timestamp when the webhook delivery record was created
     created_at = DateTimeField(default=lambda: datetime.now(timezone.utc))
     
     # Timestamp when the webhook delivery was completed/failed/cancelled
     completed_at = DateTimeField()
     
+    # Number of times the delivery has been manually retried
+    retry_generation = IntField(default=0, min_value=0)
+    
     def to_dict(self) -> dict:
         """
         Convert the WebhookDelivery document to a dictionary.
@@ -111,7 +122,8 @@ class WebhookDelivery(Document):
             'error_message': self.error_message,
             'metadata': self.metadata,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'retry_generation': self.retry_generation
         }
     
     def is_retryable(self) -> bool:
@@ -126,6 +138,32 @@ class WebhookDelivery(Document):
             self.attempt_count < self.max_retries
         )
     
+    @classmethod
+    def reset_for_retry(cls, delivery_id: str, expected_status: str) -> bool:
+        """
+        Reset a delivery in place for a fresh round of attempts.
+        
+        Clears the previous outcome and bumps retry_generation in a single
+        update, keeping the id, payload and created_at.
+        
+        Args:
+            delivery_id: The ID of the webhook delivery
+            expected_status: Status the delivery must still have
+        
+        Returns:
+            True if reset, False if the delivery changed status in the meantime
+        """
+        return bool(cls.objects(id=delivery_id, status=expected_status).update_one(
+            set__status='pending',
+            set__attempt_count=0,
+            inc__retry_generation=1,
+            unset__next_retry_at=True,
+            unset__response_code=True,
+            unset__response_body=True,
+            unset__error_message=True,
+            unset__completed_at=True
+        ))
+    
     def is_completed(self) -> bool:
         """
         Check if this webhook delivery has completed (success, failed, or cancelled).
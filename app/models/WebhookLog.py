@@ -14,7 +14,8 @@ class WebhookLog(Document):
             'status',
             'created_at',
             'last_attempt',
-            ('url', 'status'),
+            ('url', 'status', '-created_at'),
+            ('url', '-created_at'),
             ('status', 'created_at')
         ]
     }
@@ -13,7 +13,7 @@ import uuid
 from mongoengine.queryset.visitor import Q
 from app.utils.file_handler import save_uploaded_file
 from app.utils.webhooks import trigger_webhooks
-from app.utils.email_helper import send_email_notification
+from app.utils.email_helper import queue_email_notification
 from app.models.Workflow import FormWorkflow
 from app.utils.script_engine import execute_safe_script
 
@@ -169,7 +169,7 @@ def execute_notify_action(action, source_response, flat_answers, source_form, cu
         <p><strong>Response ID:</strong> {source_response.id}</p>
         <p><strong>Submitted At:</strong> {source_response.submitted_at}</p>
         """
-        send_email_notification([notify_user.email], subject, body)
+        queue_email_notification([notify_user.email], subject, body)
 
 # -------------------- Responses --------------------
 
@@ -310,7 +310,7 @@ def submit_response(form_id):
             if form.notification_emails:
                 subject = f"New Submission: {form.title}"
                 body = f"<h3>New response for {form.title}</h3><p>Submitted by: {current_user.username} ({current_user.email})</p><p>Response ID: {response.id}</p>"
-                send_email_notification(form.notification_emails, subject, body)
+                queue_email_notification(form.notification_emails, subject, body)
         
         msg = "Draft saved" if is_draft else "Response submitted"
         logger.info(f"Response {response.id} successfully processed (is_draft={is_draft})")
@@ -461,7 +461,7 @@ def submit_response(form_id):
                                 target_email = rule.get('target', current_user.email) # Default to submitter? Or fixed.
                                 # Check if target is a field mapping?
                                 if target_email and "@" in target_email:
-                                     send_email_notification(
+                                     queue_email_notification(
                                          [target_email],
                                          f"Workflow Notification: {form.title}",
                                          f"Ref: Response {response.id}"
@@ -625,7 +625,7 @@ def update_submission(form_id, response_id):
             if form.notification_emails:
                 subject = f"New Submission (from draft): {form.title}"
                 body = f"<h3>New response for {form.title}</h3><p>Submitted by: {current_user.username}</p><p>Response ID: {response.id}</p>"
-                send_email_notification(form.notification_emails, subject, body)
+                queue_email_notification(form.notification_emails, subject, body)
         elif not is_target_draft:
             # Normal update trigger
             trigger_webhooks(form, "updated", clean_response_dict)
@@ -709,7 +709,7 @@ def update_response_status(form_id, response_id):
             <p><b>Response ID:</b> {response.id}</p>
             <p><b>Changed by:</b> {current_user.username}</p>
             """
-            send_email_notification(form.notification_emails, subject, body)
+            queue_email_notification(form.notification_emails, subject, body)
 
         logger.info(f"Response {response_id} status updated to {new_status} by user {current_user.id}")
         return jsonify({"message": f"Response status updated to {new_status}"}), 200
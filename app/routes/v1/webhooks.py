@@ -28,12 +28,16 @@ def deliver_webhook():
             "Authorization": "Bearer token"
         },
         "timeout": 10,
-        "schedule_for": "2026-02-04T10:00:00Z"
+        "schedule_for": "2026-02-04T10:00:00Z",
+        "async": false
     }
     
+    When "async" is true the delivery is queued for background workers and the
+    response returns immediately; poll /<delivery_id>/status for the outcome.
+    
     Response:
     {
-        "status": "success" | "failed" | "scheduled",
+        "status": "success" | "failed" | "scheduled" | "queued",
         "delivery_id": "delivery_id",
         "attempt_count": int,
         "message": str,
@@ -55,6 +59,7 @@ def deliver_webhook():
         headers = data.get("headers")
         timeout = data.get("timeout", 10)
         schedule_for_str = data.get("schedule_for")
+        run_async = data.get("async", False)
         
         # Validate required fields
         if not url:
@@ -85,6 +90,10 @@ def deliver_webhook():
             logger.warning(f"Deliver Webhook failed: Invalid timeout {timeout}")
             return jsonify({"error": "timeout must be a positive integer"}), 400
         
+        if not isinstance(run_async, bool):
+            logger.warning(f"Deliver Webhook failed: Invalid async {run_async}")
+            return jsonify({"error": "async must be a boolean"}), 400
+        
         # Parse schedule_for if provided
         schedule_for = None
         if schedule_for_str:
@@ -101,9 +110,10 @@ def deliver_webhook():
         # Get current user
         created_by = get_jwt_identity()
         
-        # Send webhook using the service
+        # Send (or queue) webhook using the service
         logger.info(f"Handing off webhook delivery to URL {url} (created_by: {created_by})")
-        result = WebhookService.send_webhook(
+        send = WebhookService.enqueue_webhook if run_async else WebhookService.send_webhook
+        result = send(
             url=url,
             payload=payload,
             webhook_id=webhook_id,
@@ -184,14 +194,17 @@ def get_webhook_history(delivery_id: str):
     - status: Filter by status (optional): pending, in_progress, success, failed, retrying, cancelled
     - page: Page number (default: 1)
     - per_page: Number of items per page (default: 20)
+    - cursor: next_cursor from a previous page (optional); continues after
+      that page instead of using page, and omits the total counts
     
-    Response:
+    Response (deliveries omit the payload; see /<delivery_id>/status):
     {
         "deliveries": [...],
         "total": 100,
         "page": 1,
         "per_page": 20,
-        "total_pages": 5
+        "total_pages": 5,
+        "next_cursor": "2026-02-04T08:00:00|delivery_id" | null
     }
     """
     try:
@@ -202,6 +215,7 @@ def get_webhook_history(delivery_id: str):
         status = request.args.get("status")
         page = request.args.get("page", 1, type=int)
         per_page = request.args.get("per_page", 20, type=int)
+        cursor = request.args.get("cursor")
         
         # Validate status if provided
         if status and status not in ['pending', 'in_progress', 'success', 'failed', 'retrying', 'cancelled']:
@@ -234,13 +248,18 @@ def get_webhook_history(delivery_id: str):
             logger.debug(f"Resolved from delivery_id: form_id={form_id}, webhook_id={webhook_id}")
         
         # Get history
-        history = WebhookService.get_webhook_history(
-            form_id=form_id,
-            webhook_id=webhook_id,
-            status=status,
-            page=page,
-            per_page=per_page
-        )
+        try:
+            history = WebhookService.get_webhook_history(
+                form_id=form_id,
+                webhook_id=webhook_id,
+                status=status,
+                page=page,
+                per_page=per_page,
+                cursor=cursor
+            )
+        except ValueError:
+            logger.warning(f"Get Webhook History failed: Invalid cursor '{cursor}'")
+            return jsonify({"error": "cursor is invalid"}), 400
         
         return jsonify(history), 200
         
@@ -263,14 +282,18 @@ def retry_webhook(delivery_id: str):
         "reset_count": false
     }
     
+    The delivery is retried in place, so delivery_id and previous_delivery_id
+    are the same; retry_generation counts the manual retries.
+    
     Response:
     {
         "status": "success" | "failed",
-        "delivery_id": "new_delivery_id",
+        "delivery_id": "delivery_id",
         "attempt_count": int,
         "message": str,
         "error": str (optional),
-        "previous_delivery_id": "old_delivery_id"
+        "previous_delivery_id": "delivery_id",
+        "retry_generation": int
     }
     """
     try:
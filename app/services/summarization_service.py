@@ -13,18 +13,228 @@ Task: M2-EXT-03c - Add summary comparison across time periods
 """
 
 import hashlib
+import heapq
+import json
+import operator
 import re
-from typing import Dict, List, Any, Optional
-from collections import defaultdict
-from datetime import datetime, timedelta
+import textwrap
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+from itertools import repeat
+from typing import Dict, List, Any, Optional, Tuple
+from collections import Counter, OrderedDict, defaultdict
+from datetime import datetime, timedelta, timezone
 from flask import current_app
+from mongoengine.queryset.visitor import Q
 from app.services.ollama_service import OllamaService
 from app.models.Form import SummarySnapshot
 
+try:
+    import ahocorasick  # Optional accelerator for theme keyword scanning
+except ImportError:
+    ahocorasick = None
+
+
+_WORD_RE = re.compile(r'\b\w+\b')
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+
+# Memoized sentence scores keyed by corpus digest (see _score_sentences). Only
+# the scores are kept, not the sentences, so cached corpora do not pin their text.
+_SCORE_CACHE: "OrderedDict[bytes, Tuple[array, bool]]" = OrderedDict()
+_SCORE_CACHE_SIZE = 64
+_SCORE_CACHE_LOCK = threading.Lock()
+
+# Response IDs hashed per batch when building summary cache keys
+_KEY_HASH_CHUNK = 1024
+
+
+def _build_theme_automaton(keyword_themes: Dict[str, str]):
+    """
+    Build an Aho-Corasick automaton mapping each keyword to its theme.
+    
+    Args:
+        keyword_themes: Mapping of keyword to theme name
+        
+    Returns:
+        Automaton, or None when pyahocorasick is not installed
+    """
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword, theme in keyword_themes.items():
+        automaton.add_word(keyword, (theme, len(keyword)))
+    automaton.make_automaton()
+    return automaton
+
+
+def _is_word_char(char: str) -> bool:
+    """Return True for characters in the regex ``\\w`` class."""
+    return char.isalnum() or char == '_'
+
+
+def _join_budget(texts: List[str], max_chars: int, suffix: str = "") -> str:
+    """
+    Space-join texts, stopping as soon as max_chars is reached.
+    
+    Equivalent to ``" ".join(texts)[:max_chars]`` (plus suffix when
+    truncated) without building the full joined string first. The budget
+    bounds the work, so no separate cap on the number of texts is needed.
+    
+    Args:
+        texts: Texts to join
+        max_chars: Character budget for the result (excluding suffix)
+        suffix: Appended when the budget cut the output short
+        
+    Returns:
+        Joined text
+    """
+    parts = []
+    remaining = max_chars
+    for index, text in enumerate(texts):
+        piece = f" {text}" if index else text
+        if len(piece) > remaining:
+            parts.append(piece[:remaining])
+            parts.append(suffix)
+            break
+        parts.append(piece)
+        remaining -= len(piece)
+    return "".join(parts)
+
+
+# Prompt templates are dedented once at import so the LLM is not sent the
+# source-code indentation on every request.
+_ABSTRACTIVE_PROMPT = textwrap.dedent("""
+    Summarize the following {response_count} feedback responses into {max_points} key bullet points.
+    Focus on: {focus_area}
+
+    Responses:
+    {{feedback}}
+""").strip()
+
+_THEME_ANALYSIS_PROMPT = textwrap.dedent("""
+    Analyze the following feedback responses and identify main themes.
+    Focus on: {focus_area}
+
+    {examples_instruction}
+
+    Feedback:
+    {feedback}
+
+    Return a JSON object with:
+    - themes: array of theme objects with name, mention_count, summary
+    - overall_sentiment: overall sentiment assessment
+""").strip()
+
+_EXECUTIVE_PROMPTS = {
+    audience: textwrap.dedent(template).strip()
+    for audience, template in {
+        "leadership": """
+            Provide an executive summary for leadership about these {count} feedback responses.
+
+            Include:
+            - Overview (2-3 sentences on overall sentiment)
+            - Key findings (3-4 bullet points)
+            - Recommendations (2-3 actionable items)
+            - Key metrics (sentiment breakdown, response rate)
+
+            Feedback:
+            {feedback}
+        """,
+        "operations": """
+            Provide an operational summary for the operations team about these {count} feedback responses.
+
+            Focus on:
+            - Specific issues mentioned
+            - Action items for operations
+            - Priority concerns
+
+            Feedback:
+            {feedback}
+        """,
+        "product": """
+            Provide a product summary for the product team about these {count} feedback responses.
+
+            Focus on:
+            - Product-related feedback
+            - Feature requests
+            - Quality concerns
+
+            Feedback:
+            {feedback}
+        """,
+    }.items()
+}
+
+# Audience instructions without the feedback section, for batched prompts
+_EXECUTIVE_BRIEFS = {
+    audience: template.rsplit("\n\nFeedback:", 1)[0]
+    for audience, template in _EXECUTIVE_PROMPTS.items()
+}
+
+_MULTI_AUDIENCE_PROMPT = textwrap.dedent("""
+    Write one summary per audience for the same feedback. Follow each audience's brief.
+
+    {briefs}
+
+    Feedback:
+    {feedback}
+
+    Return only a JSON object whose keys are {audiences}. Each value must be a single
+    string holding that audience's summary as plain text with "-" bullet points.
+""").strip()
+
 
 class SummarizationService:
     """Service for generating summaries from form responses."""
     
+    # Defaults per detail level ("brief", "standard", "detailed")
+    DETAIL_LEVEL_MAX_POINTS = {"brief": 3, "standard": 5, "detailed": 10}
+    DETAIL_LEVEL_EXAMPLES = {"brief": 0, "standard": 2, "detailed": 5}
+    
+    # Cache key namespaces: summaries live under "summary:{form_id}:", while
+    # executive and trend caches are found by their ':'-separated segment
+    SUMMARY_CACHE_PREFIX = "summary:"
+    EXECUTIVE_CACHE_SEGMENT = "executive"
+    TRENDS_CACHE_SEGMENT = "trends"
+    
+    # LLM responses are cached by content hash of the full request
+    LLM_CACHE_PREFIX = f"{SUMMARY_CACHE_PREFIX}llm:"
+    LLM_CACHE_TTL = 3600  # seconds (1 hour)
+    
+    # Keyword sets for simple theme detection. Keywords match whole words, so
+    # plural and inflected forms are listed alongside each base word.
+    THEME_KEYWORDS = {
+        "delivery": frozenset({
+            "delivery", "deliveries", "delivered", "shipping", "shipped", "arrived",
+            "late", "package", "packages", "packaging", "tracking"
+        }),
+        "product_quality": frozenset({
+            "quality", "qualities", "product", "products", "material", "materials",
+            "durability", "defect", "defects", "defective"
+        }),
+        "customer_support": frozenset({
+            "support", "supported", "supportive", "service", "services", "help", "helped",
+            "helpful", "staff", "response", "responses"
+        }),
+        "pricing": frozenset({
+            "price", "prices", "priced", "pricing", "pricey", "cost", "costs", "costly",
+            "expensive", "cheap", "cheaper", "cheapest", "value", "values", "money"
+        }),
+        "usability": frozenset({
+            "easy", "easier", "easiest", "easily", "simple", "simpler", "intuitive",
+            "confusing", "confused", "interface", "interfaces"
+        })
+    }
+    
+    # Single alternation over every theme keyword, so each text is scanned once
+    _KEYWORD_THEMES = {kw: theme for theme, keywords in THEME_KEYWORDS.items() for kw in keywords}
+    _THEME_PATTERN = re.compile(
+        r'\b(?:' + '|'.join(map(re.escape, sorted(_KEYWORD_THEMES, key=len, reverse=True))) + r')\b'
+    )
+    _THEME_AUTOMATON = _build_theme_automaton(_KEYWORD_THEMES)
+    
     @classmethod
     def extractive_summarize(cls, texts: List[str], max_points: int = 5,
                            focus_area: str = "all") -> List[Dict[str, Any]]:
@@ -42,61 +252,144 @@ class SummarizationService:
         if not texts:
             return []
         
-        # Tokenize and calculate word frequencies
-        word_freq = defaultdict(int)
-        for text in texts:
-            words = re.findall(r'\b\w+\b', text.lower())
-            for word in words:
-                if len(word) > 3:  # Skip short words
-                    word_freq[word] += 1
-        
-        # Score sentences
-        sentence_scores = []
-        for i, text in enumerate(texts):
-            sentences = re.split(r'[.!?]+', text)
-            for sentence in sentences:
-                sentence = sentence.strip()
-                if len(sentence) < 10:
-                    continue
-                
-                # Score based on keyword density
-                words = re.findall(r'\b\w+\b', sentence.lower())
-                score = sum(word_freq.get(w, 0) for w in words)
+        sentences, scores, has_vocabulary = cls._score_sentences(texts)
+        
+        # Select top unique sentences. Only the best candidates are ranked;
+        # the pool is widened if near-duplicates use it up.
+        candidates = max_points * 4
+        while True:
+            ranked = heapq.nlargest(candidates, range(len(scores)), key=scores.__getitem__)
+            
+            selected = []
+            seen_patterns = set()
+            for index in ranked:
+                if len(selected) >= max_points:
+                    break
                 
-                # Normalize by length
-                if words:
-                    score /= len(words)
+                # Check for duplicates/similar
+                pattern = sentences[index][:50].lower()
+                if pattern in seen_patterns:
+                    continue
                 
-                sentence_scores.append({
-                    'text': sentence,
-                    'score': score,
-                    'index': i
+                seen_patterns.add(pattern)
+                selected.append({
+                    'point': sentences[index],
+                    'supporting_count': 1,
+                    'confidence': min(scores[index] / 10, 1.0) if has_vocabulary else 0.5
                 })
+            
+            if len(selected) >= max_points or candidates >= len(scores):
+                return selected
+            candidates *= 4
+    
+    @classmethod
+    def _cached_chat(cls, prompt: str, system_prompt: str, temperature: float,
+                     model: Optional[str] = None) -> str:
+        """
+        Call Ollama chat, reusing a cached response for an identical request.
         
-        # Sort by score and select top unique sentences
-        sentence_scores.sort(key=lambda x: x['score'], reverse=True)
-        
-        # Cluster by similarity and select representatives
-        selected = []
-        seen_patterns = set()
-        
-        for item in sentence_scores:
-            if len(selected) >= max_points:
-                break
+        Args:
+            prompt: User prompt
+            system_prompt: System instruction
+            temperature: Sampling temperature
+            model: Ollama model to use (defaults to config)
             
-            # Check for duplicates/similar
-            pattern = item['text'][:50].lower()
-            if pattern in seen_patterns:
-                continue
+        Returns:
+            Response text
             
-            seen_patterns.add(pattern)
-            selected.append({
-                'point': item['text'],
-                'supporting_count': 1,
-                'confidence': min(item['score'] / 10, 1.0) if word_freq else 0.5
-            })
+        Raises:
+            ConnectionError, TimeoutError: If Ollama is unavailable on a cache miss
+        """
+        from app.utils.redis_client import redis_client
         
-        return selected
+        model = model or OllamaService.get_default_model()
+        digest = hashlib.sha256(f"{model}|{temperature}|{system_prompt}|{prompt}".encode()).hexdigest()
+        cache_key = f"{cls.LLM_CACHE_PREFIX}{digest}"
+        
+        cached = redis_client.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        response = OllamaService.chat(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            model=model,
+            temperature=temperature
+        )
+        response_text = response.get('response', '')
+        if response_text:
+            redis_client.set(cache_key, response_text, ttl=cls.LLM_CACHE_TTL)
+        return response_text
+    
+    @classmethod
+    def _score_sentences(cls, texts: List[str]) -> Tuple[List[str], List[float], bool]:
+        """
+        Split texts into sentences and score them by keyword density.
+        
+        Scores are memoized by a digest of the corpus, so repeated summaries
+        of the same responses (e.g. an extractive fallback after an
+        abstractive attempt) skip re-tokenizing; only the sentence split is
+        redone on a hit.
+        
+        Args:
+            texts: List of response texts
+            
+        Returns:
+            Tuple of (sentences, scores, whether any scoring words were found)
+        """
+        corpus_hash = hashlib.blake2b(digest_size=16)
+        for text in texts:
+            encoded = text.encode('utf-8', 'surrogatepass')
+            corpus_hash.update(len(encoded).to_bytes(8, 'little'))
+            corpus_hash.update(encoded)
+        digest = corpus_hash.digest()
+        
+        with _SCORE_CACHE_LOCK:
+            cached = _SCORE_CACHE.get(digest)
+            if cached is not None:
+                _SCORE_CACHE.move_to_end(digest)
+        if cached is not None:
+            cached_scores, has_vocabulary = cached
+            sentences = [
+                sentence
+                for text in texts
+                for sentence in map(str.strip, _SENTENCE_SPLIT_RE.split(text))
+                if len(sentence) >= 10
+            ]
+            return sentences, list(cached_scores), has_vocabulary
+        
+        # Tokenize each sentence once; the tokens feed both the word
+        # frequencies and the sentence scores. Sentences partition the text,
+        # so every character is lowercased exactly once.
+        word_freq = Counter()
+        sentences = []
+        sentence_words = []
+        for text in texts:
+            for sentence in _SENTENCE_SPLIT_RE.split(text):
+                words = _WORD_RE.findall(sentence.lower())
+                word_freq.update(words)
+                
+                sentence = sentence.strip()
+                if len(sentence) >= 10:
+                    sentences.append(sentence)
+                    sentence_words.append(words)
+        
+        # Skip short words (pruned over the vocabulary, not every token)
+        for word in [w for w in word_freq if len(w) <= 3]:
+            del word_freq[word]
+        
+        # Score sentences based on keyword density, normalized by length
+        scores = [
+            sum(map(word_freq.get, words, repeat(0))) / len(words) if words else 0
+            for words in sentence_words
+        ]
+        
+        has_vocabulary = bool(word_freq)
+        with _SCORE_CACHE_LOCK:
+            _SCORE_CACHE[digest] = (array('d', scores), has_vocabulary)
+            while len(_SCORE_CACHE) > _SCORE_CACHE_SIZE:
+                _SCORE_CACHE.popitem(last=False)
+        return sentences, scores, has_vocabulary
     
     @classmethod
     def abstractive_summarize(cls, texts: List[str], prompt_template: str,
@@ -112,11 +405,8 @@ class SummarizationService:
         Returns:
             Generated summary text
         """
-        # Limit context size
-        combined_text = " ".join(texts[:100])  # Limit to first 100 responses
-        max_chars = 8000  # Token limit safety
-        if len(combined_text) > max_chars:
-            combined_text = combined_text[:max_chars] + "..."
+        # Limit context size: 8000 chars for token limit safety
+        combined_text = _join_budget(texts, 8000, suffix="...")
         
         prompt = prompt_template.format(
             response_count=len(texts),
@@ -124,15 +414,13 @@ class SummarizationService:
         )
         
         try:
-            response = OllamaService.chat(
+            return cls._cached_chat(
                 prompt=prompt,
                 system_prompt="You are a helpful assistant that summarizes user feedback concisely.",
                 model=model,
                 temperature=0.5
             )
             
-            return response.get('response', '')
-            
         except (ConnectionError, TimeoutError):
             current_app.logger.warning("Ollama unavailable for summarization")
             raise
@@ -163,12 +451,7 @@ class SummarizationService:
         
         # Apply detail level presets if max_points not explicitly provided
         if max_points is None:
-            detail_presets = {
-                "brief": 3,
-                "standard": 5,
-                "detailed": 10
-            }
-            max_points = detail_presets.get(detail_level, 5)
+            max_points = cls.DETAIL_LEVEL_MAX_POINTS.get(detail_level, 5)
         
         # Apply detail level to include_examples if not in config
         if 'include_examples' not in config:
@@ -187,25 +470,23 @@ class SummarizationService:
             "strategy": strategy
         }
         
-        # Extract text and group by sentiment
+        # Extract text and count responses per sentiment
         all_texts = [str(t.get('text', t.get('data', {}))) for t in texts]
-        sentiment_groups = defaultdict(list)
-        
-        for i, t in enumerate(texts):
-            sentiment = t.get('sentiment', {}).get('label', 'neutral') if include_sentiment else 'all'
-            sentiment_groups[sentiment].append(all_texts[i])
+        if include_sentiment:
+            sentiment_counts = Counter(t.get('sentiment', {}).get('label', 'neutral') for t in texts)
+        else:
+            sentiment_counts = Counter({'all': len(texts)} if texts else {})
         
         if strategy == "extractive":
             bullet_points = cls.extractive_summarize(all_texts, max_points, focus_area)
             theme_analysis = cls._analyze_themes(all_texts, detail_level, include_examples)
             
         elif strategy == "abstractive":
-            prompt = f"""
-            Summarize the following {len(texts)} feedback responses into {max_points} key bullet points.
-            Focus on: {focus_area}
-            
-            Responses:
-            """
+            prompt = _ABSTRACTIVE_PROMPT.format_map({
+                'response_count': len(texts),
+                'max_points': max_points,
+                'focus_area': focus_area
+            })
             
             try:
                 abstract_summary = cls.abstractive_summarize(all_texts, prompt)
@@ -229,12 +510,7 @@ class SummarizationService:
         # Apply detail level logic for examples
         examples_count = 0
         if include_examples:
-            example_presets = {
-                "brief": 0,
-                "standard": 2,
-                "detailed": 5
-            }
-            examples_count = example_presets.get(detail_level, 2)
+            examples_count = cls.DETAIL_LEVEL_EXAMPLES.get(detail_level, 2)
             
             # Add examples to bullet points if requested
             if examples_count > 0 and bullet_points:
@@ -247,13 +523,68 @@ class SummarizationService:
             "format": format_type,
             "bullet_points": bullet_points,
             "theme_analysis": theme_analysis,
-            "sentiment_breakdown": {
-                s: len(t) for s, t in sentiment_groups.items()
-            },
+            "sentiment_breakdown": dict(sentiment_counts),
             "custom_config": custom_config,
             "points_generated": len(bullet_points)
         }
     
+    @classmethod
+    def summarize_many(cls, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run several hybrid_summarize jobs concurrently.
+        
+        Ollama calls are network-bound, so jobs run on a thread pool sized to
+        OLLAMA_POOL_SIZE (the Ollama session pool) and overlap their LLM round
+        trips instead of running back-to-back. Ollama itself serves at most
+        OLLAMA_NUM_PARALLEL requests per loaded model at once.
+        
+        Args:
+            jobs: List of keyword-argument dicts for hybrid_summarize
+            
+        Returns:
+            Summary results in the same order as jobs
+        """
+        if len(jobs) <= 1:
+            return [cls.hybrid_summarize(**job) for job in jobs]
+        
+        app = current_app._get_current_object()
+        max_workers = min(len(jobs), app.config.get("OLLAMA_POOL_SIZE", 5))
+        
+        def run(job: Dict[str, Any]) -> Dict[str, Any]:
+            with app.app_context():
+                return cls.hybrid_summarize(**job)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(run, jobs))
+    
+    @classmethod
+    def _match_themes(cls, text_lower: str) -> set:
+        """
+        Find the themes whose keywords appear as whole words in a text.
+        
+        Uses a single Aho-Corasick pass when pyahocorasick is installed,
+        otherwise the precompiled keyword alternation.
+        
+        Args:
+            text_lower: Lowercased text
+            
+        Returns:
+            Set of matched theme names
+        """
+        if cls._THEME_AUTOMATON is None:
+            return {cls._KEYWORD_THEMES[kw] for kw in cls._THEME_PATTERN.findall(text_lower)}
+        
+        matched = set()
+        last = len(text_lower) - 1
+        for end, (theme, length) in cls._THEME_AUTOMATON.iter(text_lower):
+            start = end - length + 1
+            if start > 0 and _is_word_char(text_lower[start - 1]):
+                continue
+            if end < last and _is_word_char(text_lower[end + 1]):
+                continue
+            matched.add(theme)
+        return matched
+    
     @classmethod
     def _analyze_themes(cls, texts: List[str], detail_level: str = "standard",
                        include_examples: bool = True) -> Dict[str, Any]:
@@ -268,26 +599,22 @@ class SummarizationService:
         Returns:
             Theme analysis dict
         """
-        # Simple keyword-based theme detection
-        theme_keywords = {
-            "delivery": ["delivery", "shipping", "arrived", "late", "package", "tracking"],
-            "product_quality": ["quality", "product", "material", "durability", "defect"],
-            "customer_support": ["support", "service", "help", "staff", "response"],
-            "pricing": ["price", "cost", "expensive", "cheap", "value", "money"],
-            "usability": ["easy", "simple", "intuitive", "confusing", "interface"]
-        }
+        # Only collect as many examples as the detail level will report
+        examples_count = cls.DETAIL_LEVEL_EXAMPLES.get(detail_level, 2) if include_examples else 0
         
+        # Simple keyword-based theme detection
         theme_counts = defaultdict(int)
         theme_examples = defaultdict(list)
         
         for text in texts:
-            text_lower = text.lower()
-            for theme, keywords in theme_keywords.items():
-                if any(kw in text_lower for kw in keywords):
+            matched_themes = cls._match_themes(text.lower())
+            for theme in cls.THEME_KEYWORDS:
+                if theme in matched_themes:
                     theme_counts[theme] += 1
                     # Collect examples for each theme
-                    if include_examples and len(theme_examples[theme]) < 5:
-                        theme_examples[theme].append(text[:150])
+                    examples = theme_examples[theme]
+                    if len(examples) < examples_count:
+                        examples.append(text[:150])
         
         # Apply detail level logic
         result = {}
@@ -298,14 +625,8 @@ class SummarizationService:
             }
             
             # Add examples if requested and detail level allows
-            if include_examples and detail_level != "brief":
-                example_presets = {
-                    "standard": 2,
-                    "detailed": 5
-                }
-                examples_count = example_presets.get(detail_level, 2)
-                if theme_examples[theme]:
-                    theme_data["examples"] = theme_examples[theme][:examples_count]
+            if theme_examples[theme]:
+                theme_data["examples"] = theme_examples[theme]
             
             result[theme] = theme_data
         
@@ -327,36 +648,27 @@ class SummarizationService:
         Returns:
             Theme analysis dict
         """
-        combined = " ".join(texts[:50])[:4000]
+        combined = _join_budget(texts, 4000)
         
         # Adjust prompt based on detail level
         examples_instruction = ""
         if include_examples and detail_level != "brief":
             examples_instruction = "- Include 2-5 example quotes for each theme" if detail_level == "detailed" else "- Include 2 example quotes for each theme"
         
-        prompt = f"""
-        Analyze the following feedback responses and identify main themes.
-        Focus on: {focus_area}
-        
-        {examples_instruction}
-        
-        Feedback:
-        {combined}
-        
-        Return a JSON object with:
-        - themes: array of theme objects with name, mention_count, summary
-        - overall_sentiment: overall sentiment assessment
-        """
+        prompt = _THEME_ANALYSIS_PROMPT.format_map({
+            'focus_area': focus_area,
+            'examples_instruction': examples_instruction,
+            'feedback': combined
+        })
         
         try:
-            response = OllamaService.chat(
+            response_text = cls._cached_chat(
                 prompt=prompt,
                 system_prompt="You are a feedback analyst. Return only valid JSON.",
                 temperature=0.3
             )
             
-            import json
-            result = json.loads(response.get('response', '{}'))
+            result = json.loads(response_text)
             return result
             
         except (ConnectionError, TimeoutError, json.JSONDecodeError):
@@ -383,12 +695,7 @@ class SummarizationService:
         """
         # Apply detail level presets if max_points not explicitly provided
         if max_points is None:
-            detail_presets = {
-                "brief": 3,
-                "standard": 5,
-                "detailed": 10
-            }
-            max_points = detail_presets.get(detail_level, 5)
+            max_points = cls.DETAIL_LEVEL_MAX_POINTS.get(detail_level, 5)
         
         # Track custom configuration
         custom_config = {
@@ -399,107 +706,173 @@ class SummarizationService:
             "tone": tone
         }
         
-        prompt_templates = {
-            "leadership": """
-            Provide an executive summary for leadership about these {count} feedback responses.
-            
-            Include:
-            - Overview (2-3 sentences on overall sentiment)
-            - Key findings (3-4 bullet points)
-            - Recommendations (2-3 actionable items)
-            - Key metrics (sentiment breakdown, response rate)
-            
-            Feedback:
-            {feedback}
-            """,
-            
-            "operations": """
-            Provide an operational summary for the operations team about these {count} feedback responses.
-            
-            Focus on:
-            - Specific issues mentioned
-            - Action items for operations
-            - Priority concerns
-            
-            Feedback:
-            {feedback}
-            """,
-            
-            "product": """
-            Provide a product summary for the product team about these {count} feedback responses.
-            
-            Focus on:
-            - Product-related feedback
-            - Feature requests
-            - Quality concerns
-            
-            Feedback:
-            {feedback}
-            """
-        }
-        
-        combined = " ".join(texts[:100])[:5000]
-        prompt = prompt_templates.get(audience, prompt_templates["leadership"]).format(
-            count=len(texts),
-            feedback=combined
-        )
+        combined = _join_budget(texts, 5000)
+        prompt = _EXECUTIVE_PROMPTS.get(audience, _EXECUTIVE_PROMPTS["leadership"]).format_map({
+            'count': len(texts),
+            'feedback': combined
+        })
         
         try:
-            response = OllamaService.chat(
+            response_text = cls._cached_chat(
                 prompt=prompt,
                 system_prompt=f"You are an executive reporting assistant. Use a {tone} tone.",
                 temperature=0.5
             )
+        except (ConnectionError, TimeoutError):
+            return cls._executive_fallback(texts, custom_config)
+        
+        return cls._parse_executive_response(response_text, texts, max_points, detail_level,
+                                             include_examples, custom_config)
+    
+    @classmethod
+    def generate_executive_summaries(cls, texts: List[str], audiences: List[str],
+                                     tone: str = "formal", max_points: Optional[int] = None,
+                                     detail_level: str = "standard",
+                                     include_examples: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate executive summaries for several audiences in one LLM call.
+        
+        The feedback is embedded in the prompt once and the model returns a
+        JSON object keyed by audience, instead of one full prompt per audience.
+        Audiences missing from an unparseable or partial reply are generated
+        individually with generate_executive_summary.
+        
+        Args:
+            texts: List of response texts
+            audiences: Target audiences (leadership, operations, product)
+            tone: Summary tone (formal, concise)
+            max_points: Override default max bullet points (3-10)
+            detail_level: Detail level ("brief", "standard", "detailed")
+            include_examples: Whether to include example quotes
             
-            response_text = response.get('response', '')
-            
-            # Parse structured response
-            lines = response_text.split('\n')
-            key_findings = [l for l in lines if l.strip().startswith(('-', '•', '*'))]
-            recommendations = [l for l in lines if 'recommend' in l.lower() or 'should' in l.lower()]
-            
-            # Apply detail level logic for key findings
-            findings_count = max_points
-            key_findings = key_findings[:findings_count]
-            
-            # Add examples if requested
-            if include_examples:
-                example_presets = {
-                    "brief": 0,
-                    "standard": 2,
-                    "detailed": 5
-                }
-                examples_count = example_presets.get(detail_level, 2)
-                if examples_count > 0 and texts:
-                    # Add example quotes to key findings
-                    for i in range(min(examples_count, len(key_findings))):
-                        if i < len(texts):
-                            key_findings[i] = f"{key_findings[i]} Example: \"{texts[i][:100]}...\""
-            
+        Returns:
+            Dict mapping each audience to its executive summary dict
+        """
+        audiences = list(dict.fromkeys(audiences))
+        options = {
+            "tone": tone,
+            "max_points": max_points,
+            "detail_level": detail_level,
+            "include_examples": include_examples
+        }
+        if len(audiences) <= 1:
+            return {a: cls.generate_executive_summary(texts, audience=a, **options) for a in audiences}
+        
+        if max_points is None:
+            max_points = cls.DETAIL_LEVEL_MAX_POINTS.get(detail_level, 5)
+        
+        def config_for(audience: str) -> Dict[str, Any]:
             return {
-                "overview": response_text.split('\n')[0] if '\n' in response_text else response_text,
-                "key_findings": key_findings,
-                "recommendations": recommendations[:3],
-                "metrics": {
-                    "total_responses": len(texts),
-                    "response_rate": 0.78  # Would be calculated from actual data
-                },
-                "custom_config": custom_config,
-                "points_generated": len(key_findings)
+                "max_points": max_points,
+                "detail_level": detail_level,
+                "include_examples": include_examples,
+                "audience": audience,
+                "tone": tone
             }
-            
+        
+        count = len(texts)
+        prompt = _MULTI_AUDIENCE_PROMPT.format_map({
+            'briefs': "\n\n".join(
+                f"[{a}]\n{_EXECUTIVE_BRIEFS.get(a, _EXECUTIVE_BRIEFS['leadership']).format_map({'count': count})}"
+                for a in audiences
+            ),
+            'feedback': _join_budget(texts, 5000),
+            'audiences': ", ".join(f'"{a}"' for a in audiences)
+        })
+        
+        sections = {}
+        try:
+            response_text = cls._cached_chat(
+                prompt=prompt,
+                system_prompt=f"You are an executive reporting assistant. Use a {tone} tone. Return only valid JSON.",
+                temperature=0.5
+            )
+            parsed = json.loads(response_text)
+            if isinstance(parsed, dict):
+                sections = {a: parsed[a] for a in audiences if isinstance(parsed.get(a), str)}
         except (ConnectionError, TimeoutError):
-            return {
-                "overview": f"Analysis of {len(texts)} responses shows mixed sentiment.",
-                "key_findings": ["Unable to generate detailed findings - Ollama unavailable"],
-                "recommendations": ["Retry when Ollama service is available"],
-                "metrics": {
-                    "total_responses": len(texts),
-                    "response_rate": 0.78
-                },
-                "custom_config": custom_config,
-                "points_generated": 1
-            }
+            return {a: cls._executive_fallback(texts, config_for(a)) for a in audiences}
+        except ValueError:
+            current_app.logger.warning("Batched executive summary was not valid JSON, generating per audience")
+        
+        results = {}
+        for audience in audiences:
+            if audience not in sections:
+                results[audience] = cls.generate_executive_summary(texts, audience=audience, **options)
+                continue
+            results[audience] = cls._parse_executive_response(
+                sections[audience], texts, max_points, detail_level, include_examples, config_for(audience)
+            )
+        return results
+    
+    @classmethod
+    def _parse_executive_response(cls, response_text: str, texts: List[str], max_points: int,
+                                  detail_level: str, include_examples: bool,
+                                  custom_config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build an executive summary dict from raw LLM output.
+        
+        Args:
+            response_text: LLM response text
+            texts: List of response texts (for example quotes)
+            max_points: Maximum key findings to keep
+            detail_level: Detail level ("brief", "standard", "detailed")
+            include_examples: Whether to include example quotes
+            custom_config: Configuration echoed back to the caller
+            
+        Returns:
+            Executive summary dict
+        """
+        # Parse structured response in a single pass over the lines
+        lines = response_text.split('\n')
+        key_findings = []
+        recommendations = []
+        for line in lines:
+            if line.lstrip().startswith(('-', '•', '*')):
+                key_findings.append(line)
+            line_lower = line.lower()
+            if 'recommend' in line_lower or 'should' in line_lower:
+                recommendations.append(line)
+        
+        # Apply detail level logic for key findings
+        findings_count = max_points
+        key_findings = key_findings[:findings_count]
+        
+        # Add examples if requested
+        if include_examples:
+            examples_count = cls.DETAIL_LEVEL_EXAMPLES.get(detail_level, 2)
+            if examples_count > 0 and texts:
+                # Add example quotes to key findings
+                for i in range(min(examples_count, len(key_findings))):
+                    if i < len(texts):
+                        key_findings[i] = f"{key_findings[i]} Example: \"{texts[i][:100]}...\""
+        
+        return {
+            "overview": lines[0],
+            "key_findings": key_findings,
+            "recommendations": recommendations[:3],
+            "metrics": {
+                "total_responses": len(texts),
+                "response_rate": 0.78  # Would be calculated from actual data
+            },
+            "custom_config": custom_config,
+            "points_generated": len(key_findings)
+        }
+    
+    @staticmethod
+    def _executive_fallback(texts: List[str], custom_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Placeholder executive summary used when Ollama is unavailable."""
+        return {
+            "overview": f"Analysis of {len(texts)} responses shows mixed sentiment.",
+            "key_findings": ["Unable to generate detailed findings - Ollama unavailable"],
+            "recommendations": ["Retry when Ollama service is available"],
+            "metrics": {
+                "total_responses": len(texts),
+                "response_rate": 0.78
+            },
+            "custom_config": custom_config,
+            "points_generated": 1
+        }
     
     @classmethod
     def save_summary_snapshot(cls, form_id: str, summary_data: Dict[str, Any],
@@ -555,18 +928,31 @@ class SummarizationService:
         """
         from datetime import datetime as dt
         
-        # Retrieve snapshots for each period
-        snapshots = []
+        periods = []
         for period in period_ranges:
             period_start = dt.fromisoformat(period['start'].replace('Z', '+00:00'))
             period_end = dt.fromisoformat(period['end'].replace('Z', '+00:00'))
-            
-            # Find snapshot matching this period
-            snapshot = SummarySnapshot.objects(
-                form_id=form_id,
-                period_start__gte=period_start,
-                period_end__lte=period_end
-            ).order_by('-timestamp').first()
+            periods.append((period, cls._as_naive_utc(period_start), cls._as_naive_utc(period_end)))
+        
+        # Fetch candidate snapshots for all periods in one query (newest first)
+        candidates = []
+        if periods:
+            period_filter = reduce(operator.or_, (
+                Q(period_start__gte=start, period_end__lte=end) for _, start, end in periods
+            ))
+            candidates = list(
+                SummarySnapshot.objects(form_id=form_id).filter(period_filter)
+                .only('id', 'timestamp', 'period_start', 'period_end', 'summary_data', 'response_count')
+                .order_by('-timestamp')
+            )
+        
+        # Assign each period its newest snapshot lying within the range
+        snapshots = []
+        for period, period_start, period_end in periods:
+            snapshot = next((
+                c for c in candidates
+                if cls._as_naive_utc(c.period_start) >= period_start and cls._as_naive_utc(c.period_end) <= period_end
+            ), None)
             
             if snapshot:
                 snapshots.append({
@@ -596,17 +982,9 @@ class SummarizationService:
         # Sentiment trend comparison
         sentiment_trends = []
         for snap in snapshots:
-            sentiment_breakdown = snap['data'].get('sentiment_breakdown', {})
-            total = sum(sentiment_breakdown.values()) if sentiment_breakdown else 1
-            positive_pct = (sentiment_breakdown.get('positive', 0) / total) * 100 if total > 0 else 0
-            negative_pct = (sentiment_breakdown.get('negative', 0) / total) * 100 if total > 0 else 0
-            neutral_pct = (sentiment_breakdown.get('neutral', 0) / total) * 100 if total > 0 else 0
-            
             sentiment_trends.append({
                 'period': snap['period'],
-                'positive_pct': round(positive_pct, 2),
-                'negative_pct': round(negative_pct, 2),
-                'neutral_pct': round(neutral_pct, 2),
+                **cls._sentiment_percentages(snap['data'].get('sentiment_breakdown', {})),
                 'total_responses': snap['response_count']
             })
         
@@ -669,6 +1047,32 @@ class SummarizationService:
         
         return comparison
     
+    @staticmethod
+    def _sentiment_percentages(sentiment_breakdown: Dict[str, int]) -> Dict[str, float]:
+        """
+        Compute positive/negative/neutral shares of a sentiment breakdown.
+        
+        Args:
+            sentiment_breakdown: Response counts per sentiment label
+            
+        Returns:
+            Dict with 'positive_pct', 'negative_pct', 'neutral_pct' rounded to 2 places
+        """
+        total = sum(sentiment_breakdown.values()) if sentiment_breakdown else 1
+        if total <= 0:
+            return {'positive_pct': 0, 'negative_pct': 0, 'neutral_pct': 0}
+        return {
+            f'{label}_pct': round((sentiment_breakdown.get(label, 0) / total) * 100, 2)
+            for label in ('positive', 'negative', 'neutral')
+        }
+    
+    @staticmethod
+    def _as_naive_utc(value: datetime) -> datetime:
+        """Normalize a datetime to naive UTC, as MongoDB returns them."""
+        if value.tzinfo is None:
+            return value
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    
     @classmethod
     def get_summary_trends(cls, form_id: str, metric: str = "sentiment",
                           limit: int = 10) -> Dict[str, Any]:
@@ -683,10 +1087,14 @@ class SummarizationService:
         Returns:
             Trend data dict
         """
-        # Get recent snapshots
-        snapshots = SummarySnapshot.objects(
+        # Get recent snapshots, loading the summary blob only for metrics that read it
+        fields = ['id', 'timestamp', 'period_label', 'period_start', 'period_end', 'response_count']
+        if metric in ("sentiment", "theme"):
+            fields.append('summary_data')
+        
+        snapshots = list(SummarySnapshot.objects(
             form_id=form_id
-        ).order_by('-timestamp').limit(limit)
+        ).only(*fields).order_by('-timestamp').limit(limit))
         
         if not snapshots:
             return {
@@ -697,7 +1105,7 @@ class SummarizationService:
             }
         
         # Reverse to get chronological order
-        snapshots = list(snapshots)[::-1]
+        snapshots.reverse()
         
         trend_data = {
             'form_id': form_id,
@@ -718,11 +1126,7 @@ class SummarizationService:
             
             # Add metric-specific data
             if metric == "sentiment":
-                sentiment_breakdown = snapshot.summary_data.get('sentiment_breakdown', {})
-                total = sum(sentiment_breakdown.values()) if sentiment_breakdown else 1
-                data_point['positive_pct'] = round((sentiment_breakdown.get('positive', 0) / total) * 100, 2) if total > 0 else 0
-                data_point['negative_pct'] = round((sentiment_breakdown.get('negative', 0) / total) * 100, 2) if total > 0 else 0
-                data_point['neutral_pct'] = round((sentiment_breakdown.get('neutral', 0) / total) * 100, 2) if total > 0 else 0
+                data_point.update(cls._sentiment_percentages(snapshot.summary_data.get('sentiment_breakdown', {})))
             
             elif metric == "theme":
                 theme_analysis = snapshot.summary_data.get('theme_analysis', {})
@@ -760,9 +1164,19 @@ class SummarizationService:
         Returns:
             Cache key string
         """
-        subset_hash = hashlib.md5("-".join(sorted(response_ids)).encode()).hexdigest()
-        config_hash = hashlib.md5(str(config).encode()).hexdigest()
-        return f"summary:{form_id}:{subset_hash}:{strategy}:{config_hash}"
+        # Feed the sorted IDs in batches so large subsets never build the
+        # whole joined string; the digest matches hashing "-".join(...)
+        sorted_ids = sorted(response_ids)
+        subset_hasher = hashlib.blake2b(digest_size=16)
+        for start in range(0, len(sorted_ids), _KEY_HASH_CHUNK):
+            chunk = "-".join(sorted_ids[start:start + _KEY_HASH_CHUNK])
+            subset_hasher.update((f"-{chunk}" if start else chunk).encode())
+        subset_hash = subset_hasher.hexdigest()
+        # Canonical JSON so logically equal configs share a key regardless of
+        # key insertion order
+        canonical_config = json.dumps(config, sort_keys=True, separators=(',', ':'), default=str)
+        config_hash = hashlib.blake2b(canonical_config.encode(), digest_size=16).hexdigest()
+        return f"{cls.SUMMARY_CACHE_PREFIX}{form_id}:{subset_hash}:{strategy}:{config_hash}"
     
     # --- Cache Invalidation Methods ---
     # Task: M2-INT-01b - Add cache invalidation rules
@@ -794,23 +1208,10 @@ class SummarizationService:
         
         # Pattern: Invalidate all summary cache
         if pattern == "all":
-            # Clear all summary:* keys from memory cache
-            keys_to_delete = [
-                k for k in redis_client._memory_cache.keys()
-                if k.startswith('summary:')
-            ]
-            for key in keys_to_delete:
-                redis_client.delete(key)
-                keys_invalidated += 1
-            
-            # Also clear executive summary cache
-            exec_keys = [
-                k for k in redis_client._memory_cache.keys()
-                if 'executive' in k
-            ]
-            for key in exec_keys:
-                redis_client.delete(key)
-                keys_invalidated += 1
+            # Clear all summary:* keys plus executive summary cache
+            keys_to_delete = set(redis_client.keys_with_prefix(cls.SUMMARY_CACHE_PREFIX))
+            keys_to_delete.update(redis_client.keys_with_segment(cls.EXECUTIVE_CACHE_SEGMENT))
+            keys_invalidated = redis_client.delete_many(list(keys_to_delete))
             
             current_app.logger.info(f"Invalidated all summary cache: {keys_invalidated} keys")
             return keys_invalidated
@@ -822,22 +1223,17 @@ class SummarizationService:
                 return 0
             
             # Clear all summary keys for this form
-            keys_to_delete = [
-                k for k in redis_client._memory_cache.keys()
-                if k.startswith(f'summary:{form_id}:')
-            ]
+            form_prefix = f"{cls.SUMMARY_CACHE_PREFIX}{form_id}:"
+            keys_to_delete = redis_client.keys_with_prefix(form_prefix)
             
             # Clear executive summary cache for this form
-            exec_keys = [
-                k for k in redis_client._memory_cache.keys()
-                if f'executive:{form_id}' in k
-            ]
-            
-            keys_to_delete.extend(exec_keys)
+            exec_marker = f"{cls.EXECUTIVE_CACHE_SEGMENT}:{form_id}"
+            keys_to_delete.extend(
+                k for k in redis_client.keys_with_segment(cls.EXECUTIVE_CACHE_SEGMENT)
+                if exec_marker in k
+            )
             
-            for key in keys_to_delete:
-                redis_client.delete(key)
-                keys_invalidated += 1
+            keys_invalidated = redis_client.delete_many(keys_to_delete)
             
             current_app.logger.info(f"Invalidated cache for form {form_id}: {keys_invalidated} keys")
             return keys_invalidated
@@ -850,15 +1246,11 @@ class SummarizationService:
             
             # Clear user-specific summary cache
             # Note: Summaries are typically form-scoped, not user-scoped
-            # This clears any user-specific trend analysis cache
-            keys_to_delete = [
-                k for k in redis_client._memory_cache.keys()
-                if 'trends' in k and user_id in k
-            ]
+            # This clears any user-specific trend analysis cache, i.e. keys
+            # carrying both a "trends" and a user_id segment
+            keys_to_delete = redis_client.keys_with_segment(cls.TRENDS_CACHE_SEGMENT, user_id)
             
-            for key in keys_to_delete:
-                redis_client.delete(key)
-                keys_invalidated += 1
+            keys_invalidated = redis_client.delete_many(keys_to_delete)
             
             current_app.logger.info(f"Invalidated cache for user {user_id}: {keys_invalidated} keys")
             return keys_invalidated
@@ -873,14 +1265,8 @@ class SummarizationService:
             # Since we can't easily match without storing metadata,
             # we'll clear all summary cache for the form if form_id is provided
             if form_id:
-                keys_to_delete = [
-                    k for k in redis_client._memory_cache.keys()
-                    if k.startswith(f'summary:{form_id}:')
-                ]
-                
-                for key in keys_to_delete:
-                    redis_client.delete(key)
-                    keys_invalidated += 1
+                keys_to_delete = redis_client.keys_with_prefix(f"{cls.SUMMARY_CACHE_PREFIX}{form_id}:")
+                keys_invalidated = redis_client.delete_many(keys_to_delete)
             
             current_app.logger.info(f"Invalidated cache for {len(response_ids)} responses: {keys_invalidated} keys")
             return keys_invalidated
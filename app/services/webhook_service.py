@@ -1,50 +1,278 @@
+import base64
+import json
+import hmac
+import hashlib
+import math
 import requests
 import time
 import random
-from typing import Dict, Any, Optional, List
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Optional, List, Tuple
+from urllib.parse import urlsplit
 from datetime import datetime, timezone, timedelta
+from email.utils import parsedate_to_datetime
+from bson import ObjectId
+from bson.errors import InvalidId
 from flask import current_app
+from mongoengine.queryset.visitor import Q
 from app.models.WebhookLog import WebhookLog
 from app.models.WebhookDelivery import WebhookDelivery
 
 
+class EndpointUnavailable(requests.exceptions.RequestException):
+    """Raised when a delivery attempt is skipped because its endpoint is unavailable."""
+
+
 class WebhookService:
     """
     Service for reliable webhook delivery with retry mechanism and failure logging.
     
     Features:
-    - Exponential backoff with jitter for retry delays
+    - Exponential backoff with full jitter for retry delays
     - Dead letter queue detection for server errors
     - Configurable max retries
+    - Per-endpoint concurrency limit and circuit breaker
     - Comprehensive delivery tracking
     """
     
-    # Dead letter queue status codes - these should trigger retries
-    DEAD_LETTER_CODES = [429, 502, 503, 504] + list(range(500, 600))
+    # Dead letter queue status codes - these should trigger retries. Other 4xx
+    # responses are permanent failures and are not retried.
+    DEAD_LETTER_CODES = frozenset({408, 425, 429, *range(500, 600)})
     
     # Exponential backoff base delays in seconds: 1s, 2s, 4s, 8s, 16s, 32s, 64s
     BACKOFF_DELAYS = [1, 2, 4, 8, 16, 32, 64]
     
+    # Retryable request error types and the suffix reported when they exhaust retries
+    FAILURE_REASONS = {
+        'timeout': " (timeout)",
+        'connection': " (connection error)",
+        'unavailable': " (endpoint unavailable)"
+    }
+    
+    # Response body bytes kept on the delivery record
+    RESPONSE_BODY_LIMIT = 1024
+    
+    # Delivery fields that change between attempts
+    CHECKPOINT_FIELDS = (
+        'status', 'attempt_count', 'last_attempt_at', 'next_retry_at',
+        'response_code', 'response_body', 'error_message', 'metadata'
+    )
+    
+    # Response headers recorded in delivery metadata
+    RECORDED_RESPONSE_HEADERS = ('content-type', 'content-length', 'x-request-id')
+    
+    # Request headers holding credentials (as are any ending in "-token"); they
+    # are stored encrypted instead of in request_headers
+    SENSITIVE_REQUEST_HEADERS = frozenset({'authorization', 'proxy-authorization', 'cookie'})
+    
+    # Shared HTTP session so deliveries reuse pooled keep-alive connections
+    _session: Optional[requests.Session] = None
+    _session_lock = threading.Lock()
+    
+    # Shared worker pool for deliveries that must not block the caller
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+    
+    # Final statuses that can never change again (failed deliveries may be retried)
+    IMMUTABLE_STATUSES = frozenset({'success', 'cancelled'})
+    
+    # Serialized deliveries with an immutable status, most recently used last
+    STATUS_CACHE_SIZE = 10000
+    _status_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    _status_cache_lock = threading.Lock()
+    
+    # Per-host in-flight limits and circuit breaker state
+    # ({'failures': consecutive failures, 'open_until': monotonic deadline})
+    _host_slots: Dict[str, threading.BoundedSemaphore] = {}
+    _circuits: Dict[str, Dict[str, float]] = {}
+    _host_lock = threading.Lock()
+    
+    # Deliveries queued or waiting on a retry timer in this process
+    _inflight: set = set()
+    _inflight_lock = threading.Lock()
+    
+    # Scheduler thread picking up scheduled deliveries and lost retries
+    _scheduler_thread: Optional[threading.Thread] = None
+    _scheduler_running = False
+    
+    # Events waiting to be posted together, keyed by webhook_id
+    _batches: Dict[str, Dict[str, Any]] = {}
+    _batches_lock = threading.Lock()
+    
+    @classmethod
+    def _get_session(cls) -> requests.Session:
+        """
+        Get the shared HTTP session, creating it on first use.
+        
+        Retries are handled by send_webhook, so the adapter never retries, and
+        cookies are not kept so deliveries stay independent of each other.
+        
+        Returns:
+            requests.Session with a connection pool per target host
+        """
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    pool_size = current_app.config.get("WEBHOOK_POOL_SIZE", 50)
+                    adapter = HTTPAdapter(
+                        pool_connections=pool_size,
+                        pool_maxsize=pool_size,
+                        max_retries=0
+                    )
+                    session = requests.Session()
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                    cls._session = session
+        return cls._session
+    
+    @classmethod
+    def _host_slot(cls, host: str) -> threading.BoundedSemaphore:
+        """
+        Get the semaphore limiting concurrent deliveries to a host.
+        
+        Args:
+            host: Endpoint host (netloc)
+        
+        Returns:
+            BoundedSemaphore sized by WEBHOOK_HOST_CONCURRENCY
+        """
+        slot = cls._host_slots.get(host)
+        if slot is None:
+            with cls._host_lock:
+                slot = cls._host_slots.get(host)
+                if slot is None:
+                    slot = threading.BoundedSemaphore(
+                        current_app.config.get("WEBHOOK_HOST_CONCURRENCY", 4)
+                    )
+                    cls._host_slots[host] = slot
+        return slot
+    
+    @classmethod
+    def _circuit_open(cls, host: str) -> bool:
+        """
+        Check whether a host's circuit is open.
+        
+        Args:
+            host: Endpoint host (netloc)
+        
+        Returns:
+            True while the host is in its failure cooldown
+        """
+        with cls._host_lock:
+            state = cls._circuits.get(host)
+            return state is not None and state['open_until'] > time.monotonic()
+    
+    @classmethod
+    def _record_outcome(cls, host: str, healthy: bool) -> None:
+        """
+        Update a host's circuit after a delivery attempt.
+        
+        A healthy response closes the circuit. After WEBHOOK_CIRCUIT_THRESHOLD
+        consecutive failures it opens for WEBHOOK_CIRCUIT_COOLDOWN seconds, and
+        each further failure once the cooldown ends reopens it.
+        
+        Args:
+            host: Endpoint host (netloc)
+            healthy: False for timeouts, connection errors and retryable statuses
+        """
+        with cls._host_lock:
+            if healthy:
+                cls._circuits.pop(host, None)
+                return
+            state = cls._circuits.setdefault(host, {'failures': 0, 'open_until': 0.0})
+            state['failures'] += 1
+            if state['failures'] >= current_app.config.get("WEBHOOK_CIRCUIT_THRESHOLD", 10):
+                state['open_until'] = time.monotonic() + current_app.config.get("WEBHOOK_CIRCUIT_COOLDOWN", 30)
+    
+    @classmethod
+    def _post(cls, url: str, body: bytes, headers: Dict[str, str], timeout: int) -> requests.Response:
+        """
+        Send one delivery attempt, guarded by the host's circuit and in-flight limit.
+        
+        Args:
+            url: Target webhook URL
+            body: Encoded JSON body
+            headers: HTTP headers
+            timeout: Request timeout in seconds (also the wait for a free slot)
+        
+        Returns:
+            HTTP response from the endpoint
+        
+        Raises:
+            EndpointUnavailable: If the circuit is open or no slot frees up in time
+            requests.exceptions.RequestException: If the request fails
+        """
+        host = urlsplit(url).netloc.lower()
+        if cls._circuit_open(host):
+            raise EndpointUnavailable(f"Circuit open for {host} after repeated failures")
+        
+        slot = cls._host_slot(host)
+        if not slot.acquire(timeout=timeout):
+            raise EndpointUnavailable(f"Too many deliveries in flight to {host}")
+        try:
+            response = cls._get_session().post(url, data=body, headers=headers, timeout=timeout)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            cls._record_outcome(host, False)
+            raise
+        finally:
+            slot.release()
+        
+        cls._record_outcome(host, not cls._is_dead_letter_error(response.status_code))
+        return response
+    
     @staticmethod
     def _calculate_backoff(attempt: int) -> float:
         """
-        Calculate exponential backoff delay with jitter.
+        Calculate exponential backoff delay with full jitter.
+        
+        The delay is drawn uniformly from zero up to the (capped) base delay,
+        which spreads retries from many deliveries across the whole window
+        instead of clustering them around the base delay.
         
         Args:
             attempt: The current attempt number (0-indexed)
         
         Returns:
-            Delay in seconds with random jitter (0.5x to 2x of base delay)
+            Delay in seconds between 0 and the base delay for this attempt
         """
-        if attempt >= len(WebhookService.BACKOFF_DELAYS):
-            # Cap at the maximum backoff delay
-            base_delay = WebhookService.BACKOFF_DELAYS[-1]
-        else:
-            base_delay = WebhookService.BACKOFF_DELAYS[attempt]
+        # Cap at the maximum backoff delay
+        base_delay = WebhookService.BACKOFF_DELAYS[min(attempt, len(WebhookService.BACKOFF_DELAYS) - 1)]
+        return random.random() * base_delay
+    
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        """
+        Read the delay requested by a Retry-After response header.
         
-        # Add jitter: random delay between 0.5x and 2x of base delay
-        jitter_factor = random.uniform(0.5, 2.0)
-        return base_delay * jitter_factor
+        Args:
+            response: HTTP response from the webhook endpoint
+        
+        Returns:
+            Delay in seconds (capped at the largest backoff delay), or None if
+            the header is missing, unparseable or not a finite number
+        """
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            if retry_at.tzinfo is None:
+                retry_at = retry_at.replace(tzinfo=timezone.utc)
+            delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+        # float() also parses "nan" and "inf", which no delay can use
+        if not math.isfinite(delay):
+            return None
+        return min(max(delay, 0.0), WebhookService.BACKOFF_DELAYS[-1])
     
     @staticmethod
     def _is_dead_letter_error(status_code: int) -> bool:
@@ -73,7 +301,283 @@ class WebhookService:
         return 200 <= status_code < 300
     
     @staticmethod
-    def send_webhook(
+    def _response_snippet(response: requests.Response) -> str:
+        """
+        Decode only the leading RESPONSE_BODY_LIMIT bytes of a response body.
+        
+        Avoids decoding (and charset-sniffing) large error pages in full when
+        only a prefix is stored.
+        
+        Args:
+            response: HTTP response from the webhook endpoint
+        
+        Returns:
+            The decoded body prefix
+        """
+        head = response.content[:WebhookService.RESPONSE_BODY_LIMIT]
+        try:
+            return head.decode(response.encoding or 'utf-8', errors='replace')
+        except LookupError:
+            return head.decode('utf-8', errors='replace')
+    
+    @staticmethod
+    def _encode_body(payload: Dict[str, Any]) -> bytes:
+        """
+        Encode a payload into the exact JSON bytes sent to the endpoint.
+        
+        Args:
+            payload: JSON payload to deliver
+        
+        Returns:
+            UTF-8 encoded JSON body
+        
+        Raises:
+            requests.exceptions.InvalidJSONError: If the payload is not valid JSON
+        """
+        try:
+            return json.dumps(payload, allow_nan=False).encode('utf-8')
+        except ValueError as e:
+            raise requests.exceptions.InvalidJSONError(e)
+    
+    @staticmethod
+    def signature_header(secret: str, body: bytes) -> str:
+        """
+        Build the X-Form-Signature value for a request body.
+        
+        Args:
+            secret: Shared secret from the webhook configuration
+            body: Encoded request body
+        
+        Returns:
+            HMAC-SHA256 signature in "sha256=<hex>" form
+        """
+        signature = hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+        return f"sha256={signature}"
+    
+    @staticmethod
+    def _recorded_headers(response: requests.Response) -> Dict[str, str]:
+        """
+        Pick the response headers worth keeping on the delivery record.
+        
+        Args:
+            response: HTTP response from the webhook endpoint
+        
+        Returns:
+            Dictionary of the whitelisted headers present on the response
+        """
+        return {
+            name: response.headers[name]
+            for name in WebhookService.RECORDED_RESPONSE_HEADERS
+            if name in response.headers
+        }
+    
+    @staticmethod
+    def _describe_request_error(error: requests.exceptions.RequestException, timeout: int) -> Tuple[str, str]:
+        """
+        Classify a request exception for retry handling and reporting.
+        
+        Args:
+            error: The exception raised while sending the webhook
+            timeout: Per-attempt request timeout in seconds
+        
+        Returns:
+            Tuple of (error_type, error message); timeouts and connection
+            errors are the retryable types listed in FAILURE_REASONS
+        """
+        if isinstance(error, EndpointUnavailable):
+            return 'unavailable', str(error)
+        if isinstance(error, requests.exceptions.Timeout):
+            return 'timeout', f"Request timeout after {timeout} seconds"
+        if isinstance(error, requests.exceptions.ConnectionError):
+            return 'connection', f"Connection error: {str(error)}"
+        return 'request', f"Request error: {str(error)}"
+    
+    @staticmethod
+    def _mark_failed(
+        delivery: WebhookDelivery,
+        error_msg: str,
+        failure_info: Dict[str, Any],
+        retry_schedule: List[int],
+        status_code: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Record a terminal delivery failure and build the result.
+        
+        Args:
+            delivery: The webhook delivery record being processed
+            error_msg: Error message from the final attempt
+            failure_info: Failure classification stored in metadata
+            retry_schedule: Base backoff delays for this delivery
+            status_code: HTTP status code of the final attempt, if any
+        
+        Returns:
+            Dictionary describing the failed delivery
+        """
+        attempt_num = delivery.attempt_count
+        reason = WebhookService.FAILURE_REASONS.get(failure_info.get('error_type'), "")
+        
+        delivery.status = 'failed'
+        delivery.completed_at = datetime.now(timezone.utc)
+        delivery.metadata = {
+            **failure_info,
+            'retry_schedule': retry_schedule
+        }
+        delivery.save()
+        
+        current_app.logger.warning(
+            f"Webhook failed for {delivery.url} after {attempt_num} attempts{reason}: {error_msg} "
+            f"(delivery_id: {delivery.id})"
+        )
+        
+        result = {
+            "status": "failed",
+            "delivery_id": str(delivery.id),
+            "attempt_count": attempt_num,
+            "message": f"Webhook failed after {attempt_num} attempts{reason}",
+            "error": error_msg
+        }
+        if status_code is not None:
+            result["status_code"] = status_code
+        return result
+    
+    @staticmethod
+    def _start_attempt(delivery: WebhookDelivery, attempt: int) -> bool:
+        """
+        Atomically record the start of a delivery attempt.
+        
+        The attempt count is incremented with $inc only while it still equals
+        the count this worker read and the delivery is still open, so two
+        workers never make the same attempt. The in-memory record is updated
+        to match.
+        
+        Args:
+            delivery: The webhook delivery record being processed
+            attempt: Number of attempts made before this one
+        
+        Returns:
+            True if the attempt was taken, False if another worker got there
+            first or the delivery was cancelled
+        """
+        now = datetime.now(timezone.utc)
+        status = 'in_progress' if attempt == 0 else 'retrying'
+        taken = WebhookDelivery.objects(
+            id=delivery.id,
+            attempt_count=attempt,
+            status__in=('pending', 'in_progress', 'retrying')
+        ).update_one(
+            inc__attempt_count=1,
+            set__last_attempt_at=now,
+            set__status=status
+        )
+        if not taken:
+            return False
+        
+        delivery.attempt_count = attempt + 1
+        delivery.last_attempt_at = now
+        delivery.status = status
+        return True
+    
+    @staticmethod
+    def _checkpoint(delivery: WebhookDelivery) -> None:
+        """
+        Persist intermediate delivery state when verbose webhook logging is on.
+        
+        Only the per-attempt fields are written, as a single field update, so
+        the payload is not re-validated or re-sent; the full document is saved
+        only for the initial record and the terminal outcome.
+        
+        Args:
+            delivery: The webhook delivery record being processed
+        """
+        if not current_app.config.get('WEBHOOK_VERBOSE_LOGS'):
+            return
+        updates = {
+            f"set__{field}": getattr(delivery, field)
+            for field in WebhookService.CHECKPOINT_FIELDS
+            if getattr(delivery, field) is not None
+        }
+        WebhookDelivery.objects(id=delivery.id).update_one(**updates)
+    
+    @staticmethod
+    def _is_sensitive_header(name: str) -> bool:
+        """
+        Check if a request header carries credentials.
+        
+        Args:
+            name: Header name
+        
+        Returns:
+            True if the header must not be stored in plaintext
+        """
+        name = name.lower()
+        return name in WebhookService.SENSITIVE_REQUEST_HEADERS or name.endswith('-token')
+    
+    @staticmethod
+    def _header_cipher():
+        """
+        Build the cipher for stored credential headers.
+        
+        Uses WEBHOOK_HEADER_KEY (a Fernet key) when set, otherwise a key
+        derived from SECRET_KEY.
+        
+        Returns:
+            Fernet instance
+        """
+        from cryptography.fernet import Fernet
+        
+        key = current_app.config.get("WEBHOOK_HEADER_KEY")
+        if not key:
+            digest = hashlib.sha256(current_app.config["SECRET_KEY"].encode('utf-8')).digest()
+            key = base64.urlsafe_b64encode(digest)
+        return Fernet(key)
+    
+    @staticmethod
+    def _split_headers(headers: Optional[Dict[str, str]]) -> Tuple[Dict[str, str], Optional[str]]:
+        """
+        Separate credential headers from the ones safe to store as-is.
+        
+        Args:
+            headers: Extra HTTP headers sent with every attempt
+        
+        Returns:
+            Tuple of (plain headers, encrypted JSON of the credential headers
+            or None if there are none)
+        """
+        plain = {}
+        sensitive = {}
+        for name, value in (headers or {}).items():
+            if WebhookService._is_sensitive_header(name):
+                sensitive[name] = value
+            else:
+                plain[name] = value
+        if not sensitive:
+            return plain, None
+        token = WebhookService._header_cipher().encrypt(json.dumps(sensitive).encode('utf-8'))
+        return plain, token.decode('ascii')
+    
+    @staticmethod
+    def _request_headers(delivery: WebhookDelivery) -> Dict[str, str]:
+        """
+        Rebuild the extra request headers stored on a delivery.
+        
+        Args:
+            delivery: The webhook delivery record
+        
+        Returns:
+            Plain headers merged with the decrypted credential headers
+        
+        Raises:
+            cryptography.fernet.InvalidToken: If the credentials cannot be
+                decrypted (e.g. the key changed)
+        """
+        headers = dict(delivery.request_headers or {})
+        if delivery.sealed_headers:
+            sealed = WebhookService._header_cipher().decrypt(delivery.sealed_headers.encode('ascii'))
+            headers.update(json.loads(sealed))
+        return headers
+    
+    @staticmethod
+    def _create_delivery(
         url: str,
         payload: Dict[str, Any],
         webhook_id: str,
@@ -83,12 +587,26 @@ class WebhookService:
         headers: Optional[Dict[str, str]] = None,
         timeout: int = 10,
         schedule_for: Optional[datetime] = None
-    ) -> Dict[str, Any]:
+    ) -> WebhookDelivery:
         """
-        Send a webhook with exponential backoff retry logic.
+        Create and persist the initial delivery record.
+        
+        Args:
+            url: Target webhook URL
+            payload: JSON payload to deliver
+            webhook_id: Webhook configuration identifier
+            form_id: Form that triggered the webhook
+            created_by: User or system that triggered the webhook
+            max_retries: Maximum number of delivery attempts
+            headers: Extra HTTP headers sent with every attempt; credential
+                headers are stored encrypted
+            timeout: Per-attempt request timeout in seconds
+            schedule_for: Optional time to defer the first attempt to
+        
+        Returns:
+            The saved pending WebhookDelivery
         """
-        current_app.logger.info(f"--- send_webhook started for url: {url}, form_id: {form_id} ---")
-        # Create initial delivery record
+        plain_headers, sealed_headers = WebhookService._split_headers(headers)
         delivery = WebhookDelivery(
             webhook_id=webhook_id,
             url=url,
@@ -97,66 +615,296 @@ class WebhookService:
             status='pending',
             attempt_count=0,
             max_retries=max_retries,
-            created_by=created_by
+            created_by=created_by,
+            request_headers=plain_headers,
+            sealed_headers=sealed_headers,
+            timeout=timeout
+        )
+        if schedule_for:
+            delivery.next_retry_at = schedule_for
+        delivery.save()
+        return delivery
+    
+    @staticmethod
+    def _scheduled_result(delivery: WebhookDelivery) -> Dict[str, Any]:
+        """
+        Build the response for a delivery scheduled for later.
+        
+        Args:
+            delivery: The saved delivery record with next_retry_at set
+        
+        Returns:
+            Dictionary describing the scheduled delivery
+        """
+        schedule_for = delivery.next_retry_at
+        current_app.logger.info(
+            f"Webhook scheduled for {schedule_for.isoformat()} to {delivery.url} "
+            f"(delivery_id: {delivery.id})"
+        )
+        return {
+            "status": "scheduled",
+            "delivery_id": str(delivery.id),
+            "message": f"Webhook scheduled for {schedule_for.isoformat()}",
+            "next_retry_at": schedule_for.isoformat()
+        }
+    
+    @staticmethod
+    def send_webhook(
+        url: str,
+        payload: Dict[str, Any],
+        webhook_id: str,
+        form_id: str,
+        created_by: str,
+        max_retries: int = 5,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: int = 10,
+        schedule_for: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Send a webhook with exponential backoff retry logic.
+        
+        Blocks through all attempts and backoff waits. Scheduled deliveries are
+        sent later by the retry scheduler.
+        """
+        current_app.logger.info(f"--- send_webhook started for url: {url}, form_id: {form_id} ---")
+        # Create initial delivery record
+        delivery = WebhookService._create_delivery(
+            url, payload, webhook_id, form_id, created_by, max_retries, headers, timeout, schedule_for
+        )
+        
+        # If scheduled for later, return without attempting delivery
+        if schedule_for:
+            return WebhookService._scheduled_result(delivery)
+        
+        return WebhookService._deliver(delivery)
+    
+    @staticmethod
+    def enqueue_webhook(
+        url: str,
+        payload: Dict[str, Any],
+        webhook_id: str,
+        form_id: str,
+        created_by: str,
+        max_retries: int = 5,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: int = 10,
+        schedule_for: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue a webhook for background delivery and return immediately.
+        
+        The delivery record is created before returning, so its progress can be
+        polled with get_webhook_status while the worker pool delivers it. Retries
+        wait on a timer rather than a worker thread.
+        
+        Returns:
+            Dictionary with the queued (or scheduled) delivery_id
+        """
+        current_app.logger.info(f"--- enqueue_webhook started for url: {url}, form_id: {form_id} ---")
+        delivery = WebhookService._create_delivery(
+            url, payload, webhook_id, form_id, created_by, max_retries, headers, timeout, schedule_for
         )
         
-        # If scheduled for later, set next_retry_at and return
-        if schedule_for:
-            delivery.next_retry_at = schedule_for
-            delivery.save()
-            current_app.logger.info(
-                f"Webhook scheduled for {schedule_for.isoformat()} to {url} "
-                f"(delivery_id: {delivery.id})"
-            )
-            return {
-                "status": "scheduled",
-                "delivery_id": str(delivery.id),
-                "message": f"Webhook scheduled for {schedule_for.isoformat()}",
-                "next_retry_at": schedule_for.isoformat()
-            }
+        if schedule_for:
+            return WebhookService._scheduled_result(delivery)
+        
+        app = current_app._get_current_object()
+        delivery_id = str(delivery.id)
+        WebhookService._claim(delivery_id)
+        
+        def run() -> Optional[Dict[str, Any]]:
+            return WebhookService._deliver_in_background(app, delivery_id, delivery)
+        
+        WebhookService._get_executor().submit(run)
+        
+        return {
+            "status": "queued",
+            "delivery_id": str(delivery.id),
+            "message": "Webhook queued for delivery"
+        }
+    
+    @classmethod
+    def enqueue_event(
+        cls,
+        url: str,
+        event: Dict[str, Any],
+        webhook_id: str,
+        form_id: str,
+        secret: Optional[str] = None,
+        created_by: str = "system",
+        max_retries: int = 5,
+        timeout: int = 10
+    ) -> None:
+        """
+        Add an event to the pending batch for a webhook.
+        
+        Events for the same webhook are posted together as {"events": [...]}
+        once WEBHOOK_BATCH_MAX_SIZE events are pending or WEBHOOK_BATCH_INTERVAL_MS
+        has passed since the first one, whichever comes first. Each batch is
+        recorded as a single WebhookDelivery and delivered on the worker pool.
+        
+        Args:
+            url: Target webhook URL
+            event: Event payload to include in the batch
+            webhook_id: Webhook configuration identifier (batch key)
+            form_id: Form that triggered the webhook
+            secret: Optional secret used to sign the batch body
+            created_by: User or system that triggered the webhook
+            max_retries: Maximum number of delivery attempts for the batch
+            timeout: Per-attempt request timeout in seconds
+        """
+        app = current_app._get_current_object()
+        max_size = app.config.get("WEBHOOK_BATCH_MAX_SIZE", 100)
+        
+        with cls._batches_lock:
+            batch = cls._batches.get(webhook_id)
+            if batch is None:
+                interval = app.config.get("WEBHOOK_BATCH_INTERVAL_MS", 100) / 1000
+                timer = threading.Timer(interval, cls._flush_batch, args=(app, webhook_id))
+                timer.daemon = True
+                batch = {
+                    'url': url,
+                    'form_id': form_id,
+                    'secret': secret,
+                    'created_by': created_by,
+                    'max_retries': max_retries,
+                    'timeout': timeout,
+                    'events': [],
+                    'timer': timer
+                }
+                cls._batches[webhook_id] = batch
+                timer.start()
+            batch['events'].append(event)
+            full = len(batch['events']) >= max_size
+        
+        if full:
+            cls._flush_batch(app, webhook_id)
+    
+    @classmethod
+    def _flush_batch(cls, app, webhook_id: str) -> None:
+        """
+        Queue delivery of the pending batch for a webhook.
+        
+        Called by the batch timer or when the batch fills up; whichever runs
+        second finds nothing pending.
+        
+        Args:
+            app: Flask application to run the delivery under
+            webhook_id: Webhook configuration identifier (batch key)
+        """
+        with cls._batches_lock:
+            batch = cls._batches.pop(webhook_id, None)
+        if batch is None:
+            return
+        batch['timer'].cancel()
+        
+        payload = {"events": batch['events']}
+        headers = {"X-Form-Event": "batch"}
+        
+        with app.app_context():
+            try:
+                if batch['secret']:
+                    headers["X-Form-Signature"] = cls.signature_header(
+                        batch['secret'], cls._encode_body(payload)
+                    )
+                cls.enqueue_webhook(
+                    url=batch['url'],
+                    payload=payload,
+                    webhook_id=webhook_id,
+                    form_id=batch['form_id'],
+                    created_by=batch['created_by'],
+                    max_retries=batch['max_retries'],
+                    headers=headers,
+                    timeout=batch['timeout']
+                )
+            except Exception as e:
+                app.logger.error(
+                    f"Failed to queue batch of {len(batch['events'])} events "
+                    f"to {batch['url']}: {str(e)}"
+                )
+    
+    @staticmethod
+    def _deliver(delivery: WebhookDelivery, wait: bool = True) -> Dict[str, Any]:
+        """
+        Attempt delivery of a saved record with exponential backoff retries.
+        
+        Attempts continue from the record's attempt_count, using the headers
+        and timeout stored on it.
         
-        delivery.save()
+        Args:
+            delivery: The persisted delivery record to send
+            wait: Sleep through backoff delays until the delivery finishes; when
+                False, a failed attempt is saved as 'retrying' with its
+                next_retry_at and returned for the caller to reschedule
         
-        # Default headers
-        if headers is None:
-            headers = {
-                "Content-Type": "application/json"
-            }
+        Returns:
+            Dictionary with the final (or 'retrying') delivery status, or
+            'raced' if another worker took the attempt or it was cancelled
+        """
+        url = delivery.url
+        payload = delivery.payload
+        max_retries = delivery.max_retries
+        timeout = delivery.timeout or 10
+        
+        # Base backoff delays recorded in metadata, the same for every attempt
+        retry_schedule = WebhookService.BACKOFF_DELAYS[:max_retries]
+        
+        # Default headers; caller-supplied headers take precedence, and the
+        # JSON content type is kept since the body is sent as raw bytes
+        try:
+            headers = {"Content-Type": "application/json", **WebhookService._request_headers(delivery)}
+        except Exception as e:
+            return WebhookService._mark_failed(
+                delivery,
+                f"Stored request headers could not be decrypted: {type(e).__name__}",
+                {'error_type': 'credentials'},
+                retry_schedule
+            )
+        
+        # Encoded once on the first attempt and resent as-is on retries
+        body = None
         
         # Retry loop with exponential backoff and jitter
-        for attempt in range(max_retries):
+        for attempt in range(delivery.attempt_count, max_retries):
             attempt_num = attempt + 1
             current_app.logger.debug(f"Webhook delivery attempt {attempt_num} for delivery_id {delivery.id}")
-            delivery.attempt_count = attempt_num
-            delivery.last_attempt_at = datetime.now(timezone.utc)
-            
-            # Update status to in_progress or retrying
-            if attempt == 0:
-                delivery.status = 'in_progress'
-            else:
-                delivery.status = 'retrying'
             
-            delivery.save()
+            # Take the attempt atomically; if another worker advanced or
+            # cancelled the delivery since it was read, leave it to them
+            if not WebhookService._start_attempt(delivery, attempt):
+                current_app.logger.info(
+                    f"Webhook delivery {delivery.id} was taken over before attempt {attempt_num}, skipping"
+                )
+                return {
+                    "status": "raced",
+                    "delivery_id": str(delivery.id),
+                    "attempt_count": attempt,
+                    "message": "Webhook delivery is being handled by another worker or was cancelled"
+                }
             
+            status_code = None
+            retry_after = None
             try:
-                # Send the webhook request
-                response = requests.post(
-                    url,
-                    json=payload,
-                    headers=headers,
-                    timeout=timeout
-                )
+                if body is None:
+                    body = WebhookService._encode_body(payload)
                 
+                # Send the webhook request
+                response = WebhookService._post(url, body, headers, timeout)
+            except requests.exceptions.RequestException as e:
+                error_type, error_msg = WebhookService._describe_request_error(e, timeout)
+                failure_info = {'error_type': error_type}
+                retryable = error_type in WebhookService.FAILURE_REASONS
+            else:
                 # Check if request was successful (2xx status codes)
                 if WebhookService._is_success(response.status_code):
                     # Success!
                     delivery.status = 'success'
                     delivery.response_code = response.status_code
-                    delivery.response_body = response.text[:5000]  # Limit response body size
+                    delivery.response_body = WebhookService._response_snippet(response)
                     delivery.completed_at = datetime.now(timezone.utc)
                     delivery.metadata = {
-                        'headers': dict(response.headers),
-                        'retry_schedule': WebhookService.BACKOFF_DELAYS[:max_retries]
+                        'headers': WebhookService._recorded_headers(response),
+                        'retry_schedule': retry_schedule
                     }
                     delivery.save()
                     
@@ -172,168 +920,61 @@ class WebhookService:
                         "message": f"Webhook delivered successfully on attempt {attempt_num}",
                         "status_code": response.status_code
                     }
-                else:
-                    # Non-2xx response - treat as failure
-                    error_msg = f"HTTP {response.status_code}: {response.text[:200]}"
-                    delivery.error_message = error_msg
-                    delivery.response_code = response.status_code
-                    delivery.response_body = response.text[:5000]
-                    
-                    # Check if this is a dead letter error (should retry)
-                    is_dead_letter = WebhookService._is_dead_letter_error(response.status_code)
-                    
-                    if is_dead_letter and attempt < max_retries - 1:
-                        # Schedule retry with exponential backoff and jitter
-                        backoff_delay = WebhookService._calculate_backoff(attempt)
-                        next_retry_at = datetime.now(timezone.utc) + timedelta(seconds=backoff_delay)
-                        delivery.next_retry_at = next_retry_at
-                        delivery.metadata = {
-                            'is_dead_letter': True,
-                            'backoff_delay': backoff_delay,
-                            'retry_schedule': WebhookService.BACKOFF_DELAYS[:max_retries]
-                        }
-                        delivery.save()
-                        
-                        current_app.logger.warning(
-                            f"Webhook attempt {attempt_num}/{max_retries} failed with dead letter error "
-                            f"for {url}: {error_msg}. Retrying in {backoff_delay:.2f}s "
-                            f"(delivery_id: {delivery.id})"
-                        )
-                        
-                        # Wait for backoff delay
-                        time.sleep(backoff_delay)
-                        continue
-                    else:
-                        # Not retryable or last attempt - mark as failed
-                        delivery.status = 'failed'
-                        delivery.completed_at = datetime.now(timezone.utc)
-                        delivery.metadata = {
-                            'is_dead_letter': is_dead_letter,
-                            'retry_schedule': WebhookService.BACKOFF_DELAYS[:max_retries]
-                        }
-                        delivery.save()
-                        
-                        current_app.logger.warning(
-                            f"Webhook failed for {url} after {attempt_num} attempts: {error_msg} "
-                            f"(delivery_id: {delivery.id})"
-                        )
-                        
-                        return {
-                            "status": "failed",
-                            "delivery_id": str(delivery.id),
-                            "attempt_count": attempt_num,
-                            "message": f"Webhook failed after {attempt_num} attempts",
-                            "error": error_msg,
-                            "status_code": response.status_code
-                        }
-                    
-            except requests.exceptions.Timeout:
-                error_msg = f"Request timeout after {timeout} seconds"
-                delivery.error_message = error_msg
-                
-                if attempt < max_retries - 1:
-                    # Schedule retry with exponential backoff and jitter
-                    backoff_delay = WebhookService._calculate_backoff(attempt)
-                    next_retry_at = datetime.now(timezone.utc) + timedelta(seconds=backoff_delay)
-                    delivery.next_retry_at = next_retry_at
-                    delivery.metadata = {
-                        'error_type': 'timeout',
-                        'backoff_delay': backoff_delay,
-                        'retry_schedule': WebhookService.BACKOFF_DELAYS[:max_retries]
-                    }
-                    delivery.save()
-                    
-                    current_app.logger.warning(
-                        f"Webhook attempt {attempt_num}/{max_retries} timed out for {url}. "
-                        f"Retrying in {backoff_delay:.2f}s (delivery_id: {delivery.id})"
-                    )
-                    
-                    # Wait for backoff delay
-                    time.sleep(backoff_delay)
-                    continue
-                else:
-                    # Last attempt - mark as failed
-                    delivery.status = 'failed'
-                    delivery.completed_at = datetime.now(timezone.utc)
-                    delivery.save()
-                    
-                    current_app.logger.warning(
-                        f"Webhook failed for {url} after {attempt_num} attempts (timeout) "
-                        f"(delivery_id: {delivery.id})"
-                    )
-                    
-                    return {
-                        "status": "failed",
-                        "delivery_id": str(delivery.id),
-                        "attempt_count": attempt_num,
-                        "message": f"Webhook failed after {attempt_num} attempts (timeout)",
-                        "error": error_msg
-                    }
-                    
-            except requests.exceptions.ConnectionError as e:
-                error_msg = f"Connection error: {str(e)}"
-                delivery.error_message = error_msg
-                
-                if attempt < max_retries - 1:
-                    # Schedule retry with exponential backoff and jitter
-                    backoff_delay = WebhookService._calculate_backoff(attempt)
-                    next_retry_at = datetime.now(timezone.utc) + timedelta(seconds=backoff_delay)
-                    delivery.next_retry_at = next_retry_at
-                    delivery.metadata = {
-                        'error_type': 'connection',
-                        'backoff_delay': backoff_delay,
-                        'retry_schedule': WebhookService.BACKOFF_DELAYS[:max_retries]
-                    }
-                    delivery.save()
-                    
-                    current_app.logger.warning(
-                        f"Webhook attempt {attempt_num}/{max_retries} connection error for {url}: {error_msg}. "
-                        f"Retrying in {backoff_delay:.2f}s (delivery_id: {delivery.id})"
-                    )
-                    
-                    # Wait for backoff delay
-                    time.sleep(backoff_delay)
-                    continue
-                else:
-                    # Last attempt - mark as failed
-                    delivery.status = 'failed'
-                    delivery.completed_at = datetime.now(timezone.utc)
-                    delivery.save()
-                    
-                    current_app.logger.warning(
-                        f"Webhook failed for {url} after {attempt_num} attempts (connection error) "
-                        f"(delivery_id: {delivery.id})"
-                    )
-                    
-                    return {
-                        "status": "failed",
-                        "delivery_id": str(delivery.id),
-                        "attempt_count": attempt_num,
-                        "message": f"Webhook failed after {attempt_num} attempts (connection error)",
-                        "error": error_msg
-                    }
-                    
-            except requests.exceptions.RequestException as e:
-                error_msg = f"Request error: {str(e)}"
-                delivery.error_message = error_msg
                 
-                # Last attempt - mark as failed
-                delivery.status = 'failed'
-                delivery.completed_at = datetime.now(timezone.utc)
-                delivery.save()
+                # Non-2xx response - treat as failure
+                status_code = response.status_code
+                response_body = WebhookService._response_snippet(response)
+                error_msg = f"HTTP {status_code}: {response_body[:200]}"
+                delivery.response_code = status_code
+                delivery.response_body = response_body
                 
-                current_app.logger.error(
-                    f"Webhook attempt {attempt_num}/{max_retries} error for {url}: {error_msg} "
-                    f"(delivery_id: {delivery.id})"
+                # Dead letter errors are retried, honouring any Retry-After
+                retryable = WebhookService._is_dead_letter_error(status_code)
+                failure_info = {'is_dead_letter': retryable}
+                if retryable:
+                    retry_after = WebhookService._retry_after(response)
+            
+            delivery.error_message = error_msg
+            
+            if not retryable or attempt == max_retries - 1:
+                return WebhookService._mark_failed(
+                    delivery, error_msg, failure_info, retry_schedule, status_code
                 )
-                
+            
+            # Schedule retry with exponential backoff and jitter, unless the
+            # endpoint asked for a specific delay
+            if retry_after is not None:
+                backoff_delay = retry_after
+            else:
+                backoff_delay = WebhookService._calculate_backoff(attempt)
+            delivery.next_retry_at = datetime.now(timezone.utc) + timedelta(seconds=backoff_delay)
+            delivery.metadata = {
+                **failure_info,
+                'backoff_delay': backoff_delay,
+                'retry_schedule': retry_schedule
+            }
+            WebhookService._checkpoint(delivery)
+            
+            current_app.logger.warning(
+                f"Webhook attempt {attempt_num}/{max_retries} failed for {url}: {error_msg}. "
+                f"Retrying in {backoff_delay:.2f}s (delivery_id: {delivery.id})"
+            )
+            
+            if not wait:
+                # Persist the retry so it survives until (and beyond) the caller's timer
+                delivery.status = 'retrying'
+                delivery.save()
                 return {
-                    "status": "failed",
+                    "status": "retrying",
                     "delivery_id": str(delivery.id),
                     "attempt_count": attempt_num,
-                    "message": f"Webhook failed after {attempt_num} attempts",
-                    "error": error_msg
+                    "message": f"Webhook attempt {attempt_num} failed, retrying in {backoff_delay:.2f}s",
+                    "error": error_msg,
+                    "next_retry_at": delivery.next_retry_at.isoformat()
                 }
+            
+            # Wait for backoff delay
+            time.sleep(backoff_delay)
         
         # This should not be reached, but just in case
         delivery.status = 'failed'
@@ -347,22 +988,331 @@ class WebhookService:
             "error": "Unknown error"
         }
     
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        """
+        Get the shared webhook delivery worker pool, creating it on first use.
+        
+        Returns:
+            ThreadPoolExecutor sized by WEBHOOK_WORKERS
+        """
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=current_app.config.get("WEBHOOK_WORKERS", 8),
+                        thread_name_prefix="webhook"
+                    )
+        return cls._executor
+    
     @staticmethod
-    def get_webhook_status(delivery_id: str) -> Optional[Dict[str, Any]]:
+    def send_webhook_async(**kwargs) -> Future:
+        """
+        Send a webhook on the shared worker pool without blocking the caller.
+        
+        The delivery record is created and attempted on a background thread
+        inside the current application's context; failed attempts are retried
+        on a timer instead of holding the worker through the backoff delay.
+        
+        Args:
+            **kwargs: Arguments accepted by send_webhook
+        
+        Returns:
+            Future resolving to the result of the first delivery pass
+            (success, failed, scheduled or retrying)
+        """
+        app = current_app._get_current_object()
+        
+        def run() -> Optional[Dict[str, Any]]:
+            with app.app_context():
+                delivery = WebhookService._create_delivery(**kwargs)
+                if delivery.next_retry_at:
+                    return WebhookService._scheduled_result(delivery)
+            delivery_id = str(delivery.id)
+            WebhookService._claim(delivery_id)
+            return WebhookService._deliver_in_background(app, delivery_id, delivery)
+        
+        return WebhookService._get_executor().submit(run)
+    
+    @classmethod
+    def _claim(cls, delivery_id: str) -> bool:
+        """
+        Mark a delivery as handled by this process.
+        
+        Args:
+            delivery_id: The ID of the webhook delivery
+        
+        Returns:
+            True if claimed, False if it is already queued or waiting on a retry timer
+        """
+        with cls._inflight_lock:
+            if delivery_id in cls._inflight:
+                return False
+            cls._inflight.add(delivery_id)
+            return True
+    
+    @classmethod
+    def _release(cls, delivery_id: str) -> None:
+        """
+        Drop this process's claim on a delivery.
+        
+        Args:
+            delivery_id: The ID of the webhook delivery
+        """
+        with cls._inflight_lock:
+            cls._inflight.discard(delivery_id)
+    
+    @classmethod
+    def _deliver_in_background(
+        cls,
+        app,
+        delivery_id: str,
+        delivery: Optional[WebhookDelivery] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Run one delivery pass on a worker thread and reschedule it if it backs off.
+        
+        The caller must hold the claim on delivery_id. It is kept while a retry
+        timer is pending and released once the delivery finishes.
+        
+        Args:
+            app: Flask application to run the delivery under
+            delivery_id: The ID of the webhook delivery
+            delivery: The loaded record, or None to reload it (e.g. on retry)
+        
+        Returns:
+            Result of this delivery pass, or None if the delivery is gone or no
+            longer pending (e.g. cancelled)
+        """
+        rescheduled = False
+        try:
+            with app.app_context():
+                if delivery is None:
+                    delivery = WebhookDelivery.objects(id=delivery_id).first()
+                    if delivery is None or delivery.status not in ('pending', 'retrying'):
+                        return None
+                
+                result = cls._deliver(delivery, wait=False)
+                
+                if result['status'] == 'retrying':
+                    timer = threading.Timer(
+                        delivery.metadata['backoff_delay'],
+                        cls._retry_due,
+                        args=(app, delivery_id, delivery.next_retry_at)
+                    )
+                    timer.daemon = True
+                    timer.start()
+                    rescheduled = True
+                return result
+        finally:
+            if not rescheduled:
+                cls._release(delivery_id)
+    
+    @classmethod
+    def _retry_due(cls, app, delivery_id: str, next_retry_at: datetime) -> None:
+        """
+        Queue the next attempt of a delivery whose retry timer fired.
+        
+        The delivery is taken as in process_due_deliveries, by unsetting
+        next_retry_at only if it still holds the scheduled value. A scheduler
+        in another process then cannot also take it while it waits for a
+        worker. If a scheduler got there first, the local claim is dropped.
+        
+        Args:
+            app: Flask application to run the delivery under
+            delivery_id: The ID of the webhook delivery
+            next_retry_at: Retry time saved with the failed attempt
+        """
+        try:
+            with app.app_context():
+                taken = WebhookDelivery.objects(
+                    id=delivery_id, next_retry_at=next_retry_at
+                ).update_one(unset__next_retry_at=True)
+        except Exception as e:
+            # next_retry_at is still set, so the scheduler retries it later
+            app.logger.error(f"Failed to take webhook retry {delivery_id}: {str(e)}")
+            taken = False
+        if not taken:
+            cls._release(delivery_id)
+            return
+        cls._get_executor().submit(cls._deliver_in_background, app, delivery_id)
+    
+    @classmethod
+    def process_due_deliveries(cls, limit: int = 100) -> int:
+        """
+        Queue scheduled deliveries that are due and retries whose timer was lost.
+        
+        Retry timers live in memory, so a restart drops them; retries overdue by
+        more than WEBHOOK_SCHEDULER_INTERVAL are picked up from their persisted
+        next_retry_at. Each delivery is taken by unsetting next_retry_at only if
+        it still holds the value read, as retry timers do (see _retry_due), so
+        concurrent schedulers and timers do not both send it.
+        
+        Args:
+            limit: Maximum number of deliveries to queue in this pass
+        
+        Returns:
+            Number of deliveries queued
+        """
+        app = current_app._get_current_object()
+        now = datetime.now(timezone.utc)
+        grace = timedelta(seconds=app.config.get("WEBHOOK_SCHEDULER_INTERVAL", 30))
+        
+        due = (
+            WebhookDelivery.objects(
+                Q(status='pending', next_retry_at__lte=now) |
+                Q(status='retrying', next_retry_at__lte=now - grace)
+            )
+            .only('id', 'next_retry_at')
+            .order_by('next_retry_at')
+            .limit(limit)
+            .as_pymongo()
+        )
+        
+        executor = cls._get_executor()
+        queued = 0
+        for doc in due:
+            delivery_id = str(doc['_id'])
+            if not cls._claim(delivery_id):
+                continue
+            taken = WebhookDelivery.objects(
+                id=delivery_id, next_retry_at=doc['next_retry_at']
+            ).update_one(unset__next_retry_at=True)
+            if not taken:
+                cls._release(delivery_id)
+                continue
+            executor.submit(cls._deliver_in_background, app, delivery_id)
+            queued += 1
+        return queued
+    
+    @classmethod
+    def _retry_scheduler_loop(cls, app) -> None:
+        """
+        Background thread sending due scheduled deliveries and lost retries.
+        """
+        while cls._scheduler_running:
+            try:
+                with app.app_context():
+                    queued = cls.process_due_deliveries()
+                    if queued:
+                        current_app.logger.info(f"Webhook scheduler queued {queued} due deliveries")
+            except Exception as e:
+                app.logger.error(f"Webhook scheduler error: {str(e)}")
+            
+            # Wait for next scan
+            time.sleep(app.config.get("WEBHOOK_SCHEDULER_INTERVAL", 30))
+    
+    @classmethod
+    def start_retry_scheduler(cls, app) -> None:
+        """
+        Start the webhook retry scheduler background thread.
+        """
+        if not cls._scheduler_running:
+            cls._scheduler_running = True
+            cls._scheduler_thread = threading.Thread(
+                target=cls._retry_scheduler_loop,
+                args=(app,),
+                daemon=True,
+                name="WebhookRetryScheduler"
+            )
+            cls._scheduler_thread.start()
+            app.logger.info("Webhook retry scheduler started")
+    
+    @classmethod
+    def stop_retry_scheduler(cls) -> None:
+        """
+        Stop the webhook retry scheduler background thread.
+        """
+        cls._scheduler_running = False
+        if cls._scheduler_thread:
+            cls._scheduler_thread.join(timeout=5)
+    
+    @classmethod
+    def get_webhook_status(cls, delivery_id: str) -> Optional[Dict[str, Any]]:
         """
         Get delivery status for a webhook.
         
+        Deliveries that have succeeded or been cancelled never change again, so
+        their serialized form is kept in a bounded in-process LRU cache.
+        
         Args:
             delivery_id: The ID of the webhook delivery record
         
         Returns:
             Dictionary with delivery status and details, or None if not found
         """
-        try:
-            delivery = WebhookDelivery.objects.get(id=delivery_id)
-            return delivery.to_dict()
-        except WebhookDelivery.DoesNotExist:
+        with cls._status_cache_lock:
+            cached = cls._status_cache.get(delivery_id)
+            if cached is not None:
+                cls._status_cache.move_to_end(delivery_id)
+                return cached
+        
+        delivery = WebhookDelivery.objects(id=delivery_id).as_pymongo().first()
+        if delivery is None:
             return None
+        
+        status = cls._serialize_delivery(delivery, include_payload=True)
+        if status['status'] in cls.IMMUTABLE_STATUSES:
+            with cls._status_cache_lock:
+                cls._status_cache[delivery_id] = status
+                if len(cls._status_cache) > cls.STATUS_CACHE_SIZE:
+                    cls._status_cache.popitem(last=False)
+        return status
+    
+    @staticmethod
+    def _history_cursor(delivery: Dict[str, Any]) -> str:
+        """
+        Build the keyset cursor pointing just past a delivery.
+        
+        Args:
+            delivery: Raw document of the last delivery on the current page
+        
+        Returns:
+            Cursor string "<created_at ISO-8601>|<delivery id>"
+        """
+        return f"{delivery['created_at'].isoformat()}|{delivery['_id']}"
+    
+    @staticmethod
+    def _serialize_delivery(delivery: Dict[str, Any], include_payload: bool = False) -> Dict[str, Any]:
+        """
+        Convert a raw webhook_deliveries document to its API dictionary.
+        
+        Matches WebhookDelivery.to_dict(). History listings leave out the
+        payload; get_webhook_status includes it.
+        
+        Args:
+            delivery: Raw webhook_deliveries document as returned by PyMongo
+            include_payload: Whether to include the delivered payload
+        
+        Returns:
+            Dictionary with delivery status and details
+        """
+        def iso(name: str) -> Optional[str]:
+            value = delivery.get(name)
+            return value.isoformat() if value else None
+        
+        serialized = {
+            'id': str(delivery['_id']),
+            'webhook_id': delivery.get('webhook_id'),
+            'url': delivery.get('url'),
+            'form_id': delivery.get('form_id'),
+            'status': delivery.get('status'),
+            'attempt_count': delivery.get('attempt_count', 0),
+            'max_retries': delivery.get('max_retries', 5),
+            'last_attempt_at': iso('last_attempt_at'),
+            'next_retry_at': iso('next_retry_at'),
+            'created_by': delivery.get('created_by'),
+            'response_code': delivery.get('response_code'),
+            'response_body': delivery.get('response_body'),
+            'error_message': delivery.get('error_message'),
+            'metadata': delivery.get('metadata', {}),
+            'created_at': iso('created_at'),
+            'completed_at': iso('completed_at'),
+            'retry_generation': delivery.get('retry_generation', 0)
+        }
+        if include_payload:
+            serialized['payload'] = delivery.get('payload', {})
+        return serialized
     
     @staticmethod
     def get_webhook_history(
@@ -370,17 +1320,24 @@ class WebhookService:
         webhook_id: Optional[str] = None,
         status: Optional[str] = None,
         page: int = 1,
-        per_page: int = 20
+        per_page: int = 20,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Retrieve delivery history for webhooks.
         
+        Deliveries are returned newest first, without their payloads. Passing the next_cursor of a
+        previous page continues from that page with an index range query,
+        so deep pages cost the same as the first one; in cursor mode the
+        total count is not computed.
+        
         Args:
             form_id: Filter by form ID (optional)
             webhook_id: Filter by webhook ID (optional)
             status: Filter by status (optional)
-            page: Page number (default: 1)
+            page: Page number (default: 1), ignored when cursor is given
             per_page: Number of items per page (default: 20)
+            cursor: next_cursor from a previous page (optional)
         
         Returns:
             Dictionary with delivery history:
@@ -389,8 +1346,13 @@ class WebhookService:
                 "total": int,
                 "page": int,
                 "per_page": int,
-                "total_pages": int
+                "total_pages": int,
+                "next_cursor": str or None
             }
+            total, page and total_pages are omitted in cursor mode.
+        
+        Raises:
+            ValueError: If the cursor is malformed
         """
         query = {}
         
@@ -403,74 +1365,103 @@ class WebhookService:
         if status:
             query['status'] = status
         
-        # Count total deliveries matching the query
-        total = WebhookDelivery.objects(**query).count()
+        # Newest first, with the id as a tie-breaker so cursors are stable.
+        # Raw documents without the payload skip ODM construction entirely.
+        deliveries = (
+            WebhookDelivery.objects(**query)
+            .exclude('payload')
+            .order_by('-created_at', '-id')
+            .as_pymongo()
+        )
         
-        # Calculate pagination
-        total_pages = (total + per_page - 1) // per_page
-        skip = (page - 1) * per_page
+        if cursor:
+            created_at, _, last_id = cursor.partition('|')
+            if not last_id:
+                raise ValueError("Invalid cursor")
+            created_at = datetime.fromisoformat(created_at)
+            
+            page_items = list(deliveries.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=last_id)
+            ).limit(per_page))
+            result = {"per_page": per_page}
+        else:
+            # Count total deliveries matching the query
+            total = WebhookDelivery.objects(**query).count()
+            
+            # Calculate pagination
+            total_pages = (total + per_page - 1) // per_page
+            skip = (page - 1) * per_page
+            
+            # Get deliveries for the current page
+            page_items = list(deliveries.skip(skip).limit(per_page))
+            result = {
+                "total": total,
+                "page": page,
+                "per_page": per_page,
+                "total_pages": total_pages
+            }
         
-        # Get deliveries for the current page
-        deliveries = WebhookDelivery.objects(**query).order_by('-created_at').skip(skip).limit(per_page)
+        next_cursor = None
+        if len(page_items) == per_page:
+            next_cursor = WebhookService._history_cursor(page_items[-1])
         
         return {
-            "deliveries": [delivery.to_dict() for delivery in deliveries],
-            "total": total,
-            "page": page,
-            "per_page": per_page,
-            "total_pages": total_pages
+            "deliveries": [WebhookService._serialize_delivery(delivery) for delivery in page_items],
+            **result,
+            "next_cursor": next_cursor
         }
     
-    @staticmethod
-    def retry_webhook(delivery_id: str, reset_count: bool = False) -> Dict[str, Any]:
+    @classmethod
+    def retry_webhook(cls, delivery_id: str, reset_count: bool = False) -> Dict[str, Any]:
         """
         Retry a failed webhook delivery.
+        
+        The delivery is reset in place (see WebhookDelivery.reset_for_retry)
+        and sent again with a fresh round of attempts, keeping its id and
+        creation time.
         """
         current_app.logger.info(f"--- retry_webhook started for delivery_id: {delivery_id} ---")
+        delivery = WebhookDelivery.objects(id=delivery_id).only(
+            'status', 'attempt_count', 'max_retries'
+        ).first()
+        
+        if delivery is None:
+            return {
+                "status": "error",
+                "message": "Webhook delivery not found"
+            }
+        
+        if not delivery.is_retryable():
+            return {
+                "status": "error",
+                "message": f"Webhook delivery is not retryable (status: {delivery.status}, attempts: {delivery.attempt_count}/{delivery.max_retries})"
+            }
+        
+        # A delivery waiting on a background retry timer is already being retried
+        if not cls._claim(delivery_id):
+            return {
+                "status": "error",
+                "message": "Webhook delivery is already being delivered"
+            }
+        
         try:
-            delivery = WebhookDelivery.objects.get(id=delivery_id)
-            
-            if not delivery.is_retryable():
+            # Every retry starts a fresh round of attempts, so the attempt
+            # count is reset whether or not reset_count is set
+            if not WebhookDelivery.reset_for_retry(delivery_id, delivery.status):
                 return {
                     "status": "error",
-                    "message": f"Webhook delivery is not retryable (status: {delivery.status}, attempts: {delivery.attempt_count}/{delivery.max_retries})"
+                    "message": "Webhook delivery status changed while retrying, please try again"
                 }
             
-            # Reset attempt count if requested
-            if reset_count:
-                delivery.attempt_count = 0
-            
-            # Get the original parameters
-            url = delivery.url
-            payload = delivery.payload
-            webhook_id = delivery.webhook_id
-            form_id = delivery.form_id
-            created_by = delivery.created_by
-            max_retries = delivery.max_retries
-            
-            # Delete the old delivery record and create a new one
-            # This ensures a clean retry without any previous state
-            old_delivery_id = str(delivery.id)
-            delivery.delete()
-            
             # Send the webhook again
-            result = WebhookService.send_webhook(
-                url=url,
-                payload=payload,
-                webhook_id=webhook_id,
-                form_id=form_id,
-                created_by=created_by,
-                max_retries=max_retries
-            )
-            
-            result['previous_delivery_id'] = old_delivery_id
-            return result
-            
-        except WebhookDelivery.DoesNotExist:
-            return {
-                "status": "error",
-                "message": "Webhook delivery not found"
-            }
+            delivery = WebhookDelivery.objects.get(id=delivery_id)
+            result = cls._deliver(delivery)
+        finally:
+            cls._release(delivery_id)
+        
+        result['previous_delivery_id'] = delivery_id
+        result['retry_generation'] = delivery.retry_generation
+        return result
     
     @staticmethod
     def cancel_webhook(delivery_id: str) -> Dict[str, Any]:
@@ -478,35 +1469,41 @@ class WebhookService:
         Cancel a pending or retrying webhook delivery.
         """
         current_app.logger.info(f"--- cancel_webhook started for delivery_id: {delivery_id} ---")
-        try:
-            delivery = WebhookDelivery.objects.get(id=delivery_id)
-            
-            if delivery.is_completed():
-                return {
-                    "status": "error",
-                    "message": f"Webhook delivery is already {delivery.status} and cannot be cancelled"
-                }
-            
-            # Update status to cancelled
-            delivery.status = 'cancelled'
-            delivery.completed_at = datetime.now(timezone.utc)
-            delivery.save()
-            
-            current_app.logger.info(
-                f"Webhook delivery cancelled (delivery_id: {delivery_id})"
-            )
-            
+        # Only the status is needed to decide; the payload is never loaded
+        delivery = WebhookDelivery.objects(id=delivery_id).only('status').first()
+        
+        if delivery is None:
             return {
-                "status": "success",
-                "delivery_id": str(delivery.id),
-                "message": "Webhook delivery cancelled successfully"
+                "status": "error",
+                "message": "Webhook delivery not found"
             }
-            
-        except WebhookDelivery.DoesNotExist:
+        
+        if delivery.is_completed():
             return {
                 "status": "error",
-                "message": "Webhook delivery not found"
+                "message": f"Webhook delivery is already {delivery.status} and cannot be cancelled"
+            }
+        
+        # Update status to cancelled, unless it changed since it was read
+        cancelled = WebhookDelivery.objects(id=delivery_id, status=delivery.status).update_one(
+            set__status='cancelled',
+            set__completed_at=datetime.now(timezone.utc)
+        )
+        if not cancelled:
+            return {
+                "status": "error",
+                "message": "Webhook delivery status changed while cancelling, please try again"
             }
+        
+        current_app.logger.info(
+            f"Webhook delivery cancelled (delivery_id: {delivery_id})"
+        )
+        
+        return {
+            "status": "success",
+            "delivery_id": str(delivery.id),
+            "message": "Webhook delivery cancelled successfully"
+        }
     
     @staticmethod
     def get_webhook_logs(
@@ -533,23 +1530,11 @@ class WebhookService:
         if status:
             query['status'] = status
         
-        logs = WebhookLog.objects(**query).order_by('-created_at').limit(limit)
+        # Raw PyMongo documents skip MongoEngine hydration; the
+        # (url, status, -created_at) indexes serve the filtered sort
+        logs = WebhookLog._get_collection().find(query).sort('created_at', -1).limit(limit)
         
-        return [
-            {
-                'id': str(log.id),
-                'url': log.url,
-                'payload': log.payload,
-                'status': log.status,
-                'attempt_count': log.attempt_count,
-                'last_attempt': log.last_attempt.isoformat() if log.last_attempt else None,
-                'error_message': log.error_message,
-                'status_code': log.status_code,
-                'created_at': log.created_at.isoformat(),
-                'metadata': log.metadata
-            }
-            for log in logs
-        ]
+        return [WebhookService._serialize_log(log) for log in logs]
     
     @staticmethod
     def get_webhook_log_by_id(log_id: str) -> Optional[Dict[str, Any]]:
@@ -563,18 +1548,36 @@ class WebhookService:
             Dictionary with webhook log details or None if not found
         """
         try:
-            log = WebhookLog.objects.get(id=log_id)
-            return {
-                'id': str(log.id),
-                'url': log.url,
-                'payload': log.payload,
-                'status': log.status,
-                'attempt_count': log.attempt_count,
-                'last_attempt': log.last_attempt.isoformat() if log.last_attempt else None,
-                'error_message': log.error_message,
-                'status_code': log.status_code,
-                'created_at': log.created_at.isoformat(),
-                'metadata': log.metadata
-            }
-        except WebhookLog.DoesNotExist:
+            object_id = ObjectId(log_id)
+        except (InvalidId, TypeError):
             return None
+        
+        log = WebhookLog._get_collection().find_one({'_id': object_id})
+        if log is None:
+            return None
+        return WebhookService._serialize_log(log)
+    
+    @staticmethod
+    def _serialize_log(log: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert a raw webhook_logs document to its API dictionary.
+        
+        Args:
+            log: Raw webhook_logs document as returned by PyMongo
+        
+        Returns:
+            Dictionary with webhook log details
+        """
+        last_attempt = log.get('last_attempt')
+        return {
+            'id': str(log['_id']),
+            'url': log.get('url'),
+            'payload': log.get('payload', {}),
+            'status': log.get('status'),
+            'attempt_count': log.get('attempt_count', 0),
+            'last_attempt': last_attempt.isoformat() if last_attempt else None,
+            'error_message': log.get('error_message'),
+            'status_code': log.get('status_code'),
+            'created_at': log['created_at'].isoformat(),
+            'metadata': log.get('metadata', {})
+        }
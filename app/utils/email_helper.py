@@ -1,10 +1,85 @@
 
 import smtplib
 import os
+import queue
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from flask import current_app
 
+# Emails waiting for the background sender: (app, (to_emails, subject, body_html), attempt)
+_email_queue: queue.Queue = queue.Queue()
+_email_worker: threading.Thread | None = None
+_email_worker_lock = threading.Lock()
+
+
+def _smtp_settings() -> dict[str, str] | None:
+    """Read SMTP settings from the environment; None if any are missing"""
+    settings = {
+        'host': os.environ.get("SMTP_HOST"),
+        'port': os.environ.get("SMTP_PORT"),
+        'user': os.environ.get("SMTP_USER"),
+        'password': os.environ.get("SMTP_PASSWORD"),
+    }
+    if not all(settings.values()):
+        return None
+    settings['from'] = os.environ.get("SMTP_FROM", "noreply@form-system.com")
+    return settings
+
+
+def _build_message(smtp_from: str, to_emails: list[str], subject: str, body_html: str) -> MIMEMultipart:
+    """
+    Build an HTML email.
+    
+    Recipients are only given to the SMTP envelope, so with several of them
+    nobody sees the other addresses (as with Bcc).
+    """
+    msg = MIMEMultipart()
+    msg['From'] = smtp_from
+    msg['To'] = to_emails[0] if len(to_emails) == 1 else "undisclosed-recipients:;"
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body_html, 'html'))
+    return msg
+
+
+class EmailSender:
+    """
+    One authenticated SMTP session shared by every email sent inside the block.
+    
+    Usage:
+        with EmailSender(settings) as sender:
+            sender.send(to_emails, subject, body_html)
+    """
+
+    def __init__(self, settings: dict[str, str]):
+        self.settings = settings
+        self.server: smtplib.SMTP | None = None
+
+    def __enter__(self) -> "EmailSender":
+        server = smtplib.SMTP(self.settings['host'], int(self.settings['port']))
+        try:
+            server.starttls()
+            server.login(self.settings['user'], self.settings['password'])
+        except Exception:
+            server.close()
+            raise
+        self.server = server
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            self.server.quit()
+        except smtplib.SMTPException:
+            self.server.close()
+        self.server = None
+
+    def send(self, to_emails: list[str], subject: str, body_html: str) -> None:
+        """Send one email over the open session"""
+        smtp_from = self.settings['from']
+        msg = _build_message(smtp_from, to_emails, subject, body_html)
+        self.server.sendmail(smtp_from, to_emails, msg.as_string())
+
+
 def send_email_notification(to_emails: list[str], subject: str, body_html: str) -> bool:
     """
     Sends an email to the specified list of recipients.
@@ -13,42 +88,170 @@ def send_email_notification(to_emails: list[str], subject: str, body_html: str)
         to_emails (list): List of email addresses.
         subject (str): Email subject.
         body_html (str): Email body (HTML).
-        
+    
     Returns:
         bool: True if successful (or mocked), False otherwise.
     """
     if not to_emails:
         return False
 
-    smtp_host = os.environ.get("SMTP_HOST")
-    smtp_port = os.environ.get("SMTP_PORT")
-    smtp_user = os.environ.get("SMTP_USER")
-    smtp_password = os.environ.get("SMTP_PASSWORD")
-    smtp_from = os.environ.get("SMTP_FROM", "noreply@form-system.com")
-
-    if not all([smtp_host, smtp_port, smtp_user, smtp_password]):
+    settings = _smtp_settings()
+    if settings is None:
         current_app.logger.warning(
             f"SMTP configuration missing. Mocking email send to {to_emails}. Subject: {subject}"
         )
         return True
 
     try:
-        msg = MIMEMultipart()
-        msg['From'] = smtp_from
-        msg['To'] = ", ".join(to_emails)
-        msg['Subject'] = subject
-
-        msg.attach(MIMEText(body_html, 'html'))
-
-        server = smtplib.SMTP(smtp_host, int(smtp_port))
-        server.starttls()
-        server.login(smtp_user, smtp_password)
-        text = msg.as_string()
-        server.sendmail(smtp_from, to_emails, text)
-        server.quit()
-        
+        with EmailSender(settings) as sender:
+            sender.send(to_emails, subject, body_html)
+
         current_app.logger.info(f"Email sent successfully to {to_emails}")
         return True
     except Exception as e:
         current_app.logger.error(f"Failed to send email to {to_emails}: {str(e)}")
         return False
+
+
+def _send_batch(settings: dict[str, str], messages: list[tuple[list[str], str, str]]) -> tuple[int, int]:
+    """
+    Sends messages in order over one SMTP session.
+    
+    Messages whose recipients are all refused are logged and skipped. If the
+    session fails, the remaining messages are left unsent.
+    
+    Returns:
+        tuple: (number of emails sent, index of the first unsent message)
+    """
+    sent = 0
+    done = 0
+    try:
+        with EmailSender(settings) as sender:
+            for to_emails, subject, body_html in messages:
+                try:
+                    sender.send(to_emails, subject, body_html)
+                    sent += 1
+                except smtplib.SMTPRecipientsRefused as e:
+                    current_app.logger.error(f"Failed to send email to {to_emails}: {str(e)}")
+                done += 1
+    except Exception as e:
+        current_app.logger.error(f"Email send stopped after {done} of {len(messages)} emails: {str(e)}")
+    return sent, done
+
+
+def send_bulk(messages: list[tuple[list[str], str, str]]) -> int:
+    """
+    Sends several emails over a single SMTP connection.
+    
+    Args:
+        messages (list): (to_emails, subject, body_html) tuples.
+    
+    Returns:
+        int: Number of emails sent (or mocked).
+    """
+    messages = [message for message in messages if message[0]]
+    if not messages:
+        return 0
+
+    settings = _smtp_settings()
+    if settings is None:
+        current_app.logger.warning(
+            f"SMTP configuration missing. Mocking {len(messages)} email sends."
+        )
+        return len(messages)
+
+    sent, _ = _send_batch(settings, messages)
+    current_app.logger.info(f"Sent {sent} of {len(messages)} emails")
+    return sent
+
+
+def queue_email_notification(to_emails: list[str], subject: str, body_html: str) -> bool:
+    """
+    Queues an email for the background sender and returns immediately.
+    
+    Queued emails are sent in batches over shared SMTP sessions. Emails that
+    fail to send are retried with exponential backoff, up to
+    EMAIL_MAX_ATTEMPTS attempts.
+    
+    Args:
+        to_emails (list): List of email addresses.
+        subject (str): Email subject.
+        body_html (str): Email body (HTML).
+    
+    Returns:
+        bool: True if queued, False if there are no recipients.
+    """
+    if not to_emails:
+        return False
+
+    _ensure_email_worker()
+    _email_queue.put((current_app._get_current_object(), (list(to_emails), subject, body_html), 1))
+    return True
+
+
+def _ensure_email_worker() -> None:
+    """Start the background email sender thread if it is not running"""
+    global _email_worker
+    if _email_worker is None or not _email_worker.is_alive():
+        with _email_worker_lock:
+            if _email_worker is None or not _email_worker.is_alive():
+                _email_worker = threading.Thread(
+                    target=_email_worker_loop, name="email-sender", daemon=True
+                )
+                _email_worker.start()
+
+
+def _email_worker_loop() -> None:
+    """Take queued emails in batches and send each batch over one SMTP session"""
+    while True:
+        items = [_email_queue.get()]
+        batch_size = items[0][0].config.get("EMAIL_BATCH_SIZE", 50)
+        while len(items) < batch_size:
+            try:
+                items.append(_email_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        by_app: dict = {}
+        for item in items:
+            by_app.setdefault(item[0], []).append(item)
+
+        for app, app_items in by_app.items():
+            with app.app_context():
+                try:
+                    _send_queued(app, app_items)
+                except Exception as e:
+                    app.logger.error(f"Email sender error: {str(e)}")
+
+        for _ in items:
+            _email_queue.task_done()
+
+
+def _send_queued(app, items: list[tuple]) -> None:
+    """Send one batch of queued emails and schedule retries for the unsent ones"""
+    messages = [message for _, message, _ in items]
+
+    settings = _smtp_settings()
+    if settings is None:
+        app.logger.warning(
+            f"SMTP configuration missing. Mocking {len(messages)} queued email sends."
+        )
+        return
+
+    sent, done = _send_batch(settings, messages)
+    app.logger.info(f"Sent {sent} of {len(messages)} queued emails")
+
+    max_attempts = app.config.get("EMAIL_MAX_ATTEMPTS", 5)
+    base_delay = app.config.get("EMAIL_RETRY_BASE_DELAY", 10)
+    for _, (to_emails, subject, body_html), attempt in items[done:]:
+        if attempt >= max_attempts:
+            app.logger.error(
+                f"Giving up on email to {to_emails} after {attempt} attempts. Subject: {subject}"
+            )
+            continue
+        delay = base_delay * 2 ** (attempt - 1)
+        retry = threading.Timer(
+            delay, _email_queue.put, args=((app, (to_emails, subject, body_html), attempt + 1),)
+        )
+        retry.daemon = True
+        retry.start()
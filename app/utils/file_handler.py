@@ -1,4 +1,7 @@
+import errno
 import os
+import threading
+from collections import OrderedDict
 from typing import Any
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
@@ -8,23 +11,83 @@ from datetime import datetime, timezone
 import puremagic as magic  # pure-python library for file type detection (no libmagic needed)
 
 # Configure upload settings
-ALLOWED_EXTENSIONS = {
+ALLOWED_EXTENSIONS = frozenset({
     'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx', 'csv'
-}
+})
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+UPLOAD_CHUNK_SIZE = 64 * 1024  # 64KB
+MIME_SNIFF_SIZE = 4096  # Leading bytes used to detect the MIME type
+ENSURED_DIRS_MAX = 8192  # Upload directories remembered as already created
+
+# Upload directories known to exist, least recently used first
+_ensured_dirs: OrderedDict[str, None] = OrderedDict()
+_ensured_dirs_lock = threading.Lock()
 
 def allowed_file(filename: str) -> bool:
     """Check if file extension is allowed"""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return os.path.splitext(filename)[1][1:].lower() in ALLOWED_EXTENSIONS
 
 def get_file_mimetype(filepath: str) -> str | None:
     """Get the actual MIME type of a file"""
     try:
         return magic.from_file(filepath, mime=True)
-    except:
+    except (magic.PureError, ValueError, OSError):
+        return None
+
+def get_bytes_mimetype(head: bytes) -> str | None:
+    """Get the actual MIME type from the leading bytes of a file"""
+    try:
+        return magic.from_string(head, mime=True)
+    except (magic.PureError, ValueError):
         return None
 
+def _ensure_dir(path: str) -> None:
+    """Create an upload directory, skipping the syscalls if it was created before"""
+    with _ensured_dirs_lock:
+        if path in _ensured_dirs:
+            _ensured_dirs.move_to_end(path)
+            return
+    os.makedirs(path, exist_ok=True)
+    with _ensured_dirs_lock:
+        _ensured_dirs[path] = None
+        if len(_ensured_dirs) > ENSURED_DIRS_MAX:
+            _ensured_dirs.popitem(last=False)
+
+def _forget_dir(path: str) -> None:
+    """Drop a removed directory from the created-directory cache"""
+    with _ensured_dirs_lock:
+        _ensured_dirs.pop(path, None)
+
+def _save_with_limit(src, dst: str, limit: int, fsync: bool = False) -> tuple[int, bytes]:
+    """
+    Copy a stream to a new file dst in chunks, failing as soon as it exceeds limit bytes.
+    Raises FileExistsError rather than overwriting or following an existing path.
+    Returns the size written and the leading bytes for MIME detection.
+    """
+    fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o640)
+    total = 0
+    head = b''
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = src.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if not total:
+                    head = chunk[:MIME_SNIFF_SIZE]
+                total += len(chunk)
+                if total > limit:
+                    raise ValueError(f"File too large: over {limit} bytes (max: {limit})")
+                out.write(chunk)
+            if fsync:
+                out.flush()
+                os.fsync(out.fileno())
+    except BaseException:
+        # Don't leave a partial upload behind
+        os.remove(dst)
+        raise
+    return total, head
+
 def save_uploaded_file(file: FileStorage, form_id: str, question_id: str) -> dict[str, Any] | None:
     """Save an uploaded file and return the file info"""
     if not file or file.filename == '':
@@ -33,30 +96,34 @@ def save_uploaded_file(file: FileStorage, form_id: str, question_id: str) -> dic
     if not allowed_file(file.filename):
         raise ValueError(f"File type not allowed: {file.filename}")
     
-    # Generate a unique filename
-    filename = secure_filename(file.filename)
-    unique_filename = f"{uuid.uuid4()}_{filename}"
-    
     # Create directory structure: uploads/<form_id>/<question_id>/
     upload_dir = os.path.join(current_app.config.get('UPLOAD_FOLDER', 'uploads'), 
                               str(form_id), str(question_id))
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    filepath = os.path.join(upload_dir, unique_filename)
+    _ensure_dir(upload_dir)
     
-    # Check file size before saving
-    file.seek(0, os.SEEK_END)  # Go to end of file
-    file_size = file.tell()
-    file.seek(0)  # Reset file pointer
-    
-    if file_size > MAX_FILE_SIZE:
-        raise ValueError(f"File too large: {file_size} bytes (max: {MAX_FILE_SIZE})")
-    
-    # Save the file
-    file.save(filepath)
+    # Save the file in one pass under a unique filename, enforcing the size
+    # limit while streaming. The file is created exclusively, so a name
+    # collision gets a fresh uuid instead of overwriting another upload.
+    filename = secure_filename(file.filename)
+    fsync = current_app.config.get('UPLOAD_FSYNC', False)
+    for attempt in range(2):
+        unique_filename = f"{uuid.uuid4()}_{filename}"
+        filepath = os.path.join(upload_dir, unique_filename)
+        try:
+            file_size, head = _save_with_limit(file.stream, filepath, MAX_FILE_SIZE, fsync)
+            break
+        except FileExistsError:
+            if attempt:
+                raise
+        except FileNotFoundError:
+            # The directory was removed (e.g. by another process) after it was cached
+            if attempt:
+                raise
+            _forget_dir(upload_dir)
+            _ensure_dir(upload_dir)
     
-    # Get the actual MIME type of the saved file
-    actual_mimetype = get_file_mimetype(filepath)
+    # Get the actual MIME type from the bytes already read, not the saved file
+    actual_mimetype = get_bytes_mimetype(head)
     
     # Return file info that will be stored in the database
     return {
@@ -77,18 +144,18 @@ def delete_file(file_path: str) -> bool:
     try:
         if os.path.exists(file_path):
             os.remove(file_path)
-            # Remove empty directories up to the question level
+            # Remove the question directory and then the form directory if they
+            # are empty; rmdir itself refuses non-empty directories
             dir_path = os.path.dirname(file_path)
-            try:
-                if not os.listdir(dir_path):  # If directory is empty
-                    os.rmdir(dir_path)
-                    # Also try to remove the parent form directory if it's empty
-                    parent_dir = os.path.dirname(dir_path)
-                    if not os.listdir(parent_dir):  # If parent is also empty
-                        os.rmdir(parent_dir)
-            except OSError:
-                # Directory not empty, which is fine
-                pass
+            for directory in (dir_path, os.path.dirname(dir_path)):
+                try:
+                    os.rmdir(directory)
+                    _forget_dir(directory)
+                except OSError as e:
+                    if e.errno not in (errno.ENOTEMPTY, errno.EEXIST, errno.EBUSY):
+                        current_app.logger.warning(f"Could not remove directory {directory}: {str(e)}")
+                    # Directory not empty, which is fine
+                    break
         return True
     except Exception as e:
         current_app.logger.error(f"Error deleting file {file_path}: {str(e)}")
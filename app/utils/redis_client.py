@@ -9,10 +9,18 @@ Task: M2-INT-01c - Add distributed locking for concurrent access
 Task: M4-01 - Redis Integration & Performance
 """
 
+from collections import Counter, OrderedDict, defaultdict
 from functools import lru_cache
 from typing import Any, Optional, Dict, List
+import fnmatch
 import hashlib
+import heapq
+import itertools
 import json
+import random
+import re
+import socket
+import sys
 import time
 import threading
 import logging
@@ -20,22 +28,305 @@ from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
-# Simple in-memory cache storage (fallback when Redis unavailable)
-_memory_cache = {}
+# Simple in-memory cache storage (fallback when Redis unavailable), kept in
+# LRU order and capped at _MEMORY_CACHE_MAX_ENTRIES
+_memory_cache = OrderedDict()
+_MEMORY_CACHE_MAX_ENTRIES = 10000
 
-# In-memory lock storage for distributed locking simulation
-_lock_storage = {}
-_lock_mutex = threading.Lock()
+# Total size of the cached values, kept up to date on every write and
+# removal so stats never walk the cache (see _drop_entry)
+_memory_bytes = 0
 
-# Cache statistics tracking
-_cache_stats = {
-    'hits': 0,
-    'misses': 0,
-    'errors': 0,
-    'evictions': 0,
-    'writes': 0
+# Guards the in-memory cache and its indexes (separate from _lock_mutexes so
+# cache reads never wait on lock bookkeeping)
+_memory_lock = threading.Lock()
+
+# Min-heap of (expires, key) over the in-memory cache, so expired entries are
+# dropped in expiry order without scanning every key. Entries go stale when a
+# key is rewritten or removed and are skipped when popped.
+_expiry_heap: List[tuple] = []
+_EXPIRY_PURGE_BATCH = 64  # Expired entries removed per get/set
+
+# TCP keepalive probes for pooled Redis sockets (idle seconds, probe interval,
+# failed probes before the connection is dropped), where the platform has them
+_KEEPALIVE_OPTIONS = {
+    getattr(socket, name): value
+    for name, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 30), ('TCP_KEEPCNT', 3))
+    if hasattr(socket, name)
 }
 
+# Seconds a pooled connection may sit idle before it is checked on next use
+_HEALTH_CHECK_INTERVAL = 30
+
+# JSON codec for cached values, built once: compact separators keep stored
+# values small, and reusing the encoder avoids building one per dumps() call
+_json_encode = json.JSONEncoder(separators=(',', ':')).encode
+_json_decode = json.JSONDecoder().decode
+
+# Cache keys whose fallback is being computed in this process, so concurrent
+# misses on the same key wait for one computation instead of repeating it
+_inflight: Dict[str, threading.Event] = {}
+_inflight_mutex = threading.Lock()
+_INFLIGHT_WAIT = 5  # Seconds a waiting caller gives the computing one
+
+# Keys fetched per SCAN round trip / removed per UNLINK call
+_SCAN_BATCH_SIZE = 1000
+
+# Commands sent per pipeline flush / keys fetched per MGET in bulk operations
+_PIPELINE_CHUNK_SIZE = 500
+
+# In-memory lock storage for distributed locking simulation, split into
+# shards that each have their own mutex so unrelated keys do not contend
+# (_LOCK_SHARDS must be a power of two)
+_LOCK_SHARDS = 64
+_lock_storage = [{} for _ in range(_LOCK_SHARDS)]
+_lock_mutexes = [threading.Lock() for _ in range(_LOCK_SHARDS)]
+
+# Per-shard min-heaps of (expires, lock_key), so cleanup touches only the
+# expired locks; entries for released or re-acquired locks go stale and are
+# skipped, as in _expiry_heap
+_lock_expiry = [[] for _ in range(_LOCK_SHARDS)]
+
+
+# Deletes a Redis lock only if it still holds the owner's value
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+# Writes a cache value only if its lock is free (or held by this owner), so
+# a locked set takes one round trip instead of acquire, set and release
+_LOCKED_SET_SCRIPT = """
+local holder = redis.call('GET', KEYS[1])
+if holder and holder ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+@lru_cache(maxsize=1024)
+def _lock_key(key: str) -> str:
+    """
+    Lock key for a cache key.
+    
+    Recently used lock keys are built once and interned, so repeated lock
+    calls on a key reuse one string and dict lookups on it compare by
+    identity.
+    """
+    return sys.intern(f"{key}:lock")
+
+
+def _lock_shard(lock_key: str) -> int:
+    """Index of the lock storage shard holding a lock key."""
+    return hash(lock_key) & (_LOCK_SHARDS - 1)
+
+# Cache statistics tracking
+_cache_stats = Counter(hits=0, misses=0, errors=0, evictions=0, writes=0, rejections=0)
+
+
+def _record_stat(stat: str, count: int = 1) -> None:
+    """
+    Add to a cache statistic.
+    
+    Counter.update over an iterable is counted in C without releasing the
+    GIL, so concurrent increments are not lost as with `+= 1` on a dict.
+    """
+    _cache_stats.update(itertools.repeat(stat, count))
+
+# Secondary indexes over the in-memory cache so namespace lookups do not scan
+# every key: each ':'-terminated prefix and each ':'-separated segment of a key
+# maps to the set of keys containing it.
+_prefix_index = defaultdict(set)
+_segment_index = defaultdict(set)
+
+
+def _index_key(key: str) -> None:
+    """Register a memory-cache key in the prefix and segment indexes."""
+    segments = key.split(':')
+    prefix = ''
+    for segment in segments[:-1]:
+        prefix += segment + ':'
+        _prefix_index[prefix].add(key)
+    for segment in segments:
+        _segment_index[segment].add(key)
+
+
+@lru_cache(maxsize=256)
+def _compile_glob(pattern: str) -> re.Pattern:
+    """Compile a glob key pattern to a regex, reusing it for recurring patterns."""
+    return re.compile(fnmatch.translate(pattern))
+
+
+def _purge_expired(now: float, max_work: int = _EXPIRY_PURGE_BATCH) -> int:
+    """
+    Remove up to max_work expired in-memory entries, soonest expiry first.
+    
+    Must be called with _memory_lock held.
+    
+    Returns:
+        Number of entries removed
+    """
+    removed = 0
+    while _expiry_heap and _expiry_heap[0][0] <= now and removed < max_work:
+        expires, key = heapq.heappop(_expiry_heap)
+        data = _memory_cache.get(key)
+        # Skip heap entries for keys rewritten or removed since
+        if data is None or data['expires'] != expires:
+            continue
+        _drop_entry(key)
+        _record_stat('evictions')
+        removed += 1
+    return removed
+
+
+def _drop_entry(key: str) -> None:
+    """
+    Remove an in-memory cache entry with its index and size bookkeeping.
+    
+    Must be called with _memory_lock held.
+    """
+    global _memory_bytes
+    data = _memory_cache.pop(key)
+    _memory_bytes -= data['size']
+    _unindex_key(key)
+
+
+def _memory_get(key: str, now: float) -> Optional[str]:
+    """
+    Read a live in-memory cache entry, dropping it if it has expired.
+    
+    Must be called with _memory_lock held.
+    """
+    data = _memory_cache.get(key)
+    if data is not None:
+        # Check if expired
+        if data.get('expires', float('inf')) > now:
+            _memory_cache.move_to_end(key)
+            _memory_sketch.increment(key)
+            _record_stat('hits')
+            return data.get('value')
+        # Clean up expired entry
+        _drop_entry(key)
+    _record_stat('misses')
+    return None
+
+
+def _memory_set(key: str, value: str, expires: float) -> bool:
+    """
+    Write an in-memory cache entry, evicting least recently used ones.
+    
+    Must be called with _memory_lock held.
+    
+    Returns:
+        False if the cache is full and the key was not admitted
+    """
+    global _memory_bytes
+    size = len(str(value))
+    _memory_sketch.increment(key)
+    previous = _memory_cache.get(key)
+    if previous is None:
+        # At capacity, only admit a new key seen at least as often
+        # as the entry it would evict
+        if len(_memory_cache) >= _MEMORY_CACHE_MAX_ENTRIES:
+            victim = next(iter(_memory_cache))
+            if _memory_sketch.estimate(key) < _memory_sketch.estimate(victim):
+                _record_stat('rejections')
+                return False
+        _index_key(key)
+    else:
+        _memory_bytes -= previous['size']
+    _memory_cache[key] = {
+        'value': value,
+        'expires': expires,
+        'size': size
+    }
+    _memory_bytes += size
+    _memory_cache.move_to_end(key)
+    heapq.heappush(_expiry_heap, (expires, key))
+    # Drop stale heap entries once they outnumber the live ones
+    if len(_expiry_heap) > 2 * max(len(_memory_cache), _EXPIRY_PURGE_BATCH):
+        _expiry_heap[:] = [(data['expires'], k) for k, data in _memory_cache.items()]
+        heapq.heapify(_expiry_heap)
+    # Evict least recently used entries beyond the cap
+    while len(_memory_cache) > _MEMORY_CACHE_MAX_ENTRIES:
+        _drop_entry(next(iter(_memory_cache)))
+        _record_stat('evictions')
+    _record_stat('writes')
+    return True
+
+
+def _unindex_key(key: str) -> None:
+    """Remove a memory-cache key from the prefix and segment indexes."""
+    segments = key.split(':')
+    prefix = ''
+    for segment in segments[:-1]:
+        prefix += segment + ':'
+        bucket = _prefix_index.get(prefix)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del _prefix_index[prefix]
+    for segment in segments:
+        bucket = _segment_index.get(segment)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del _segment_index[segment]
+
+
+class CountMinSketch:
+    """
+    Approximate access counts for in-memory cache keys (TinyLFU).
+    
+    Each key maps to one 4-bit counter per row; its estimate is the smallest
+    of them, so collisions can only overcount. Every `sample_size` recorded
+    accesses all counters are halved, letting keys that were popular long ago
+    fade out.
+    """
+    
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.sample_size = 10 * width
+        self._counters = bytearray(width * depth)
+        self._additions = 0
+    
+    def _slots(self, key: str) -> List[int]:
+        """Counter index for the key in each row."""
+        width = self.width
+        return [row * width + hash((row, key)) % width for row in range(self.depth)]
+    
+    def increment(self, key: str) -> None:
+        """Record one access to a key."""
+        counters = self._counters
+        for slot in self._slots(key):
+            if counters[slot] < 15:
+                counters[slot] += 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._counters = bytearray(count >> 1 for count in counters)
+            self._additions //= 2
+    
+    def estimate(self, key: str) -> int:
+        """Estimated recent access count of a key."""
+        counters = self._counters
+        return min(counters[slot] for slot in self._slots(key))
+    
+    def clear(self) -> None:
+        """Forget all recorded accesses."""
+        self._counters = bytearray(self.width * self.depth)
+        self._additions = 0
+
+
+# Access frequencies of in-memory cache keys, used to decide whether a new key
+# may evict the least recently used one (guarded by _memory_lock)
+_memory_sketch = CountMinSketch(width=2048, depth=4)
+
 
 class RedisClient:
     """
@@ -49,12 +340,15 @@ class RedisClient:
     """
     
     def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0,
-                 password: Optional[str] = None, max_connections: int = 50,
+                 password: Optional[str] = None, max_connections: int = 8,
                  socket_timeout: int = 5, socket_connect_timeout: int = 5):
         self.host = host
         self.port = port
         self.db = db
         self.password = password
+        # Cache commands are short GET/SET round trips, so a few pooled
+        # connections serve many threads; raise this only if long blocking
+        # commands share the pool
         self.max_connections = max_connections
         self.socket_timeout = socket_timeout
         self.socket_connect_timeout = socket_connect_timeout
@@ -62,13 +356,18 @@ class RedisClient:
         self._client = None
         self._connected = False
         self._use_fallback = True  # Start with fallback enabled
+        self._last_ok = 0.0  # time.monotonic() of the last successful Redis command
         
         # Distributed locking configuration
         self._locks = {}  # Track active locks for this instance
+        self._thread_locks = threading.local()  # Lock values held by each thread
         self._lock_timeout = 30  # Default lock timeout in seconds
         self._lock_retry_max_attempts = 3  # Max retry attempts for lock acquisition
-        self._lock_retry_backoff = 0.1  # Initial backoff in seconds
+        self._lock_retry_backoff = 0.005  # Initial backoff in seconds
         self._lock_retry_backoff_multiplier = 2.0  # Backoff multiplier
+        self._lock_retry_backoff_cap = 0.5  # Longest backoff in seconds
+        self._release_script = None  # Registered _RELEASE_LOCK_SCRIPT, on first use
+        self._locked_set_script = None  # Registered _LOCKED_SET_SCRIPT, on first use
         
         # Try to connect to Redis
         self._initialize_redis()
@@ -79,7 +378,9 @@ class RedisClient:
             import redis
             from redis.connection import ConnectionPool
             
-            # Create connection pool
+            # Create connection pool. redis-py already sets TCP_NODELAY on its
+            # sockets; keepalive and health checks catch dead idle connections
+            # before a command is sent on them.
             pool = ConnectionPool(
                 host=self.host,
                 port=self.port,
@@ -88,6 +389,9 @@ class RedisClient:
                 max_connections=self.max_connections,
                 socket_timeout=self.socket_timeout,
                 socket_connect_timeout=self.socket_connect_timeout,
+                socket_keepalive=True,
+                socket_keepalive_options=_KEEPALIVE_OPTIONS,
+                health_check_interval=_HEALTH_CHECK_INTERVAL,
                 retry_on_timeout=True,
                 decode_responses=True
             )
@@ -96,6 +400,7 @@ class RedisClient:
             
             # Test connection
             self._client.ping()
+            self._last_ok = time.monotonic()
             self._connected = True
             self._use_fallback = False
             logger.info(f"Connected to Redis at {self.host}:{self.port}")
@@ -113,17 +418,17 @@ class RedisClient:
         return self._connected
     
     def is_connected(self) -> bool:
-        """Check if connected to Redis."""
-        if self._use_fallback:
+        """
+        Check if connected to Redis.
+        
+        Successful commands count as health checks, so the server is only
+        pinged when none has succeeded within the health check interval.
+        """
+        if self._use_fallback or not self._client:
             return False
-        try:
-            if self._client:
-                self._client.ping()
-                return True
-        except Exception:
-            self._connected = False
-            self._use_fallback = True
-        return False
+        if time.monotonic() - self._last_ok < _HEALTH_CHECK_INTERVAL:
+            return True
+        return self.ping()
     
     def get(self, key: str) -> Optional[str]:
         """
@@ -138,31 +443,23 @@ class RedisClient:
         try:
             if not self._use_fallback and self._client:
                 value = self._client.get(key)
+                self._last_ok = time.monotonic()
                 if value is not None:
-                    _cache_stats['hits'] += 1
+                    _record_stat('hits')
                     return value
                 else:
-                    _cache_stats['misses'] += 1
+                    _record_stat('misses')
                     return None
         except Exception as e:
             logger.warning(f"Redis get failed for key '{key}': {e}, falling back to in-memory")
-            _cache_stats['errors'] += 1
+            _record_stat('errors')
             self._use_fallback = True
         
         # Fallback to in-memory cache
-        if key in _memory_cache:
-            data = _memory_cache[key]
-            # Check if expired
-            if data.get('expires', float('inf')) > time.time():
-                _cache_stats['hits'] += 1
-                return data.get('value')
-            else:
-                # Clean up expired entry
-                del _memory_cache[key]
-                _cache_stats['misses'] += 1
-        else:
-            _cache_stats['misses'] += 1
-        return None
+        now = time.time()
+        with _memory_lock:
+            _purge_expired(now)
+            return _memory_get(key, now)
     
     def set(self, key: str, value: str, ttl: int = 3600) -> bool:
         """
@@ -179,38 +476,67 @@ class RedisClient:
         try:
             if not self._use_fallback and self._client:
                 self._client.setex(key, ttl, value)
-                _cache_stats['writes'] += 1
+                self._last_ok = time.monotonic()
+                _record_stat('writes')
                 return True
         except Exception as e:
             logger.warning(f"Redis set failed for key '{key}': {e}, falling back to in-memory")
-            _cache_stats['errors'] += 1
+            _record_stat('errors')
             self._use_fallback = True
         
         # Fallback to in-memory cache
-        _memory_cache[key] = {
-            'value': value,
-            'expires': time.time() + ttl
-        }
-        _cache_stats['writes'] += 1
-        return True
+        now = time.time()
+        with _memory_lock:
+            _purge_expired(now)
+            return _memory_set(key, value, now + ttl)
     
     def delete(self, key: str) -> bool:
         """Delete key from cache."""
         try:
             if not self._use_fallback and self._client:
                 deleted = self._client.delete(key)
+                self._last_ok = time.monotonic()
                 return deleted > 0
         except Exception as e:
             logger.warning(f"Redis delete failed for key '{key}': {e}, falling back to in-memory")
-            _cache_stats['errors'] += 1
+            _record_stat('errors')
             self._use_fallback = True
         
         # Fallback to in-memory cache
-        if key in _memory_cache:
-            del _memory_cache[key]
-            return True
+        with _memory_lock:
+            if key in _memory_cache:
+                _drop_entry(key)
+                return True
         return False
     
+    def delete_many(self, keys: list) -> int:
+        """
+        Delete multiple keys.
+        
+        Uses non-blocking UNLINK in batches when backed by Redis.
+        
+        Args:
+            keys: Cache keys to delete
+            
+        Returns:
+            Number of keys deleted
+        """
+        if not keys:
+            return 0
+        try:
+            if not self._use_fallback and self._client:
+                deleted = 0
+                for start in range(0, len(keys), _SCAN_BATCH_SIZE):
+                    deleted += self._client.unlink(*keys[start:start + _SCAN_BATCH_SIZE])
+                return deleted
+        except Exception as e:
+            logger.warning(f"Redis delete_many failed: {e}, falling back to in-memory")
+            _record_stat('errors')
+            self._use_fallback = True
+        
+        # Fallback to in-memory cache
+        return sum(1 for key in keys if self.delete(key))
+    
     def clear(self) -> bool:
         """Clear all cached values."""
         try:
@@ -219,64 +545,89 @@ class RedisClient:
                 return True
         except Exception as e:
             logger.warning(f"Redis clear failed: {e}, falling back to in-memory")
-            _cache_stats['errors'] += 1
+            _record_stat('errors')
             self._use_fallback = True
         
         # Fallback to in-memory cache
-        _memory_cache.clear()
+        global _memory_bytes
+        with _memory_lock:
+            _memory_cache.clear()
+            _memory_bytes = 0
+            _memory_sketch.clear()
+            _expiry_heap.clear()
+            _prefix_index.clear()
+            _segment_index.clear()
         return True
     
     def get_many(self, keys: list) -> dict:
-        """Get multiple values."""
+        """Get multiple values, fetching up to _PIPELINE_CHUNK_SIZE keys per MGET."""
         try:
             if not self._use_fallback and self._client:
-                values = self._client.mget(keys)
                 result = {}
-                for key, value in zip(keys, values):
-                    if value is not None:
-                        result[key] = value
-                        _cache_stats['hits'] += 1
-                    else:
-                        _cache_stats['misses'] += 1
+                for start in range(0, len(keys), _PIPELINE_CHUNK_SIZE):
+                    chunk = keys[start:start + _PIPELINE_CHUNK_SIZE]
+                    for key, value in zip(chunk, self._client.mget(chunk)):
+                        if value is not None:
+                            result[key] = value
+                            _record_stat('hits')
+                        else:
+                            _record_stat('misses')
                 return result
         except Exception as e:
             logger.warning(f"Redis get_many failed: {e}, falling back to in-memory")
-            _cache_stats['errors'] += 1
+            _record_stat('errors')
             self._use_fallback = True
         
-        # Fallback to in-memory cache
+        # Fallback to in-memory cache, read under one lock acquisition
         result = {}
-        for key in keys:
-            val = self.get(key)
-            if val is not None:
-                result[key] = val
+        now = time.time()
+        with _memory_lock:
+            _purge_expired(now)
+            for key in keys:
+                val = _memory_get(key, now)
+                if val is not None:
+                    result[key] = val
         return result
     
     def set_many(self, mapping: dict, ttl: int = 3600) -> bool:
-        """Set multiple values."""
+        """
+        Set multiple values.
+        
+        On Redis the SETEX commands are pipelined without MULTI/EXEC and
+        flushed every _PIPELINE_CHUNK_SIZE commands, so a large mapping is
+        not buffered and sent as one huge write. The in-memory fallback
+        returns False if any key was not admitted.
+        """
         try:
             if not self._use_fallback and self._client:
-                pipe = self._client.pipeline()
-                for key, value in mapping.items():
-                    pipe.setex(key, ttl, value)
-                pipe.execute()
-                _cache_stats['writes'] += len(mapping)
+                items = list(mapping.items())
+                for start in range(0, len(items), _PIPELINE_CHUNK_SIZE):
+                    pipe = self._client.pipeline(transaction=False)
+                    for key, value in items[start:start + _PIPELINE_CHUNK_SIZE]:
+                        pipe.setex(key, ttl, value)
+                    pipe.execute()
+                _record_stat('writes', len(items))
                 return True
         except Exception as e:
             logger.warning(f"Redis set_many failed: {e}, falling back to in-memory")
-            _cache_stats['errors'] += 1
+            _record_stat('errors')
             self._use_fallback = True
         
-        # Fallback to in-memory cache
-        for key, value in mapping.items():
-            self.set(key, value, ttl)
-        return True
+        # Fallback to in-memory cache, written under one lock acquisition
+        now = time.time()
+        admitted = True
+        with _memory_lock:
+            _purge_expired(now)
+            for key, value in mapping.items():
+                admitted = _memory_set(key, value, now + ttl) and admitted
+        return admitted
     
     def ping(self) -> bool:
         """Check Redis connection."""
         try:
             if not self._use_fallback and self._client:
                 self._client.ping()
+                self._last_ok = time.monotonic()
                 return True
         except Exception:
             self._connected = False
@@ -287,6 +638,10 @@ class RedisClient:
         """
         Invalidate all keys matching pattern.
         
+        On Redis the keyspace is walked with SCAN rather than KEYS, so the
+        server is never blocked on one O(N) command, and matches are freed
+        with non-blocking UNLINK in batches.
+        
         Args:
             pattern: Redis key pattern (e.g., "form:schema:*")
             
@@ -295,25 +650,83 @@ class RedisClient:
         """
         try:
             if not self._use_fallback and self._client:
-                keys = self._client.keys(pattern)
-                if keys:
-                    deleted = self._client.delete(*keys)
-                    _cache_stats['evictions'] += deleted
-                    return deleted
-                return 0
+                deleted = 0
+                batch = []
+                for key in self._client.scan_iter(match=pattern, count=_SCAN_BATCH_SIZE):
+                    batch.append(key)
+                    if len(batch) >= _SCAN_BATCH_SIZE:
+                        deleted += self._client.unlink(*batch)
+                        batch = []
+                if batch:
+                    deleted += self._client.unlink(*batch)
+                _record_stat('evictions', deleted)
+                return deleted
         except Exception as e:
             logger.warning(f"Redis invalidate_pattern failed: {e}, falling back to in-memory")
-            _cache_stats['errors'] += 1
+            _record_stat('errors')
             self._use_fallback = True
         
         # Fallback to in-memory cache (simple pattern matching)
-        import fnmatch
-        keys_to_delete = [k for k in _memory_cache.keys() if fnmatch.fnmatch(k, pattern)]
-        for key in keys_to_delete:
-            del _memory_cache[key]
-        _cache_stats['evictions'] += len(keys_to_delete)
+        matches = _compile_glob(pattern).match
+        with _memory_lock:
+            keys_to_delete = [k for k in _memory_cache if matches(k)]
+            for key in keys_to_delete:
+                _drop_entry(key)
+            _record_stat('evictions', len(keys_to_delete))
         return len(keys_to_delete)
     
+    def keys_with_prefix(self, prefix: str) -> List[str]:
+        """
+        List keys starting with a ':'-terminated namespace prefix.
+        
+        Args:
+            prefix: Key prefix ending in ':' (e.g., "summary:form123:")
+            
+        Returns:
+            List of matching keys
+        """
+        try:
+            if not self._use_fallback and self._client:
+                return list(self._client.scan_iter(match=f"{prefix}*", count=_SCAN_BATCH_SIZE))
+        except Exception as e:
+            logger.warning(f"Redis keys_with_prefix failed: {e}, falling back to in-memory")
+            _record_stat('errors')
+            self._use_fallback = True
+        
+        # Fallback to the in-memory prefix index
+        with _memory_lock:
+            return list(_prefix_index.get(prefix, ()))
+    
+    def keys_with_segment(self, segment: str, *more_segments: str) -> List[str]:
+        """
+        List keys containing every given ':'-separated segment.
+        
+        Args:
+            segment: Key segment (e.g., "executive" matches "executive:form123")
+            *more_segments: Further segments the key must also contain
+            
+        Returns:
+            List of matching keys
+        """
+        segments = (segment,) + more_segments
+        try:
+            if not self._use_fallback and self._client:
+                return [
+                    k for k in self._client.scan_iter(match=f"*{segment}*", count=_SCAN_BATCH_SIZE)
+                    if set(segments).issubset(k.split(':'))
+                ]
+        except Exception as e:
+            logger.warning(f"Redis keys_with_segment failed: {e}, falling back to in-memory")
+            _record_stat('errors')
+            self._use_fallback = True
+        
+        # Fallback to the in-memory segment index, intersecting from the
+        # smallest bucket so the cost is bounded by the rarest segment
+        with _memory_lock:
+            buckets = sorted((_segment_index.get(s, set()) for s in segments), key=len)
+            smallest, others = buckets[0], buckets[1:]
+            return [k for k in smallest if all(k in bucket for bucket in others)]
+    
     def get_cache_stats(self) -> Dict[str, Any]:
         """
         Get comprehensive cache statistics.
@@ -342,29 +755,48 @@ class RedisClient:
                 }
         except Exception as e:
             logger.warning(f"Redis get_cache_stats failed: {e}, using in-memory stats")
-            _cache_stats['errors'] += 1
+            _record_stat('errors')
             self._use_fallback = True
         
         # Fallback to in-memory stats
+        with _memory_lock:
+            total_keys = len(_memory_cache)
+            memory_used = _memory_bytes
         return {
             'backend': 'in_memory',
             'connected': False,
-            'total_keys': len(_memory_cache),
+            'total_keys': total_keys,
             'hits': _cache_stats['hits'],
             'misses': _cache_stats['misses'],
             'hit_ratio': _cache_stats['hits'] / (_cache_stats['hits'] + _cache_stats['misses']) if (_cache_stats['hits'] + _cache_stats['misses']) > 0 else 0.0,
-            'memory_used': sum(len(str(v['value'])) for v in _memory_cache.values()),
-            'memory_human': f"{sum(len(str(v['value'])) for v in _memory_cache.values())} bytes",
+            'memory_used': memory_used,
+            'memory_human': f"{memory_used} bytes",
             'evictions': _cache_stats['evictions'],
+            'rejections': _cache_stats['rejections'],
             'writes': _cache_stats['writes'],
             'errors': _cache_stats['errors'],
             'fallback_mode': True
         }
     
+    def cleanup_expired_cache(self) -> int:
+        """
+        Remove every expired entry from the in-memory cache.
+        
+        Returns:
+            Number of entries removed
+        """
+        with _memory_lock:
+            return _purge_expired(time.time(), max_work=len(_expiry_heap))
+    
     def get_with_fallback(self, key: str, fallback_func, ttl: int = 300) -> Any:
         """
         Get from cache, fallback to DB if miss.
         
+        Concurrent misses on the same key in this process run fallback_func
+        once: the other callers wait up to _INFLIGHT_WAIT seconds and read
+        the cached result, computing it themselves only if it is still
+        missing.
+        
         Args:
             key: Cache key
             fallback_func: Function to call on cache miss
@@ -375,25 +807,48 @@ class RedisClient:
         """
         value = self.get(key)
         if value is not None:
-            try:
-                return json.loads(value)
-            except json.JSONDecodeError:
-                return value
+            return self._decode_cached(value)
         
-        # Cache miss, call fallback function
-        value = fallback_func()
+        with _inflight_mutex:
+            event = _inflight.get(key)
+            computing = event is None
+            if computing:
+                event = _inflight[key] = threading.Event()
+        
+        if not computing:
+            event.wait(_INFLIGHT_WAIT)
+            value = self.get(key)
+            if value is not None:
+                return self._decode_cached(value)
         
-        # Cache the result
         try:
-            if isinstance(value, (dict, list)):
-                self.set(key, json.dumps(value), ttl)
-            else:
-                self.set(key, str(value), ttl)
-        except Exception as e:
-            logger.warning(f"Failed to cache result for key '{key}': {e}")
+            # Cache miss, call fallback function
+            value = fallback_func()
+            
+            # Cache the result
+            try:
+                if isinstance(value, (dict, list)):
+                    self.set(key, _json_encode(value), ttl)
+                else:
+                    self.set(key, str(value), ttl)
+            except Exception as e:
+                logger.warning(f"Failed to cache result for key '{key}': {e}")
+        finally:
+            if computing:
+                with _inflight_mutex:
+                    del _inflight[key]
+                event.set()
         
         return value
     
+    @staticmethod
+    def _decode_cached(value: str) -> Any:
+        """Decode a value stored by get_with_fallback (JSON, else the raw string)."""
+        try:
+            return _json_decode(value)
+        except json.JSONDecodeError:
+            return value
+    
     @contextmanager
     def pipeline(self):
         """
@@ -410,7 +865,7 @@ class RedisClient:
                 return
             except Exception as e:
                 logger.warning(f"Redis pipeline failed: {e}")
-                _cache_stats['errors'] += 1
+                _record_stat('errors')
         
         # Fallback: yield None, operations will be executed individually
         yield None
@@ -421,6 +876,9 @@ class RedisClient:
         """
         Acquire a distributed lock for a cache key.
         
+        Backed by Redis SET NX PX so the lock is shared by every process;
+        the in-memory lock storage is used only in fallback mode.
+        
         Args:
             key: Lock key (typically cache key with :lock suffix)
             timeout: Lock timeout in seconds (uses default if None)
@@ -428,31 +886,84 @@ class RedisClient:
         Returns:
             True if lock acquired successfully, False otherwise
         """
-        lock_key = f"{key}:lock"
+        lock_key = _lock_key(key)
         lock_timeout = timeout or self._lock_timeout
-        lock_value = f"{threading.current_thread().ident}:{time.time()}"
+        thread_id = threading.get_ident()
+        lock_value = f"{thread_id}:{time.time()}"
+        
+        try:
+            if not self._use_fallback and self._client:
+                if not self._client.set(lock_key, lock_value, nx=True, px=int(lock_timeout * 1000)):
+                    return False
+                self._locks[lock_key] = lock_value
+                self._held_locks()[lock_key] = lock_value
+                return True
+        except Exception as e:
+            logger.warning(f"Redis acquire_lock failed for key '{key}': {e}, falling back to in-memory")
+            _record_stat('errors')
+            self._use_fallback = True
+        
+        # In-memory locks expire on the monotonic clock, unaffected by
+        # wall-clock adjustments
+        now = time.monotonic()
+        shard = _lock_shard(lock_key)
+        storage = _lock_storage[shard]
+        
+        # A held lock can be seen without the mutex (dict reads are atomic);
+        # only a lock that looks free is checked again under it
+        existing_lock = storage.get(lock_key)
+        if existing_lock is not None and existing_lock['expires'] > now:
+            return False
         
-        with _lock_mutex:
+        with _lock_mutexes[shard]:
             # Check if lock exists and is not expired
-            if lock_key in _lock_storage:
-                existing_lock = _lock_storage[lock_key]
-                if existing_lock['expires'] > time.time():
+            if lock_key in storage:
+                existing_lock = storage[lock_key]
+                if existing_lock['expires'] > now:
                     # Lock is still held by another thread
                     return False
                 else:
                     # Lock expired, remove it
-                    del _lock_storage[lock_key]
+                    del storage[lock_key]
             
             # Acquire the lock
-            _lock_storage[lock_key] = {
+            expires = now + lock_timeout
+            storage[lock_key] = {
                 'value': lock_value,
-                'expires': time.time() + lock_timeout,
-                'thread_id': threading.current_thread().ident
+                'expires': expires,
+                'thread_id': thread_id
             }
             self._locks[lock_key] = lock_value
+            self._held_locks()[lock_key] = lock_value
+            
+            heap = _lock_expiry[shard]
+            heapq.heappush(heap, (expires, lock_key))
+            # Drop stale heap entries once they outnumber the held locks
+            if len(heap) > 2 * max(len(storage), _EXPIRY_PURGE_BATCH):
+                heap[:] = [(data['expires'], k) for k, data in storage.items()]
+                heapq.heapify(heap)
             
             return True
     
+    def _held_locks(self) -> Dict[str, str]:
+        """
+        Lock values held by the calling thread, by lock key.
+        
+        The client is shared across threads, so self._locks holds whichever
+        thread's value was stored last; ownership checks use this instead.
+        """
+        held = getattr(self._thread_locks, 'values', None)
+        if held is None:
+            held = self._thread_locks.values = {}
+        return held
+    
+    def _forget_lock(self, lock_key: str, lock_value: str) -> None:
+        """Drop the calling thread's record of a lock it released."""
+        self._held_locks().pop(lock_key, None)
+        # Leave the entry alone if another thread has since taken the lock
+        if self._locks.get(lock_key) == lock_value:
+            del self._locks[lock_key]
+    
     def release_lock(self, key: str) -> bool:
         """
         Release a distributed lock for a cache key.
@@ -461,18 +972,35 @@ class RedisClient:
             key: Lock key (typically cache key with :lock suffix)
             
         Returns:
-            True if lock released successfully, False otherwise
+            True if lock released successfully, False otherwise (including
+            when the calling thread does not hold the lock)
         """
-        lock_key = f"{key}:lock"
-        lock_value = self._locks.get(lock_key)
+        lock_key = _lock_key(key)
+        lock_value = self._held_locks().get(lock_key)
+        if lock_value is None:
+            return False
         
-        with _lock_mutex:
-            if lock_key in _lock_storage:
+        try:
+            if not self._use_fallback and self._client:
+                if self._release_script is None:
+                    self._release_script = self._client.register_script(_RELEASE_LOCK_SCRIPT)
+                released = self._release_script(keys=[lock_key], args=[lock_value])
+                self._forget_lock(lock_key, lock_value)
+                return bool(released)
+        except Exception as e:
+            logger.warning(f"Redis release_lock failed for key '{key}': {e}, falling back to in-memory")
+            _record_stat('errors')
+            self._use_fallback = True
+        
+        shard = _lock_shard(lock_key)
+        storage = _lock_storage[shard]
+        
+        with _lock_mutexes[shard]:
+            if lock_key in storage:
                 # Verify we own the lock
-                if _lock_storage[lock_key]['value'] == lock_value:
-                    del _lock_storage[lock_key]
-                    if lock_key in self._locks:
-                        del self._locks[lock_key]
+                if storage[lock_key]['value'] == lock_value:
+                    del storage[lock_key]
+                    self._forget_lock(lock_key, lock_value)
                     return True
                 else:
                     # Lock held by another thread
@@ -484,6 +1012,9 @@ class RedisClient:
         """
         Acquire a lock with retry logic and exponential backoff.
         
+        Each wait is a random time up to the current backoff (full jitter),
+        so contending workers do not retry in lockstep.
+        
         Args:
             key: Lock key
             timeout: Lock timeout in seconds (uses default if None)
@@ -492,16 +1023,29 @@ class RedisClient:
         Returns:
             True if lock acquired successfully, False otherwise
         """
+        return self._retry(lambda: self.acquire_lock(key, timeout), max_attempts)
+    
+    def _retry(self, attempt, max_attempts: Optional[int] = None) -> bool:
+        """
+        Call attempt() until it returns True, with jittered exponential backoff.
+        
+        Args:
+            attempt: Callable returning True on success
+            max_attempts: Maximum attempts (uses the lock retry default if None)
+            
+        Returns:
+            True if an attempt succeeded, False otherwise
+        """
         max_attempts = max_attempts or self._lock_retry_max_attempts
         backoff = self._lock_retry_backoff
         
-        for attempt in range(max_attempts):
-            if self.acquire_lock(key, timeout):
+        for attempt_num in range(max_attempts):
+            if attempt():
                 return True
             
-            # Wait with exponential backoff
-            if attempt < max_attempts - 1:
-                time.sleep(backoff)
+            # Wait with jittered exponential backoff
+            if attempt_num < max_attempts - 1:
+                time.sleep(random.uniform(0, min(backoff, self._lock_retry_backoff_cap)))
                 backoff *= self._lock_retry_backoff_multiplier
         
         return False
@@ -511,6 +1055,10 @@ class RedisClient:
         """
         Set a cache value with distributed locking.
         
+        On Redis the lock check and the write run as one atomic script, so
+        no lock is taken and lock_timeout does not apply; the write is
+        retried while another owner holds the key's lock.
+        
         Args:
             key: Cache key
             value: Value to cache
@@ -520,14 +1068,37 @@ class RedisClient:
         Returns:
             True if successful, False otherwise
         """
+        try:
+            if not self._use_fallback and self._client:
+                lock_key = _lock_key(key)
+                # Only a lock taken by this thread lets the write through
+                holder = self._held_locks().get(lock_key, '')
+                if self._locked_set_script is None:
+                    self._locked_set_script = self._client.register_script(_LOCKED_SET_SCRIPT)
+                
+                def locked_set() -> bool:
+                    return bool(self._locked_set_script(
+                        keys=[lock_key, key],
+                        args=[holder, value, ttl]
+                    ))
+                
+                if not self._retry(locked_set):
+                    return False
+                self._last_ok = time.monotonic()
+                _record_stat('writes')
+                return True
+        except Exception as e:
+            logger.warning(f"Redis set_with_lock failed for key '{key}': {e}, falling back to in-memory")
+            _record_stat('errors')
+            self._use_fallback = True
+        
         lock_acquired = self.acquire_lock_with_retry(key, lock_timeout)
         
         if not lock_acquired:
             return False
         
         try:
-            self.set(key, value, ttl)
-            return True
+            return self.set(key, value, ttl)
         finally:
             self.release_lock(key)
     
@@ -568,6 +1139,9 @@ class RedisClient:
         """
         Get the status of all locks for health monitoring.
         
+        Each shard is read under its own mutex, so the totals are a
+        per-shard snapshot rather than one instant across all locks.
+        
         Returns:
             Dict with lock status information including:
             - total_locks: Total number of locks
@@ -575,53 +1149,62 @@ class RedisClient:
             - expired_locks: Number of expired locks
             - locks: List of lock details
         """
-        with _lock_mutex:
-            current_time = time.time()
-            active_locks = []
-            expired_locks = []
-            
-            for lock_key, lock_data in _lock_storage.items():
-                lock_info = {
-                    'key': lock_key,
-                    'thread_id': lock_data['thread_id'],
-                    'expires': lock_data['expires'],
-                    'expires_in': max(0, lock_data['expires'] - current_time),
-                    'is_expired': lock_data['expires'] <= current_time
-                }
-                
-                if lock_info['is_expired']:
-                    expired_locks.append(lock_info)
-                else:
-                    active_locks.append(lock_info)
-            
-            return {
-                'total_locks': len(_lock_storage),
-                'active_locks': len(active_locks),
-                'expired_locks': len(expired_locks),
-                'instance_locks': len(self._locks),
-                'locks': active_locks + expired_locks
-            }
+        current_time = time.monotonic()
+        # Lock expiry is tracked on the monotonic clock; report wall-clock times
+        wall_clock_offset = time.time() - current_time
+        active_locks = []
+        expired_locks = []
+        
+        for mutex, storage in zip(_lock_mutexes, _lock_storage):
+            with mutex:
+                for lock_key, lock_data in storage.items():
+                    lock_info = {
+                        'key': lock_key,
+                        'thread_id': lock_data['thread_id'],
+                        'expires': lock_data['expires'] + wall_clock_offset,
+                        'expires_in': max(0, lock_data['expires'] - current_time),
+                        'is_expired': lock_data['expires'] <= current_time
+                    }
+                    
+                    if lock_info['is_expired']:
+                        expired_locks.append(lock_info)
+                    else:
+                        active_locks.append(lock_info)
+        
+        return {
+            'total_locks': len(active_locks) + len(expired_locks),
+            'active_locks': len(active_locks),
+            'expired_locks': len(expired_locks),
+            'instance_locks': len(self._locks),
+            'locks': active_locks + expired_locks
+        }
     
     def cleanup_expired_locks(self) -> int:
         """
         Clean up expired locks from the lock storage.
         
+        Expired locks are popped from each shard's expiry heap, so the work
+        is proportional to the number of expired locks, not all locks.
+        
         Returns:
             Number of locks cleaned up
         """
-        with _lock_mutex:
-            current_time = time.time()
-            expired_keys = [
-                key for key, data in _lock_storage.items()
-                if data['expires'] <= current_time
-            ]
-            
-            for key in expired_keys:
-                del _lock_storage[key]
-                if key in self._locks:
-                    del self._locks[key]
-            
-            return len(expired_keys)
+        current_time = time.monotonic()
+        cleaned = 0
+        
+        for mutex, storage, heap in zip(_lock_mutexes, _lock_storage, _lock_expiry):
+            with mutex:
+                while heap and heap[0][0] <= current_time:
+                    expires, key = heapq.heappop(heap)
+                    data = storage.get(key)
+                    # Skip heap entries for locks released or re-acquired since
+                    if data is None or data['expires'] != expires:
+                        continue
+                    del storage[key]
+                    self._locks.pop(key, None)
+                    cleaned += 1
+        
+        return cleaned
 
 
 # Global client instance
@@ -632,6 +1215,9 @@ def generate_cache_key(prefix: str, **kwargs) -> str:
     """
     Generate a unique cache key from arguments.
     
+    The arguments are hashed with BLAKE2b-128, so every key is the prefix
+    plus 32 hex characters however many or large the arguments are.
+    
     Args:
         prefix: Key prefix
         **kwargs: Arguments to include in key
@@ -639,17 +1225,14 @@ def generate_cache_key(prefix: str, **kwargs) -> str:
     Returns:
         Cache key string
     """
+    key_hash = hashlib.blake2b(digest_size=16)
     # Sort kwargs for consistent key generation
-    sorted_items = sorted(kwargs.items())
-    key_parts = [prefix] + [f"{k}={v}" for k, v in sorted_items]
-    key_string = ":".join(key_parts)
-    
-    # Hash the key if it's too long
-    if len(key_string) > 200:
-        hash_key = hashlib.md5(key_string.encode()).hexdigest()
-        return f"{prefix}:hash:{hash_key}"
-    
-    return key_string
+    for k, v in sorted(kwargs.items()):
+        key_hash.update(k.encode())
+        key_hash.update(b'=')
+        key_hash.update(repr(v).encode())
+        key_hash.update(b'\x00')
+    return f"{prefix}:{key_hash.hexdigest()}"
 
 
 def cache_result(ttl: int = 3600):
@@ -660,21 +1243,28 @@ def cache_result(ttl: int = 3600):
         ttl: Cache TTL in seconds
     """
     def decorator(func):
+        # Hash state seeded once with the function's identity; each call
+        # copies it and adds only its own arguments
+        seed = hashlib.blake2b(digest_size=16)
+        seed.update(f"{func.__module__}.{func.__qualname__}".encode())
+        seed.update(b'\x00')
+        
         def wrapper(*args, **kwargs):
-            cache_key = generate_cache_key(
-                func.__name__,
-                args=str(args),
-                kwargs=str(sorted(kwargs.items()))
-            )
+            key_hash = seed.copy()
+            key_hash.update(repr(args).encode())
+            if kwargs:
+                key_hash.update(b'\x00')
+                key_hash.update(repr(sorted(kwargs.items())).encode())
+            cache_key = f"{func.__name__}:{key_hash.hexdigest()}"
             
             # Try to get cached result
             cached = redis_client.get(cache_key)
             if cached is not None:
-                return json.loads(cached)
+                return _json_decode(cached)
             
             # Call function and cache result
             result = func(*args, **kwargs)
-            redis_client.set(cache_key, json.dumps(result), ttl=ttl)
+            redis_client.set(cache_key, _json_encode(result), ttl=ttl)
             return result
         return wrapper
     return decorator
@@ -682,7 +1272,7 @@ def cache_result(ttl: int = 3600):
 
 # Connection helper
 def connect_redis(host: str = "localhost", port: int = 6379, db: int = 0,
-                  password: Optional[str] = None, max_connections: int = 50) -> bool:
+                  password: Optional[str] = None, max_connections: int = 8) -> bool:
     """
     Connect to Redis server.
     
@@ -710,10 +1300,4 @@ def connect_redis(host: str = "localhost", port: int = 6379, db: int = 0,
 def reset_cache_stats() -> None:
     """Reset cache statistics to zero."""
     global _cache_stats
-    _cache_stats = {
-        'hits': 0,
-        'misses': 0,
-        'errors': 0,
-        'evictions': 0,
-        'writes': 0
-    }
+    _cache_stats = Counter(hits=0, misses=0, errors=0, evictions=0, writes=0, rejections=0)
@@ -3,6 +3,7 @@ import random
 import datetime
 import json
 import re
+from functools import lru_cache
 
 # Allowed safe modules for custom scripts
 ALLOWED_MODULES = {
@@ -13,6 +14,64 @@ ALLOWED_MODULES = {
     're': re
 }
 
+# Builtins available to custom scripts
+_SAFE_BUILTINS = {
+    "abs": abs,
+    "all": all,
+    "any": any,
+    "bin": bin,
+    "bool": bool,
+    "chr": chr,
+    "dict": dict,
+    "divmod": divmod,
+    "enumerate": enumerate,
+    "filter": filter,
+    "float": float,
+    "format": format,
+    "frozenset": frozenset,
+    "getattr": getattr,
+    "hasattr": hasattr,
+    "hash": hash,
+    "hex": hex,
+    "int": int,
+    "isinstance": isinstance,
+    "issubclass": issubclass,
+    "iter": iter,
+    "len": len,
+    "list": list,
+    "map": map,
+    "max": max,
+    "min": min,
+    "next": next,
+    "oct": oct,
+    "ord": ord,
+    "pow": pow,
+    "range": range,
+    "repr": repr,
+    "reversed": reversed,
+    "round": round,
+    "set": set,
+    "slice": slice,
+    "sorted": sorted,
+    "str": str,
+    "sum": sum,
+    "tuple": tuple,
+    "type": type,
+    "zip": zip,
+}
+
+
+@lru_cache(maxsize=512)
+def _compile_script(script):
+    """
+    Compile a custom script, reusing the code object for scripts run before.
+    
+    Form scripts run on every submission, so caching skips parsing and
+    compiling the same source each time.
+    """
+    return compile(script, '<user_script>', 'exec')
+
+
 def execute_safe_script(script, input_data=None, additional_globals=None):
     """
     Executes a custom python script in a restricted environment.
@@ -33,51 +92,9 @@ def execute_safe_script(script, input_data=None, additional_globals=None):
     
     # 1. Define restricted globals
     # We remove __builtins__ to prevent access to open(), __import__(), etc.
+    # (copied so a script cannot change the builtins seen by later scripts)
     safe_globals = {
-        "__builtins__": {
-            "abs": abs,
-            "all": all,
-            "any": any,
-            "bin": bin,
-            "bool": bool,
-            "chr": chr,
-            "dict": dict,
-            "divmod": divmod,
-            "enumerate": enumerate,
-            "filter": filter,
-            "float": float,
-            "format": format,
-            "frozenset": frozenset,
-            "getattr": getattr,
-            "hasattr": hasattr,
-            "hash": hash,
-            "hex": hex,
-            "int": int,
-            "isinstance": isinstance,
-            "issubclass": issubclass,
-            "iter": iter,
-            "len": len,
-            "list": list,
-            "map": map,
-            "max": max,
-            "min": min,
-            "next": next,
-            "oct": oct,
-            "ord": ord,
-            "pow": pow,
-            "range": range,
-            "repr": repr,
-            "reversed": reversed,
-            "round": round,
-            "set": set,
-            "slice": slice,
-            "sorted": sorted,
-            "str": str,
-            "sum": sum,
-            "tuple": tuple,
-            "type": type,
-            "zip": zip,
-        },
+        "__builtins__": _SAFE_BUILTINS.copy(),
         "input": input_data  # Inject input context
     }
     
@@ -92,7 +109,7 @@ def execute_safe_script(script, input_data=None, additional_globals=None):
     
     try:
         # 4. Execute script
-        exec(script, safe_globals, local_scope)
+        exec(_compile_script(script), safe_globals, local_scope)
         return local_scope
     except Exception as e:
         # Re-raise with clear message
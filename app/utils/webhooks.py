@@ -1,7 +1,7 @@
-import hmac
-import hashlib
+from concurrent.futures import Future
+from functools import partial
 from typing import Any
-from flask import json
+import requests
 from flask import current_app
 from app.models.Form import Form
 from app.services.webhook_service import WebhookService
@@ -13,11 +13,15 @@ def trigger_webhooks(form: Form, event: str, data: dict[str, Any]) -> None:
     data should be a JSON-serializable dictionary.
     
     Uses WebhookService for reliable delivery with exponential backoff retry logic.
+    Deliveries run on background workers; outcomes are logged when they finish.
+    Webhooks configured with "batch": true receive events grouped into one POST.
     All webhook attempts are logged to the webhook_deliveries collection.
     """
     if not form.webhooks:
         return
 
+    app = current_app._get_current_object()
+
     payload = {
         "event": event,
         "form_id": str(form.id),
@@ -25,10 +29,18 @@ def trigger_webhooks(form: Form, event: str, data: dict[str, Any]) -> None:
         "payload": data
     }
     
-    encoded_payload = json.dumps(payload).encode('utf-8')
+    # Sign the exact bytes the deliveries send; a payload that cannot be
+    # encoded fails on delivery, where the error is recorded
+    try:
+        encoded_payload = WebhookService._encode_body(payload)
+    except requests.exceptions.InvalidJSONError:
+        encoded_payload = None
+    # Webhooks sharing a secret get the same signature, so sign once per secret
+    signatures: dict[str, str] = {}
 
     for idx, config in enumerate(form.webhooks):
-        # Expected config format: {"url": "...", "events": ["submitted", "updated"], "secret": "..."}
+        # Expected config format:
+        # {"url": "...", "events": ["submitted", "updated"], "secret": "...", "batch": false}
         url = config.get("url")
         events = config.get("events", [])
         secret = config.get("secret")
@@ -39,25 +51,37 @@ def trigger_webhooks(form: Form, event: str, data: dict[str, Any]) -> None:
         if event not in events:
             continue
 
+        # Generate a unique webhook_id for this webhook configuration
+        webhook_id = f"{str(form.id)}_{idx}_{url}"
+
+        if config.get("batch"):
+            try:
+                WebhookService.enqueue_event(
+                    url=url,
+                    event=payload,
+                    webhook_id=webhook_id,
+                    form_id=str(form.id),
+                    secret=secret
+                )
+            except Exception as e:
+                current_app.logger.error(f"Failed to batch webhook event for {url}: {str(e)}")
+            continue
+
         headers = {
             "Content-Type": "application/json",
             "X-Form-Event": event
         }
 
-        if secret:
-            signature = hmac.new(
-                secret.encode('utf-8'),
-                encoded_payload,
-                hashlib.sha256
-            ).hexdigest()
-            headers["X-Form-Signature"] = f"sha256={signature}"
+        if secret and encoded_payload is not None:
+            signature = signatures.get(secret)
+            if signature is None:
+                signature = signatures[secret] = WebhookService.signature_header(secret, encoded_payload)
+            headers["X-Form-Signature"] = signature
 
-        # Use WebhookService for reliable delivery with enhanced retry logic
+        # Use WebhookService for reliable delivery with enhanced retry logic,
+        # on a background worker so the triggering request is not held up
         try:
-            # Generate a unique webhook_id for this webhook configuration
-            webhook_id = f"{str(form.id)}_{idx}_{url}"
-            
-            result = WebhookService.send_webhook(
+            future = WebhookService.send_webhook_async(
                 url=url,
                 payload=payload,
                 webhook_id=webhook_id,
@@ -67,22 +91,44 @@ def trigger_webhooks(form: Form, event: str, data: dict[str, Any]) -> None:
                 headers=headers,
                 timeout=10
             )
-            
-            if result["status"] == "success":
-                current_app.logger.info(
-                    f"Webhook delivered successfully to {url} for event {event}. "
-                    f"Attempt: {result['attempt_count']}, Delivery ID: {result['delivery_id']}"
-                )
-            elif result["status"] == "scheduled":
-                current_app.logger.info(
-                    f"Webhook scheduled for {result.get('next_retry_at')} to {url} for event {event}. "
-                    f"Delivery ID: {result['delivery_id']}"
-                )
-            else:
-                current_app.logger.error(
-                    f"Webhook failed to deliver to {url} for event {event}. "
-                    f"Error: {result.get('error', 'Unknown error')}, "
-                    f"Delivery ID: {result['delivery_id']}"
-                )
+            future.add_done_callback(partial(_log_delivery_result, app, url, event))
         except Exception as e:
             current_app.logger.error(f"Failed to send webhook to {url}: {str(e)}")
+
+
+def _log_delivery_result(app, url: str, event: str, future: Future) -> None:
+    """Log the outcome of a background webhook delivery."""
+    error = future.exception()
+    if error is not None:
+        app.logger.error(f"Failed to send webhook to {url}: {str(error)}")
+        return
+    
+    result = future.result()
+    if result is None:
+        return
+    if result["status"] == "success":
+        app.logger.info(
+            f"Webhook delivered successfully to {url} for event {event}. "
+            f"Attempt: {result['attempt_count']}, Delivery ID: {result['delivery_id']}"
+        )
+    elif result["status"] == "scheduled":
+        app.logger.info(
+            f"Webhook scheduled for {result.get('next_retry_at')} to {url} for event {event}. "
+            f"Delivery ID: {result['delivery_id']}"
+        )
+    elif result["status"] == "raced":
+        app.logger.info(
+            f"Webhook to {url} for event {event} is handled by another worker. "
+            f"Delivery ID: {result['delivery_id']}"
+        )
+    elif result["status"] == "retrying":
+        app.logger.warning(
+            f"Webhook to {url} for event {event} will be retried at {result.get('next_retry_at')}. "
+            f"Error: {result.get('error', 'Unknown error')}, Delivery ID: {result['delivery_id']}"
+        )
+    else:
+        app.logger.error(
+            f"Webhook failed to deliver to {url} for event {event}. "
+            f"Error: {result.get('error', 'Unknown error')}, "
+            f"Delivery ID: {result['delivery_id']}"
+        )
@@ -33,7 +33,7 @@ def test_email_notification_on_submit(client):
     # Mock the email helper's internal smtplib usage, OR mock the helper itself.
     # Since we want to test that the route calls the helper, checking the helper is called is sufficient.
     
-    with patch("app.routes.v1.form.responses.send_email_notification") as mock_send_email:
+    with patch("app.routes.v1.form.responses.queue_email_notification") as mock_send_email:
         mock_send_email.return_value = True
         
         # 2. Submit Response
@@ -61,7 +61,7 @@ def test_public_email_notification_on_submit(client):
     form_res = client.post("/form/api/v1/form/", json=form_payload, headers=headers)
     form_id = form_res.get_json()["form_id"]
     
-    with patch("app.routes.v1.form.misc.send_email_notification") as mock_send_email:
+    with patch("app.routes.v1.form.misc.queue_email_notification") as mock_send_email:
         mock_send_email.return_value = True
         
         # 2. Public Submit
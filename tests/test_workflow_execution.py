@@ -22,8 +22,8 @@ def get_tokens(client):
     
     return admin_token, user_token, email_sub
 
-# Mock the send_email_notification function effectively
-@patch('app.routes.v1.form.responses.send_email_notification')
+# Mock the queue_email_notification function effectively
+@patch('app.routes.v1.form.responses.queue_email_notification')
 def test_embedded_workflow_execution(mock_send_email, client):
     admin_token, user_token, user_email = get_tokens(client)
     headers_adm = {"Authorization": f"Bearer {admin_token}"}
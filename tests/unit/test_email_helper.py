@@ -0,0 +1,90 @@
+"""
+Unit tests for Email Helper
+
+Tests for SMTP notification sending including:
+- Connection reuse across a batch
+- Recipient privacy for multi-recipient emails
+- Background queue batching and retries
+"""
+
+import time
+import pytest
+from unittest.mock import patch
+
+from app.utils import email_helper
+from app.utils.email_helper import queue_email_notification, send_bulk, send_email_notification
+
+
+@pytest.fixture
+def smtp_env(monkeypatch):
+    """Configure SMTP settings in the environment"""
+    monkeypatch.setenv("SMTP_HOST", "smtp.example.com")
+    monkeypatch.setenv("SMTP_PORT", "587")
+    monkeypatch.setenv("SMTP_USER", "mailer")
+    monkeypatch.setenv("SMTP_PASSWORD", "secret")
+    monkeypatch.setenv("SMTP_FROM", "noreply@example.com")
+
+
+class TestEmailHelper:
+    """Test suite for email_helper"""
+    
+    def test_send_email_notification_hides_recipients(self, app, smtp_env):
+        """Test multi-recipient emails keep addresses in the envelope only"""
+        with app.app_context(), patch('app.utils.email_helper.smtplib.SMTP') as mock_smtp:
+            assert send_email_notification(["a@example.com", "b@example.com"], "Hi", "<p>x</p>")
+        
+        server = mock_smtp.return_value
+        server.login.assert_called_once_with("mailer", "secret")
+        smtp_from, recipients, text = server.sendmail.call_args[0]
+        assert recipients == ["a@example.com", "b@example.com"]
+        assert "To: undisclosed-recipients:;" in text
+        assert "a@example.com" not in text
+        server.quit.assert_called_once()
+    
+    def test_send_bulk_reuses_one_connection(self, app, smtp_env):
+        """Test a batch of emails is sent over a single SMTP session"""
+        messages = [
+            (["a@example.com"], "One", "<p>1</p>"),
+            ([], "Skipped", "<p>-</p>"),
+            (["b@example.com"], "Two", "<p>2</p>"),
+        ]
+        with app.app_context(), patch('app.utils.email_helper.smtplib.SMTP') as mock_smtp:
+            sent = send_bulk(messages)
+        
+        assert sent == 2
+        assert mock_smtp.call_count == 1
+        server = mock_smtp.return_value
+        assert server.login.call_count == 1
+        assert server.sendmail.call_count == 2
+        assert "To: a@example.com" in server.sendmail.call_args_list[0][0][2]
+    
+    def test_queue_email_notification_sends_in_background_batch(self, app, smtp_env):
+        """Test queued emails return immediately and are sent by the background sender"""
+        with app.app_context(), patch('app.utils.email_helper.smtplib.SMTP') as mock_smtp:
+            server = mock_smtp.return_value
+            # Hold the sender on the first login so the second email queues behind it
+            server.login.side_effect = lambda *args: time.sleep(0.2)
+            assert queue_email_notification(["a@example.com"], "One", "<p>1</p>")
+            assert queue_email_notification(["b@example.com"], "Two", "<p>2</p>")
+            assert not queue_email_notification([], "None", "<p>-</p>")
+            email_helper._email_queue.join()
+        
+        assert server.sendmail.call_count == 2
+        recipients = [call[0][1] for call in server.sendmail.call_args_list]
+        assert recipients == [["a@example.com"], ["b@example.com"]]
+    
+    def test_queue_email_notification_retries_failed_sessions(self, app, smtp_env):
+        """Test emails are requeued with backoff when the SMTP session fails"""
+        with app.app_context(), patch.dict(app.config, {'EMAIL_RETRY_BASE_DELAY': 0}), \
+                patch('app.utils.email_helper.smtplib.SMTP') as mock_smtp:
+            server = mock_smtp.return_value
+            server.login.side_effect = [OSError("connection reset"), None]
+            queue_email_notification(["a@example.com"], "Retry", "<p>1</p>")
+            
+            deadline = time.time() + 5
+            while not server.sendmail.called and time.time() < deadline:
+                time.sleep(0.01)
+            email_helper._email_queue.join()
+        
+        assert server.login.call_count == 2
+        server.sendmail.assert_called_once()
@@ -0,0 +1,122 @@
+"""
+Unit tests for File Handler
+
+Tests for upload handling including:
+- Streaming save with size limit
+- Extension checks
+"""
+
+import io
+import os
+import pytest
+from unittest.mock import patch
+from werkzeug.datastructures import FileStorage
+
+from app.utils import file_handler
+from app.utils.file_handler import save_uploaded_file
+
+
+def _upload(data: bytes, filename: str = "notes.txt") -> FileStorage:
+    """Build an uploaded file"""
+    return FileStorage(stream=io.BytesIO(data), filename=filename, content_type="text/plain")
+
+
+class TestFileHandler:
+    """Test suite for file_handler"""
+    
+    def test_save_uploaded_file_streams_to_disk(self, app, tmp_path):
+        """Test the upload is written once and its size counted while streaming"""
+        data = b"hello world\n" * 10000
+        with app.app_context(), patch.dict(app.config, {'UPLOAD_FOLDER': str(tmp_path)}):
+            info = save_uploaded_file(_upload(data), "form1", "q1")
+        
+        assert info['size'] == len(data)
+        assert info['original_filename'] == "notes.txt"
+        with open(info['filepath'], 'rb') as saved:
+            assert saved.read() == data
+    
+    def test_save_uploaded_file_rejects_oversize_without_leftovers(self, app, tmp_path):
+        """Test oversize uploads fail while streaming and leave no partial file"""
+        with app.app_context(), patch.dict(app.config, {'UPLOAD_FOLDER': str(tmp_path)}), \
+                patch.object(file_handler, 'MAX_FILE_SIZE', 100):
+            with pytest.raises(ValueError, match="File too large"):
+                save_uploaded_file(_upload(b"x" * 1000), "form1", "q1")
+        
+        assert os.listdir(tmp_path / "form1" / "q1") == []
+    
+    def test_save_uploaded_file_detects_mimetype_from_content(self, app, tmp_path):
+        """Test the MIME type comes from the uploaded bytes, not the client header"""
+        png = b"\x89PNG\r\n\x1a\n" + b"\0" * 100
+        with app.app_context(), patch.dict(app.config, {'UPLOAD_FOLDER': str(tmp_path)}), \
+                patch.object(file_handler.magic, 'from_file') as mock_from_file:
+            info = save_uploaded_file(_upload(png, "image.png"), "form1", "q1")
+            plain = save_uploaded_file(_upload(b"just text"), "form1", "q1")
+        
+        mock_from_file.assert_not_called()
+        assert info['mimetype'] == "image/png"
+        assert plain['mimetype'] == "text/plain"
+    
+    @pytest.mark.parametrize("filename, expected", [
+        ("report.PDF", True),
+        ("archive.tar.csv", True),
+        ("script.exe", False),
+        ("noextension", False),
+        ("trailingdot.", False),
+        (".pdf", False),
+    ])
+    def test_allowed_file(self, filename, expected):
+        """Test only known extensions are accepted"""
+        assert file_handler.allowed_file(filename) is expected
+    
+    def test_save_uploaded_file_never_overwrites_existing_file(self, app, tmp_path):
+        """Test a filename collision retries with a new uuid instead of overwriting"""
+        upload_dir = tmp_path / "form1" / "q1"
+        upload_dir.mkdir(parents=True)
+        (upload_dir / "taken_notes.txt").write_bytes(b"original")
+        
+        with app.app_context(), patch.dict(app.config, {'UPLOAD_FOLDER': str(tmp_path)}), \
+                patch.object(file_handler.uuid, 'uuid4', side_effect=["taken", "fresh"]):
+            info = save_uploaded_file(_upload(b"new data"), "form1", "q1")
+        
+        assert info['stored_filename'] == "fresh_notes.txt"
+        assert (upload_dir / "taken_notes.txt").read_bytes() == b"original"
+        assert (upload_dir / "fresh_notes.txt").read_bytes() == b"new data"
+    
+    def test_delete_file_removes_only_empty_directories(self, app, tmp_path):
+        """Test deleting uploads prunes the question and form directories once empty"""
+        with app.app_context(), patch.dict(app.config, {'UPLOAD_FOLDER': str(tmp_path)}):
+            first = save_uploaded_file(_upload(b"one"), "form1", "q1")
+            second = save_uploaded_file(_upload(b"two"), "form1", "q2")
+            
+            assert file_handler.delete_file(first['filepath']) is True
+            assert not (tmp_path / "form1" / "q1").exists()
+            assert (tmp_path / "form1" / "q2").exists()
+            
+            assert file_handler.delete_file(second['filepath']) is True
+            assert not (tmp_path / "form1").exists()
+    
+    def test_save_uploaded_file_creates_directory_once(self, app, tmp_path):
+        """Test known upload directories skip makedirs and are recreated if removed"""
+        file_handler._ensured_dirs.clear()
+        upload_dir = str(tmp_path / "form1" / "q1")
+        
+        def created():
+            return [c for c in mock_makedirs.call_args_list if c.args[0] == upload_dir]
+        
+        with app.app_context(), patch.dict(app.config, {'UPLOAD_FOLDER': str(tmp_path)}), \
+                patch.object(file_handler.os, 'makedirs', wraps=os.makedirs) as mock_makedirs:
+            first = save_uploaded_file(_upload(b"one"), "form1", "q1")
+            save_uploaded_file(_upload(b"two"), "form1", "q1")
+            assert len(created()) == 1
+            
+            # Removed behind the cache's back
+            os.remove(first['filepath'])
+            for name in os.listdir(upload_dir):
+                os.remove(os.path.join(upload_dir, name))
+            os.rmdir(upload_dir)
+            
+            info = save_uploaded_file(_upload(b"three"), "form1", "q1")
+        
+        assert len(created()) == 2
+        with open(info['filepath'], 'rb') as saved:
+            assert saved.read() == b"three"
@@ -111,6 +111,22 @@ class TestSummarizationService:
         
         assert isinstance(result, list)
     
+    def test_score_cache_keeps_scores_not_sentences(self):
+        """Test memoized sentence scores match a fresh scoring and hold no text."""
+        from app.services import summarization_service
+        from app.services.summarization_service import SummarizationService
+        
+        texts = ["Delivery was slow and the package arrived late. Support was helpful!", "Great value for the price."]
+        summarization_service._SCORE_CACHE.clear()
+        
+        first = SummarizationService._score_sentences(texts)
+        second = SummarizationService._score_sentences(texts)
+        
+        assert second == first
+        assert len(summarization_service._SCORE_CACHE) == 1
+        cached_scores, _ = next(iter(summarization_service._SCORE_CACHE.values()))
+        assert list(cached_scores) == first[1]
+    
     def test_analyze_themes(self):
         """Test theme analysis."""
         from app.services.summarization_service import SummarizationService
@@ -124,6 +140,178 @@ class TestSummarizationService:
         
         assert isinstance(result, dict)
     
+    def test_analyze_themes_whole_word_matching(self):
+        """Test theme keywords only match whole words."""
+        from app.services.summarization_service import SummarizationService
+        
+        texts = [
+            "Delivery was late.",
+            "I love chocolate.",
+            "Great value, easy to use."
+        ]
+        result = SummarizationService._analyze_themes(texts)
+        
+        assert result['delivery']['mentions'] == 1
+        assert result['pricing']['mentions'] == 1
+        assert result['usability']['mentions'] == 1
+    
+    def test_analyze_themes_matches_inflected_forms(self):
+        """Test plural and inflected keyword forms still count toward their themes."""
+        from app.services.summarization_service import SummarizationService
+        
+        texts = [
+            "The prices are too high.",
+            "Both products had defects.",
+            "The packages were delivered late.",
+            "Much easier than before."
+        ]
+        result = SummarizationService._analyze_themes(texts)
+        
+        assert result['pricing']['mentions'] == 1
+        assert result['product_quality']['mentions'] == 1
+        assert result['delivery']['mentions'] == 1
+        assert result['usability']['mentions'] == 1
+    
+    def test_summarize_many_preserves_job_order(self, app):
+        """Test concurrent summarization returns results in job order."""
+        from app.services.summarization_service import SummarizationService
+        
+        jobs = [
+            {"texts": [{"text": "Delivery was slow and arrived late."}], "strategy": "extractive"},
+            {"texts": [{"text": "Great value for the price."}, {"text": "Too expensive."}], "strategy": "extractive"},
+            {"texts": [], "strategy": "extractive"}
+        ]
+        
+        with app.app_context():
+            results = SummarizationService.summarize_many(jobs)
+        
+        assert [sum(r['sentiment_breakdown'].values()) for r in results] == [1, 2, 0]
+        assert 'delivery' in results[0]['theme_analysis']
+        assert 'pricing' in results[1]['theme_analysis']
+    
+    def test_cached_chat_reuses_identical_request(self, app):
+        """Test identical LLM requests are served from the content cache."""
+        from app.services.summarization_service import SummarizationService
+        from app.utils.redis_client import redis_client
+        
+        redis_client.clear()
+        with app.app_context(), patch(
+            'app.services.summarization_service.OllamaService.chat',
+            return_value={'response': 'Customers want faster delivery.'}
+        ) as mock_chat:
+            first = SummarizationService._cached_chat("Summarize", "Be brief.", 0.5, model="llama3.2")
+            second = SummarizationService._cached_chat("Summarize", "Be brief.", 0.5, model="llama3.2")
+            SummarizationService._cached_chat("Summarize again", "Be brief.", 0.5, model="llama3.2")
+        
+        assert first == second == 'Customers want faster delivery.'
+        assert mock_chat.call_count == 2
+    
+    def test_invalidate_cache_by_form_uses_key_index(self, app):
+        """Test form invalidation removes only that form's summary keys."""
+        from app.services.summarization_service import SummarizationService
+        from app.utils.redis_client import redis_client
+        
+        redis_client.clear()
+        redis_client.set("summary:form1:abc:extractive:def", "a")
+        redis_client.set("summary:form12:abc:extractive:def", "b")
+        redis_client.set("executive:form1:leadership", "c")
+        redis_client.set("nlp:form1:query", "d")
+        
+        with app.app_context():
+            invalidated = SummarizationService.invalidate_cache(form_id="form1", pattern="by_form")
+        
+        assert invalidated == 2
+        assert redis_client.get("summary:form1:abc:extractive:def") is None
+        assert redis_client.get("executive:form1:leadership") is None
+        assert redis_client.get("summary:form12:abc:extractive:def") == "b"
+        assert redis_client.keys_with_prefix("summary:") == ["summary:form12:abc:extractive:def"]
+    
+    def test_invalidate_cache_by_user_matches_user_segment(self, app):
+        """Test user invalidation removes only that user's trend keys."""
+        from app.services.summarization_service import SummarizationService
+        from app.utils.redis_client import redis_client
+        
+        redis_client.clear()
+        redis_client.set("summary:trends:form1:user12", "a")
+        redis_client.set("summary:trends:form1:user123", "b")
+        redis_client.set("summary:form1:user12:extractive", "c")
+        
+        with app.app_context():
+            invalidated = SummarizationService.invalidate_cache(user_id="user12", pattern="by_user")
+        
+        assert invalidated == 1
+        assert redis_client.get("summary:trends:form1:user12") is None
+        assert redis_client.get("summary:trends:form1:user123") == "b"
+        assert redis_client.get("summary:form1:user12:extractive") == "c"
+    
+    def test_executive_summaries_single_llm_call(self, app):
+        """Test multi-audience executive summaries share one LLM call."""
+        import json
+        from app.services.summarization_service import SummarizationService
+        from app.utils.redis_client import redis_client
+        
+        redis_client.clear()
+        reply = json.dumps({
+            "leadership": "Sentiment is positive.\n- Delivery praised\n- We should expand",
+            "operations": "Few issues.\n- Late packages in March"
+        })
+        texts = ["Fast delivery.", "Package was late."]
+        with app.app_context(), patch(
+            'app.services.summarization_service.OllamaService.chat',
+            return_value={'response': reply}
+        ) as mock_chat:
+            result = SummarizationService.generate_executive_summaries(
+                texts, ["leadership", "operations"], include_examples=False
+            )
+        
+        assert mock_chat.call_count == 1
+        assert result['leadership']['overview'] == "Sentiment is positive."
+        assert result['leadership']['key_findings'] == ["- Delivery praised", "- We should expand"]
+        assert result['operations']['custom_config']['audience'] == "operations"
+    
+    def test_compare_summaries_picks_newest_snapshot_per_period(self, app):
+        """Test comparison assigns each period its latest snapshot."""
+        import uuid
+        from datetime import datetime
+        from app.models.Form import SummarySnapshot
+        from app.services.summarization_service import SummarizationService
+        
+        form_id = uuid.uuid4()
+        
+        def snapshot(start, end, timestamp, positive):
+            return SummarySnapshot(
+                form_id=form_id, timestamp=timestamp, period_start=start, period_end=end,
+                summary_data={'sentiment_breakdown': {'positive': positive, 'negative': 10 - positive}},
+                created_by="tester", response_count=10
+            ).save()
+        
+        with app.app_context():
+            snapshot(datetime(2025, 1, 1), datetime(2025, 1, 31), datetime(2025, 2, 1), 2)
+            latest_jan = snapshot(datetime(2025, 1, 1), datetime(2025, 1, 31), datetime(2025, 2, 2), 3)
+            feb = snapshot(datetime(2025, 2, 1), datetime(2025, 2, 28), datetime(2025, 3, 1), 8)
+            
+            result = SummarizationService.compare_summaries(str(form_id), [
+                {'start': '2025-01-01T00:00:00Z', 'end': '2025-01-31T23:59:59Z', 'label': 'Jan'},
+                {'start': '2025-02-01T00:00:00Z', 'end': '2025-02-28T23:59:59Z', 'label': 'Feb'}
+            ])
+        
+        assert [s['snapshot_id'] for s in result['snapshots']] == [str(latest_jan.id), str(feb.id)]
+        assert result['trend_analysis']['sentiment_change']['positive_change'] == 50.0
+    
+    def test_theme_analysis_falls_back_when_ollama_unavailable(self, app):
+        """Test LLM theme analysis falls back to keyword themes."""
+        from app.services.summarization_service import SummarizationService
+        from app.utils.redis_client import redis_client
+        
+        redis_client.clear()
+        with app.app_context(), patch(
+            'app.services.summarization_service.OllamaService.chat',
+            side_effect=ConnectionError("Ollama down")
+        ):
+            result = SummarizationService._generate_theme_analysis(["Delivery was late."], "all")
+        
+        assert result['delivery']['mentions'] == 1
+    
     def test_generate_cache_key(self):
         """Test cache key generation."""
         from app.services.summarization_service import SummarizationService
@@ -135,6 +323,20 @@ class TestSummarizationService:
         
         assert key.startswith("summary:")
     
+    def test_generate_cache_key_ignores_config_order(self):
+        """Test equal configs produce the same cache key regardless of key order."""
+        from app.services.summarization_service import SummarizationService
+        
+        ids = ["resp2", "resp1"]
+        key1 = SummarizationService.generate_cache_key(
+            "form123", ids, "hybrid", {"max_points": 5, "include_sentiment": True}
+        )
+        key2 = SummarizationService.generate_cache_key(
+            "form123", list(reversed(ids)), "hybrid", {"include_sentiment": True, "max_points": 5}
+        )
+        
+        assert key1 == key2
+    
     def test_executive_summary_format(self):
         """Test executive summary format structure."""
         from app.services.summarization_service import SummarizationService
@@ -0,0 +1,38 @@
+"""
+Unit tests for Script Engine
+
+Tests for custom script execution including:
+- Reuse of compiled scripts
+- Isolation of the restricted builtins between runs
+"""
+
+import pytest
+
+from app.utils import script_engine
+from app.utils.script_engine import execute_safe_script
+
+
+class TestScriptEngine:
+    """Test suite for script_engine"""
+    
+    def test_repeated_script_is_compiled_once(self):
+        """Test running the same source again reuses its compiled code"""
+        script_engine._compile_script.cache_clear()
+        
+        assert execute_safe_script("result = input['x'] * 2", {"x": 2})['result'] == 4
+        assert execute_safe_script("result = input['x'] * 2", {"x": 5})['result'] == 10
+        
+        info = script_engine._compile_script.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+    
+    def test_script_cannot_change_builtins_of_later_scripts(self):
+        """Test builtins changed by one script are fresh for the next"""
+        execute_safe_script("__builtins__['len'] = None")
+        
+        assert execute_safe_script("result = len('abc')")['result'] == 3
+    
+    def test_syntax_error_is_reported(self):
+        """Test invalid scripts still fail with the execution error message"""
+        with pytest.raises(Exception, match="Script execution failed"):
+            execute_safe_script("result = (")
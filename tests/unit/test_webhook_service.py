@@ -0,0 +1,660 @@
+"""
+Unit tests for Webhook Service
+
+Tests for webhook delivery including:
+- Retry and backoff behaviour
+- Delivery record persistence
+"""
+
+import json
+import pytest
+from unittest.mock import Mock, patch
+from requests.structures import CaseInsensitiveDict
+
+from app.models.WebhookDelivery import WebhookDelivery
+from app.services.webhook_service import WebhookService
+
+
+def _response(status_code, text="", headers=None):
+    """Build a mock HTTP response"""
+    response = Mock()
+    response.status_code = status_code
+    response.content = text.encode('utf-8')
+    response.encoding = 'utf-8'
+    response.headers = CaseInsensitiveDict(headers or {})
+    return response
+
+
+@pytest.fixture(autouse=True)
+def reset_circuits():
+    """Start every test with all endpoint circuits closed"""
+    WebhookService._circuits.clear()
+    yield
+    WebhookService._circuits.clear()
+
+
+class TestWebhookService:
+    """Test suite for WebhookService"""
+    
+    def _send(self, **overrides):
+        params = {
+            'url': "https://example.com/hook",
+            'payload': {'event': 'submitted'},
+            'webhook_id': "wh1",
+            'form_id': "form1",
+            'created_by': "system",
+            'max_retries': 3
+        }
+        params.update(overrides)
+        return WebhookService.send_webhook(**params)
+    
+    def test_send_webhook_success(self, app):
+        """Test successful delivery is recorded on the delivery document"""
+        with app.app_context(), patch(
+            'app.services.webhook_service.requests.Session.post',
+            return_value=_response(200, "ok")
+        ):
+            result = self._send()
+        
+        assert result['status'] == 'success'
+        assert result['attempt_count'] == 1
+        delivery = WebhookDelivery.objects.get(id=result['delivery_id'])
+        assert delivery.status == 'success'
+        assert delivery.response_code == 200
+    
+    def test_credential_headers_are_not_stored_in_plaintext(self, app):
+        """Test Authorization, Cookie and *-Token headers are sealed on the record but still sent"""
+        pytest.importorskip("cryptography")
+        headers = {
+            'Authorization': "Bearer s3cret-token",
+            'Cookie': "session=abc",
+            'X-Api-Token': "tok-123",
+            'X-Form-Event': "submitted"
+        }
+        with app.app_context(), patch(
+            'app.services.webhook_service.requests.Session.post',
+            return_value=_response(200, "ok")
+        ) as mock_post:
+            result = self._send(headers=headers)
+        
+        assert result['status'] == 'success'
+        stored = WebhookDelivery.objects(id=result['delivery_id']).as_pymongo().first()
+        assert stored['request_headers'] == {'X-Form-Event': "submitted"}
+        for secret in ("s3cret-token", "session=abc", "tok-123"):
+            assert secret not in json.dumps(stored, default=str)
+        sent = mock_post.call_args.kwargs['headers']
+        assert {name: sent[name] for name in headers} == headers
+    
+    def test_plain_headers_need_no_encryption(self, app):
+        """Test deliveries without credential headers store no sealed headers"""
+        assert WebhookService._is_sensitive_header("authorization")
+        assert WebhookService._is_sensitive_header("X-Access-Token")
+        assert not WebhookService._is_sensitive_header("X-Form-Event")
+        
+        with app.app_context(), patch(
+            'app.services.webhook_service.requests.Session.post',
+            return_value=_response(200, "ok")
+        ):
+            result = self._send(headers={'X-Form-Event': "submitted"})
+        
+        delivery = WebhookDelivery.objects.get(id=result['delivery_id'])
+        assert delivery.request_headers == {'X-Form-Event': "submitted"}
+        assert delivery.sealed_headers is None
+    
+    def test_send_webhook_writes_only_initial_and_final_state(self, app):
+        """Test retries do not persist intermediate state by default"""
+        original_save = WebhookDelivery.save
+        with app.app_context(), patch(
+            'app.services.webhook_service.requests.Session.post',
+            return_value=_response(503, "unavailable")
+        ), patch('app.services.webhook_service.time.sleep'), patch.object(
+            WebhookDelivery, 'save', autospec=True, side_effect=original_save
+        ) as mock_save:
+            result = self._send()
+        
+        assert result['status'] == 'failed'
+        assert result['attempt_count'] == 3
+        assert mock_save.call_count == 2
+        delivery = WebhookDelivery.objects.get(id=result['delivery_id'])
+        assert delivery.status == 'failed'
+        assert delivery.attempt_count == 3
+        assert delivery.response_code == 503
+    
+    def test_send_webhook_async_delivers_in_background(self, app):
+        """Test async delivery runs send_webhook on the worker pool"""
+        with app.app_context(), patch(
+            'app.services.webhook_service.requests.Session.post',
+            return_value=_response(200, "ok")
+        ):
+            future = WebhookService.send_webhook_async(
+                url="https://example.com/hook",
+                payload={'event': 'submitted'},
+                webhook_id="wh1",
+                form_id="form1",
+                created_by="system"
+            )
+            result = future.result(timeout=5)
+        
+        assert result['status'] == 'success'
+        assert WebhookDelivery.objects.get(id=result['delivery_id']).status == 'success'
+    
+    def test_enqueue_webhook_returns_before_delivery(self, app):
+        """Test queued delivery returns a pending record and delivers on a worker"""
+        executor = Mock()
+        with app.app_context(), patch.object(
+            WebhookService, '_get_executor', return_value=executor
+        ), patch(
+            'app.services.webhook_service.requests.Session.post',
+            return_value=_response(200, "ok")
+        ) as mock_post:
+            result = WebhookService.enqueue_webhook(
+                url="https://example.com/hook",
+                payload={'event': 'submitted'},
+                webhook_id="wh1",
+                form_id="form1",
+                created_by="system"
+            )
+            
+            assert result['status'] == 'queued'
+            assert WebhookDelivery.objects.get(id=result['delivery_id']).status == 'pending'
+            mock_post.assert_not_called()
+            
+            # Run the queued job as the worker would
+            job = executor.submit.call_args[0][0]
+            outcome = job()
+        
+        assert outcome['status'] == 'success'
+        assert WebhookDelivery.objects.get(id=result['delivery_id']).status == 'success'
+    
+    def test_get_webhook_logs_filters_and_orders_newest_first(self, app):
+        """Test legacy log listing filters by url/status and sorts by creation time"""
+        from datetime import datetime, timedelta
+        from app.models.WebhookLog import WebhookLog
+        
+        now = datetime(2026, 2, 4, 9, 0, 0)
+        WebhookLog(url="https://a.example", payload={'n': 1}, status='failed',
+                   created_at=now - timedelta(minutes=2)).save()
+        WebhookLog(url="https://a.example", payload={'n': 2}, status='failed',
+                   status_code=503, last_attempt=now, created_at=now).save()
+        WebhookLog(url="https://b.example", payload={'n': 3}, status='failed',
+                   created_at=now - timedelta(minutes=1)).save()
+        
+        with app.app_context():
+            logs = WebhookService.get_webhook_logs(url="https://a.example", status='failed')
+        
+        assert [log['payload']['n'] for log in logs] == [2, 1]
+        assert logs[0]['status_code'] == 503
+        assert logs[0]['last_attempt'] == now.isoformat()
+        assert logs[1]['last_attempt'] is None
+        assert logs[1]['metadata'] == {}
+    
+    def test_get_webhook_log_by_id(self, app):
+        """Test legacy single log lookup serializes the stored document"""
+        from bson import ObjectId
+        from app.models.WebhookLog import WebhookLog
+        
+        log = WebhookLog(url="https://a.example", payload={'n': 1}, status='success',
+                         status_code=200, metadata={'headers': {}}).save()
+        
+        with app.app_context():
+            found = WebhookService.get_webhook_log_by_id(str(log.id))
+            missing = WebhookService.get_webhook_log_by_id(str(ObjectId()))
+        
+        assert found['id'] == str(log.id)
+        assert found['status_code'] == 200
+        assert found['metadata'] == {'headers': {}}
+        assert missing is None
+        assert WebhookService.get_webhook_log_by_id("not-an-id") is None
+    
+    def test_send_webhook_encodes_payload_once_across_retries(self, app):
+        """Test retries resend the same pre-encoded JSON body"""
+        with app.app_context(), patch(
+            'app.services.webhook_service.requests.Session.post',
+            side_effect=[_response(503), _response(200, "ok")]
+        ) as mock_post, patch('app.services.webhook_service.time.sleep'), patch(
+            'app.services.webhook_service.json.dumps', wraps=json.dumps
+        ) as mock_dumps:
+            result = self._send(headers={'X-Form-Event': 'submitted'})
+        
+        assert result['status'] == 'success'
+        assert mock_dumps.call_count == 1
+        first, second = mock_post.call_args_list
+        assert first.kwargs['data'] is second.kwargs['data']
+        assert first.kwargs['headers']['Content-Type'] == 'application/json'
+        assert first.kwargs['headers']['X-Form-Event'] == 'submitted'
+    
+    def test_send_webhook_keeps_bounded_body_and_selected_headers(self, app):
+        """Test only a body prefix and whitelisted headers are stored"""
+        headers = {'Content-Type': 'text/html', 'Set-Cookie': 'a=b', 'X-Request-Id': 'r1'}
+        with app.app_context(), patch(
+            'app.services.webhook_service.requests.Session.post',
+            return_value=_response(200, "x" * 20000, headers)
+        ):
+            result = self._send()
+        
+        delivery = WebhookDelivery.objects.get(id=result['delivery_id'])
+        assert delivery.response_body == "x" * WebhookService.RESPONSE_BODY_LIMIT
+        assert delivery.metadata['headers'] == {'content-type': 'text/html', 'x-request-id': 'r1'}
+    
+    def test_send_webhook_retries_timeouts_then_fails(self, app):
+        """Test timeouts are retried and reported once retries are exhausted"""
+        import requests
+        
+        with app.app_context(), patch(
+            'app.services.webhook_service.requests.Session.post',
+            side_effect=requests.exceptions.Timeout()
+        ) as mock_post, patch('app.services.webhook_service.time.sleep'):
+            result = self._send()
+        
+        assert mock_post.call_count == 3
+        assert result['status'] == 'failed'
+        assert result['message'] == "Webhook failed after 3 attempts (timeout)"
+        assert 'status_code' not in result
+        delivery = WebhookDelivery.objects.get(id=result['delivery_id'])
+        assert delivery.metadata['error_type'] == 'timeout'
+    
+    def test_send_webhook_does_not_retry_other_request_errors(self, app):
+        """Test non-transient request errors fail on the first attempt"""
+        import requests
+        
+        with app.app_context(), patch(
+            'app.services.webhook_service.requests.Session.post',
+            side_effect=requests.exceptions.InvalidURL("bad url")
+        ) as mock_post, patch('app.services.webhook_service.time.sleep') as mock_sleep:
+            result = self._send()
+        
+        assert mock_post.call_count == 1
+        mock_sleep.assert_not_called()
+        assert result['status'] == 'failed'
+        assert result['error'] == "Request error: bad url"
+    
+    def test_send_webhook_does_not_retry_permanent_client_errors(self, app):
+        """Test permanent 4xx responses fail without retrying"""
+        with app.app_context(), patch(
+            'app.services.webhook_service.requests.Session.post',
+            return_value=_response(404, "not found")
+        ) as mock_post, patch('app.services.webhook_service.time.sleep') as mock_sleep:
+            result = self._send()
+        
+        assert mock_post.call_count == 1
+        mock_sleep.assert_not_called()
+        assert result['status'] == 'failed'
+        assert result['status_code'] == 404
+    
+    def test_send_webhook_honours_retry_after(self, app):
+        """Test 429 responses wait for the Retry-After delay before retrying"""
+        with app.app_context(), patch(
+            'app.services.webhook_service.requests.Session.post',
+            side_effect=[_response(429, "slow down", {'Retry-After': '3'}), _response(200, "ok")]
+        ), patch('app.services.webhook_service.time.sleep') as mock_sleep:
+            result = self._send()
+        
+        assert result['status'] == 'success'
+        mock_sleep.assert_called_once_with(3.0)
+    
+    def test_retry_after_ignores_non_finite_delays(self, app):
+        """Test NaN or infinite Retry-After values fall back to the normal backoff"""
+        for value in ('nan', 'inf', '-inf'):
+            assert WebhookService._retry_after(_response(429, "", {'Retry-After': value})) is None
+        
+        with app.app_context(), patch(
+            'app.services.webhook_service.requests.Session.post',
+            side_effect=[_response(429, "slow down", {'Retry-After': 'nan'}), _response(200, "ok")]
+        ), patch('app.services.webhook_service.time.sleep'):
+            result = self._send()
+        
+        assert result['status'] == 'success'
+    
+    def test_enqueue_event_posts_full_batch_once(self, app):
+        """Test batched events for one webhook are delivered as a single signed POST"""
+        executor = Mock()
+        with app.app_context(), patch.dict(app.config, {
+            'WEBHOOK_BATCH_MAX_SIZE': 2, 'WEBHOOK_BATCH_INTERVAL_MS': 60000
+        }), patch.object(
+            WebhookService, '_get_executor', return_value=executor
+        ), patch(
+            'app.services.webhook_service.requests.Session.post',
+            return_value=_response(200, "ok")
+        ) as mock_post:
+            for n in (1, 2):
+                WebhookService.enqueue_event(
+                    url="https://example.com/hook",
+                    event={'event': 'submitted', 'n': n},
+                    webhook_id="wh-batch",
+                    form_id="form1",
+                    secret="s3cret"
+                )
+            
+            assert executor.submit.call_count == 1
+            assert "wh-batch" not in WebhookService._batches
+            outcome = executor.submit.call_args[0][0]()
+        
+        assert outcome['status'] == 'success'
+        kwargs = mock_post.call_args.kwargs
+        assert json.loads(kwargs['data']) == {'events': [
+            {'event': 'submitted', 'n': 1}, {'event': 'submitted', 'n': 2}
+        ]}
+        assert kwargs['headers']['X-Form-Event'] == 'batch'
+        assert kwargs['headers']['X-Form-Signature'] == WebhookService.signature_header(
+            "s3cret", kwargs['data']
+        )
+        delivery = WebhookDelivery.objects.get(id=outcome['delivery_id'])
+        assert len(delivery.payload['events']) == 2
+    
+    def test_trigger_webhooks_signs_once_per_secret(self, app):
+        """Test webhooks sharing a secret reuse one signature of the payload"""
+        from app.utils.webhooks import trigger_webhooks
+        
+        form = Mock(id="form1", title="Form", webhooks=[
+            {"url": "https://a.example.com/hook", "events": ["submitted"], "secret": "shared"},
+            {"url": "https://b.example.com/hook", "events": ["submitted"], "secret": "shared"},
+            {"url": "https://c.example.com/hook", "events": ["submitted"], "secret": "other"},
+        ])
+        with app.app_context(), patch.object(
+            WebhookService, 'signature_header', wraps=WebhookService.signature_header
+        ) as mock_sign, patch.object(WebhookService, 'send_webhook_async') as mock_send:
+            trigger_webhooks(form, "submitted", {"answer": 42})
+        
+        assert mock_sign.call_count == 2
+        signatures = [call.kwargs['headers']['X-Form-Signature'] for call in mock_send.call_args_list]
+        assert signatures[0] == signatures[1]
+        assert signatures[2] != signatures[0]
+    
+    def test_trigger_webhooks_signature_matches_posted_body(self, app):
+        """Test the signature header is the HMAC of the exact body posted"""
+        import hashlib
+        import hmac
+        from app.utils.webhooks import trigger_webhooks
+        
+        form = Mock(id="form1", title="Form", webhooks=[
+            {"url": "https://example.com/hook", "events": ["submitted"], "secret": "s3cret"},
+        ])
+        send_async = WebhookService.send_webhook_async
+        futures = []
+        
+        def capture(**kwargs):
+            futures.append(send_async(**kwargs))
+            return futures[-1]
+        
+        with app.app_context(), patch.object(
+            WebhookService, 'send_webhook_async', side_effect=capture
+        ), patch(
+            'app.services.webhook_service.requests.Session.post',
+            return_value=_response(200, "ok")
+        ) as mock_post:
+            trigger_webhooks(form, "submitted", {"b": 1, "a": 2})
+            assert futures[0].result(timeout=5)['status'] == 'success'
+        
+        kwargs = mock_post.call_args.kwargs
+        expected = hmac.new(b"s3cret", kwargs['data'], hashlib.sha256).hexdigest()
+        assert kwargs['headers']['X-Form-Signature'] == f"sha256={expected}"
+    
+    def test_calculate_backoff_uses_full_jitter_within_cap(self):
+        """Test backoff delays stay between zero and the capped base delay"""
+        with patch('app.services.webhook_service.random.random', return_value=0.999):
+            assert WebhookService._calculate_backoff(0) < 1
+            assert WebhookService._calculate_backoff(20) < WebhookService.BACKOFF_DELAYS[-1]
+        with patch('app.services.webhook_service.random.random', return_value=0.0):
+            assert WebhookService._calculate_backoff(3) == 0.0
+    
+    def test_verbose_checkpoints_update_fields_without_full_save(self, app):
+        """Test verbose mode records attempts with field updates, not document saves"""
+        original_save = WebhookDelivery.save
+        with app.app_context(), patch.dict(app.config, {'WEBHOOK_VERBOSE_LOGS': True}), patch(
+            'app.services.webhook_service.requests.Session.post',
+            side_effect=[_response(503, "unavailable"), _response(404, "gone")]
+        ), patch('app.services.webhook_service.time.sleep'), patch.object(
+            WebhookDelivery, 'save', autospec=True, side_effect=original_save
+        ) as mock_save, patch(
+            'app.services.webhook_service.WebhookService._mark_failed',
+            return_value={'status': 'failed'}
+        ):
+            result = self._send()
+        
+        assert result['status'] == 'failed'
+        assert mock_save.call_count == 1
+        delivery = WebhookDelivery.objects.first()
+        assert delivery.status == 'retrying'
+        assert delivery.attempt_count == 2
+        assert delivery.response_code == 503
+        assert delivery.metadata['is_dead_letter'] is True
+    
+    def test_get_webhook_history_cursor_walks_all_pages(self, app):
+        """Test cursor pagination returns every delivery once, newest first"""
+        from datetime import datetime, timedelta
+        
+        now = datetime(2026, 2, 4, 9, 0, 0)
+        created = [now, now, now - timedelta(minutes=1), now - timedelta(minutes=2), now - timedelta(minutes=3)]
+        for created_at in created:
+            WebhookDelivery(webhook_id="wh1", url="https://example.com/hook", form_id="form1",
+                            payload={'event': 'submitted'}, created_by="system",
+                            created_at=created_at).save()
+        
+        with app.app_context():
+            first = WebhookService.get_webhook_history(form_id="form1", per_page=2)
+            seen = first['deliveries']
+            cursor = first['next_cursor']
+            while cursor:
+                page = WebhookService.get_webhook_history(form_id="form1", per_page=2, cursor=cursor)
+                assert 'total' not in page
+                seen += page['deliveries']
+                cursor = page['next_cursor']
+            
+            with pytest.raises(ValueError):
+                WebhookService.get_webhook_history(form_id="form1", cursor="garbage")
+        
+        assert first['total'] == 5
+        assert len({d['id'] for d in seen}) == 5
+        assert all('payload' not in d for d in seen)
+        assert [d['created_at'] for d in seen] == sorted((d['created_at'] for d in seen), reverse=True)
+    
+    def test_background_retry_waits_on_timer_not_worker(self, app):
+        """Test queued deliveries persist a retry and reschedule instead of sleeping"""
+        executor = Mock()
+        with app.app_context(), patch.object(
+            WebhookService, '_get_executor', return_value=executor
+        ), patch(
+            'app.services.webhook_service.requests.Session.post',
+            side_effect=[_response(503, "unavailable"), _response(200, "ok")]
+        ) as mock_post, patch(
+            'app.services.webhook_service.time.sleep'
+        ) as mock_sleep, patch(
+            'app.services.webhook_service.threading.Timer'
+        ) as mock_timer:
+            result = WebhookService.enqueue_webhook(
+                url="https://example.com/hook",
+                payload={'event': 'submitted'},
+                webhook_id="wh1",
+                form_id="form1",
+                created_by="system",
+                headers={'X-Form-Event': 'submitted'},
+                timeout=7
+            )
+            first = executor.submit.call_args[0][0]()
+            
+            assert first['status'] == 'retrying'
+            mock_sleep.assert_not_called()
+            stored = WebhookDelivery.objects.get(id=result['delivery_id'])
+            assert stored.status == 'retrying'
+            assert stored.next_retry_at is not None
+            assert result['delivery_id'] in WebhookService._inflight
+            
+            # Fire the retry timer: it takes the retry and resubmits the delivery by id
+            delay, fire = mock_timer.call_args[0][:2]
+            assert delay == stored.metadata['backoff_delay']
+            fire(*mock_timer.call_args.kwargs['args'])
+            assert WebhookDelivery.objects.get(id=result['delivery_id']).next_retry_at is None
+            job, *args = executor.submit.call_args[0]
+            second = job(*args)
+        
+        assert second['status'] == 'success'
+        assert result['delivery_id'] not in WebhookService._inflight
+        assert mock_post.call_args.kwargs['headers']['X-Form-Event'] == 'submitted'
+        assert mock_post.call_args.kwargs['timeout'] == 7
+        assert WebhookDelivery.objects.get(id=result['delivery_id']).attempt_count == 2
+    
+    def test_fired_retry_not_sent_when_scheduler_took_it(self, app):
+        """Test a retry timer drops the delivery once another process's scheduler has taken it"""
+        executor = Mock()
+        with app.app_context(), patch.object(
+            WebhookService, '_get_executor', return_value=executor
+        ), patch(
+            'app.services.webhook_service.requests.Session.post',
+            return_value=_response(503, "unavailable")
+        ), patch(
+            'app.services.webhook_service.threading.Timer'
+        ) as mock_timer:
+            result = WebhookService.enqueue_webhook(
+                url="https://example.com/hook",
+                payload={'event': 'submitted'},
+                webhook_id="wh1",
+                form_id="form1",
+                created_by="system"
+            )
+            executor.submit.call_args[0][0]()
+            executor.submit.reset_mock()
+            
+            # A scheduler elsewhere takes the overdue retry first
+            WebhookDelivery.objects(id=result['delivery_id']).update_one(unset__next_retry_at=True)
+            _, fire = mock_timer.call_args[0][:2]
+            fire(*mock_timer.call_args.kwargs['args'])
+        
+        executor.submit.assert_not_called()
+        assert result['delivery_id'] not in WebhookService._inflight
+    
+    def test_process_due_deliveries_takes_each_due_delivery_once(self, app):
+        """Test the scheduler queues due scheduled deliveries and lost retries once"""
+        from datetime import datetime, timedelta, timezone
+        
+        now = datetime.now(timezone.utc)
+        
+        def make(status, next_retry_at):
+            return WebhookDelivery(webhook_id="wh1", url="https://example.com/hook", form_id="form1",
+                                   payload={'event': 'submitted'}, created_by="system",
+                                   status=status, next_retry_at=next_retry_at).save()
+        
+        scheduled = make('pending', now - timedelta(seconds=1))
+        lost_retry = make('retrying', now - timedelta(minutes=5))
+        make('pending', now + timedelta(hours=1))
+        make('retrying', now - timedelta(seconds=1))  # its timer is still pending
+        make('success', now - timedelta(minutes=5))
+        
+        executor = Mock()
+        with app.app_context(), patch.object(WebhookService, '_get_executor', return_value=executor):
+            assert WebhookService.process_due_deliveries() == 2
+            assert WebhookService.process_due_deliveries() == 0
+        
+        queued = {call[0][2] for call in executor.submit.call_args_list}
+        assert queued == {str(scheduled.id), str(lost_retry.id)}
+        assert WebhookDelivery.objects.get(id=scheduled.id).next_retry_at is None
+        for delivery_id in queued:
+            WebhookService._release(delivery_id)
+    
+    def test_open_circuit_skips_network_until_cooldown(self, app):
+        """Test repeated failures open the endpoint circuit and later attempts skip the POST"""
+        with app.app_context(), patch.dict(app.config, {
+            'WEBHOOK_CIRCUIT_THRESHOLD': 2, 'WEBHOOK_CIRCUIT_COOLDOWN': 30
+        }), patch(
+            'app.services.webhook_service.requests.Session.post',
+            return_value=_response(503, "unavailable")
+        ) as mock_post:
+            self._send(max_retries=1)
+            self._send(max_retries=1)
+            blocked = self._send(max_retries=1)
+            
+            assert mock_post.call_count == 2
+            assert blocked['status'] == 'failed'
+            assert blocked['message'] == "Webhook failed after 1 attempts (endpoint unavailable)"
+            
+            # A success after the cooldown closes the circuit again
+            WebhookService._circuits['example.com']['open_until'] = 0.0
+            mock_post.return_value = _response(200, "ok")
+            assert self._send(max_retries=1)['status'] == 'success'
+        
+        assert 'example.com' not in WebhookService._circuits
+    
+    def test_get_webhook_status_caches_only_immutable_statuses(self, app):
+        """Test status lookups match to_dict() and only final, unretryable results are cached"""
+        with app.app_context(), patch(
+            'app.services.webhook_service.requests.Session.post',
+            side_effect=[_response(200, "ok"), _response(404, "gone")]
+        ):
+            delivered = self._send()
+            failed = self._send()
+            
+            status = WebhookService.get_webhook_status(delivered['delivery_id'])
+            assert status == WebhookDelivery.objects.get(id=delivered['delivery_id']).to_dict()
+            assert delivered['delivery_id'] in WebhookService._status_cache
+            
+            WebhookService.get_webhook_status(failed['delivery_id'])
+            assert failed['delivery_id'] not in WebhookService._status_cache
+            
+            with patch.object(WebhookDelivery, 'objects') as mock_objects:
+                assert WebhookService.get_webhook_status(delivered['delivery_id']) == status
+                mock_objects.assert_not_called()
+            
+            assert WebhookService.get_webhook_status("00000000-0000-0000-0000-000000000000") is None
+    
+    def test_cancel_webhook_updates_status_in_place(self, app):
+        """Test cancelling marks pending deliveries and refuses completed ones"""
+        with app.app_context():
+            delivery = WebhookService._create_delivery(
+                "https://example.com/hook", {'event': 'submitted'}, "wh1", "form1", "system"
+            )
+            result = WebhookService.cancel_webhook(str(delivery.id))
+            again = WebhookService.cancel_webhook(str(delivery.id))
+            missing = WebhookService.cancel_webhook("00000000-0000-0000-0000-000000000000")
+        
+        assert result['status'] == 'success'
+        stored = WebhookDelivery.objects.get(id=delivery.id)
+        assert stored.status == 'cancelled'
+        assert stored.completed_at is not None
+        assert stored.payload == {'event': 'submitted'}
+        assert again['message'] == "Webhook delivery is already cancelled and cannot be cancelled"
+        assert missing['message'] == "Webhook delivery not found"
+    
+    def test_retry_webhook_resets_delivery_in_place(self, app):
+        """Test retrying keeps the delivery id and bumps retry_generation"""
+        with app.app_context(), patch(
+            'app.services.webhook_service.requests.Session.post',
+            side_effect=[_response(404, "gone"), _response(200, "ok")]
+        ) as mock_post:
+            failed = self._send()
+            created_at = WebhookDelivery.objects.get(id=failed['delivery_id']).created_at
+            
+            result = WebhookService.retry_webhook(failed['delivery_id'])
+            again = WebhookService.retry_webhook(failed['delivery_id'])
+        
+        assert failed['status'] == 'failed'
+        assert result['status'] == 'success'
+        assert result['delivery_id'] == result['previous_delivery_id'] == failed['delivery_id']
+        assert result['retry_generation'] == 1
+        assert mock_post.call_count == 2
+        assert WebhookDelivery.objects.count() == 1
+        stored = WebhookDelivery.objects.get(id=failed['delivery_id'])
+        assert stored.status == 'success'
+        assert stored.attempt_count == 1
+        assert stored.error_message is None
+        assert stored.created_at == created_at
+        assert again['status'] == 'error'
+    
+    def test_deliver_skips_attempt_taken_by_another_worker(self, app):
+        """Test a stale copy of a delivery does not repeat an attempt already made"""
+        with app.app_context(), patch(
+            'app.services.webhook_service.requests.Session.post',
+            return_value=_response(200, "ok")
+        ) as mock_post:
+            delivery = WebhookService._create_delivery(
+                "https://example.com/hook", {'event': 'submitted'}, "wh1", "form1", "system"
+            )
+            stale = WebhookDelivery.objects.get(id=delivery.id)
+            
+            first = WebhookService._deliver(delivery)
+            second = WebhookService._deliver(stale)
+        
+        assert first['status'] == 'success'
+        assert second['status'] == 'raced'
+        assert mock_post.call_count == 1
+        stored = WebhookDelivery.objects.get(id=delivery.id)
+        assert stored.status == 'success'
+        assert stored.attempt_count == 1